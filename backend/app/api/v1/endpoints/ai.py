@@ -1,39 +1,62 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Header, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-import uuid
+import asyncio
+import orjson
+import math
 from datetime import datetime
 
 from app.models.ai_models import (
     AIRequest, AIResponse, AIMessage, ConversationContext, 
-    AIProvider, ConversationSession, AIAnalysisRequest, AIAnalysisResponse
+    AIProvider, ConversationSession, AIAnalysisRequest, AIAnalysisResponse,
+    AIBatchAnalysisRequest, AIBatchAnalysisResponse, AIBatchChatRequest, AIBatchChatResult
 )
 from app.services.ai_service import ai_service
+from app.services.conversation_store import conversation_store, ConversationNotFoundError
+from app.services.rate_limiter import RateLimitExceeded
+from app.services.admission import AdmissionRejected, admission_controller
+from app.services.cache_warmer import load_report as load_cache_warming_report
+from app.core.circuit_breaker import CircuitOpenError, get_breaker
+from app.tasks import build_analysis_job, enqueue_analysis, run_analysis_jobs
+from app.core.config import settings
 from app.core.logging import logger
+from app.core.request_decoding import ORJSONRoute
 
-router = APIRouter()
+# Chat histories make these bodies large; parse them with orjson
+router = APIRouter(route_class=ORJSONRoute)
 
 @router.post("/chat", response_model=AIResponse)
 async def chat_with_ai(
     request: AIRequest,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    x_priority: Optional[str] = Header(default=None),
+    x_request_timeout: Optional[float] = Header(default=None)
 ):
     """
     Chat with AI using specified provider and context
+    
+    Requests that have to go to the provider wait for a processing slot by
+    priority class (X-Priority: high, normal or low, else per domain) for
+    at most X-Request-Timeout seconds; cached answers are served without
+    one. Under overload they are rejected with 503 and Retry-After.
     """
     try:
-        # Process AI request
-        response = await ai_service.process_request(request)
-        
-        # Add background task for conversation analysis
-        background_tasks.add_task(
-            analyze_conversation_background,
-            request.messages,
-            request.context,
-            response
-        )
+        priority = admission_controller.resolve_priority(request.context.domain, x_priority)
+        response = await ai_service.process_request(request, priority, x_request_timeout)
+        
+        # Queue conversation analysis off the request-serving loop
+        await schedule_analysis(background_tasks, request, response)
         
         return response
         
+    except RateLimitExceeded as e:
+        raise rate_limit_http_exception(e)
+    except (AdmissionRejected, CircuitOpenError) as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
     except Exception as e:
         logger.error(f"Chat endpoint error: {str(e)}")
         raise HTTPException(
@@ -41,6 +64,124 @@ async def chat_with_ai(
             detail=f"AI service error: {str(e)}"
         )
 
+@router.post("/chat/stream")
+async def chat_with_ai_stream(
+    request: AIRequest,
+    background_tasks: BackgroundTasks
+):
+    """
+    Chat with AI, streaming response tokens as Server-Sent Events.
+    
+    Emits `delta` events with `{"content": ...}` while tokens arrive, then a
+    single `done` event carrying the response metadata, or an `error` event.
+    Rate limiting and open circuits are reported with the `status_code`
+    (429 or 503) and `retry_after` that /chat would have used.
+    """
+    async def event_stream():
+        try:
+            async for item in ai_service.stream_request(request):
+                if isinstance(item, AIResponse):
+                    # Fallback task runs after the stream is closed, like the /chat analysis
+                    await schedule_analysis(background_tasks, request, item)
+                    yield _sse_event("done", item.model_dump_json(exclude={"content"}))
+                else:
+                    yield _sse_event("delta", orjson.dumps({"content": item}).decode())
+        except (RateLimitExceeded, CircuitOpenError) as e:
+            # The status code and Retry-After /chat would have answered with
+            yield _sse_event("error", orjson.dumps({
+                "detail": str(e),
+                "status_code": 429 if isinstance(e, RateLimitExceeded) else 503,
+                "retry_after": math.ceil(e.retry_after)
+            }).decode())
+        except Exception as e:
+            logger.error(f"Chat stream error: {str(e)}")
+            yield _sse_event("error", orjson.dumps({"detail": f"AI service error: {str(e)}"}).decode())
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/chat/batch")
+async def chat_with_ai_batch(
+    request: AIBatchChatRequest,
+    background_tasks: BackgroundTasks,
+    x_priority: Optional[str] = Header(default=None),
+    x_request_timeout: Optional[float] = Header(default=None)
+):
+    """
+    Run many chat requests in one call, streaming results as NDJSON.
+    
+    Each line is an AIBatchChatResult for one input index, written as soon
+    as that item completes. Failed items carry an error and status code
+    instead of failing the batch. Identical items are processed once.
+    Items are admitted one by one like /chat requests (X-Priority, and
+    X-Request-Timeout capping each item's wait); shed items get a 503.
+    """
+    if len(request.items) > settings.CHAT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.CHAT_BATCH_MAX_SIZE} items per batch"
+        )
+    concurrency = min(request.concurrency or settings.CHAT_BATCH_CONCURRENCY, settings.CHAT_BATCH_MAX_CONCURRENCY)
+    item_timeout = request.item_timeout or settings.CHAT_BATCH_ITEM_TIMEOUT
+    
+    async def result_stream():
+        pending = set(range(len(request.items)))
+        try:
+            async for indexes, outcome in ai_service.process_batch(
+                request.items, concurrency, item_timeout, x_priority, x_request_timeout
+            ):
+                for index in indexes:
+                    if isinstance(outcome, AIResponse):
+                        await schedule_analysis(background_tasks, request.items[index], outcome)
+                        result = AIBatchChatResult(index=index, response=outcome)
+                    else:
+                        result = batch_error_result(index, outcome)
+                    pending.discard(index)
+                    yield result.model_dump_json() + "\n"
+        except Exception as e:
+            logger.error(f"Chat batch error: {str(e)}")
+            # Every index gets a line, so a failed batch is not mistaken for a short one
+            for index in sorted(pending):
+                yield batch_error_result(index, e).model_dump_json() + "\n"
+    
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+def batch_error_result(index: int, error: Exception) -> AIBatchChatResult:
+    """Map an item failure to the status code /chat would have returned"""
+    if isinstance(error, (RateLimitExceeded, AdmissionRejected, CircuitOpenError)):
+        return AIBatchChatResult(
+            index=index,
+            error=str(error),
+            status_code=429 if isinstance(error, RateLimitExceeded) else 503,
+            retry_after=math.ceil(error.retry_after)
+        )
+    if isinstance(error, asyncio.TimeoutError):
+        return AIBatchChatResult(index=index, error="Item deadline exceeded", status_code=504)
+    return AIBatchChatResult(index=index, error=f"AI service error: {str(error)}", status_code=500)
+
+def rate_limit_http_exception(error: RateLimitExceeded) -> HTTPException:
+    """Map a provider rate limit to 429 with Retry-After"""
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(math.ceil(error.retry_after))}
+    )
+
+def circuit_open_http_exception(error: CircuitOpenError) -> HTTPException:
+    """Map an open dependency circuit to 503 with Retry-After"""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(math.ceil(error.retry_after))}
+    )
+
+def _sse_event(event: str, data: str) -> str:
+    """Format a single Server-Sent Event"""
+    return f"event: {event}\ndata: {data}\n\n"
+
 @router.post("/analyze", response_model=AIAnalysisResponse)
 async def analyze_conversation(
     request: AIAnalysisRequest
@@ -49,33 +190,25 @@ async def analyze_conversation(
     Analyze conversation for insights and recommendations
     """
     try:
-        # This would typically fetch conversation from database
-        # For now, we'll use a mock conversation
-        mock_messages = [
-            AIMessage(role="user", content="Help me study for AWS certification"),
-            AIMessage(role="assistant", content="I'll help you create a study plan for AWS certification.")
-        ]
+        sessions = await conversation_store.get_sessions_with_counts([request.conversation_id])
+        if request.conversation_id not in sessions:
+            raise ConversationNotFoundError(request.conversation_id)
         
-        mock_context = ConversationContext(domain="aws")
-        
-        analysis = await ai_service.analyze_conversation(mock_messages, mock_context)
+        analyses = await ai_service.analyze_sessions(sessions, request.analysis_type)
+        analysis = analyses[request.conversation_id]
         
         return AIAnalysisResponse(
             analysis_type=request.analysis_type,
-            results=analysis,
-            insights=[
-                "You're focused on AWS certification preparation",
-                "Consider hands-on practice with AWS Free Tier",
-                "Set up a structured study schedule"
-            ],
-            recommendations=[
-                "Start with AWS fundamentals",
-                "Practice with sample exam questions",
-                "Join AWS study groups"
-            ],
-            confidence_score=0.85
+            results=analysis.results,
+            insights=analysis.insights,
+            recommendations=analysis.recommendations,
+            confidence_score=analysis.confidence_score
         )
         
+    except ConversationNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except CircuitOpenError as e:
+        raise circuit_open_http_exception(e)
     except Exception as e:
         logger.error(f"Analysis endpoint error: {str(e)}")
         raise HTTPException(
@@ -83,18 +216,58 @@ async def analyze_conversation(
             detail=f"Analysis error: {str(e)}"
         )
 
+@router.post("/analyze/batch", response_model=AIBatchAnalysisResponse)
+async def analyze_conversations_batch(
+    request: AIBatchAnalysisRequest
+):
+    """
+    Analyze many conversations in one call
+    """
+    conversation_ids = list(dict.fromkeys(request.conversation_ids))
+    if len(conversation_ids) > settings.ANALYSIS_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.ANALYSIS_BATCH_MAX_SIZE} conversations per batch"
+        )
+    
+    try:
+        sessions = await conversation_store.get_sessions_with_counts(conversation_ids)
+        analyses = await ai_service.analyze_sessions(sessions, request.analysis_type)
+        
+        return AIBatchAnalysisResponse(
+            analysis_type=request.analysis_type,
+            results={
+                conversation_id: {
+                    **analyses[conversation_id].results,
+                    "insights": analyses[conversation_id].insights,
+                    "recommendations": analyses[conversation_id].recommendations,
+                    "confidence_score": analyses[conversation_id].confidence_score,
+                }
+                for conversation_id in conversation_ids
+                if conversation_id in analyses
+            },
+            errors={
+                conversation_id: str(ConversationNotFoundError(conversation_id))
+                for conversation_id in conversation_ids
+                if conversation_id not in sessions
+            }
+        )
+        
+    except CircuitOpenError as e:
+        raise circuit_open_http_exception(e)
+    except Exception as e:
+        logger.error(f"Batch analysis endpoint error: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Analysis error: {str(e)}"
+        )
+
 @router.get("/providers", response_model=List[str])
 async def get_available_providers():
     """
     Get list of available AI providers
     """
-    providers = []
-    if ai_service.openai_client:
-        providers.append("openai")
-    if ai_service.gemini_client:
-        providers.append("gemini")
-    
-    return providers
+    return [provider.value for provider in AIProvider if ai_service.is_provider_available(provider)]
 
 @router.get("/models/{provider}", response_model=List[str])
 async def get_available_models(provider: AIProvider):
@@ -115,6 +288,45 @@ async def get_available_models(provider: AIProvider):
             detail=f"Error fetching models: {str(e)}"
         )
 
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Get response cache hit/miss/coalescing counters
+    """
+    stats = ai_service.response_cache.get_stats()
+    if ai_service.semantic_cache:
+        stats["semantic"] = ai_service.semantic_cache.get_stats()
+    stats["warming"] = await load_cache_warming_report()
+    stats["conversations"] = conversation_store.memory.get_stats()
+    return stats
+
+@router.get("/routing/stats")
+async def get_routing_stats():
+    """
+    Get hedging/failover counters and provider circuit breaker states
+    """
+    return {
+        **ai_service.router.get_stats(),
+        "circuits": {
+            provider.value: get_breaker(provider.value).get_stats()
+            for provider in AIProvider
+        }
+    }
+
+@router.get("/admission/stats")
+async def get_admission_stats():
+    """
+    Get admission queue depth, in-flight requests and shedding counters
+    """
+    return admission_controller.get_stats()
+
+@router.get("/rate-limits/stats")
+async def get_rate_limit_stats():
+    """
+    Get rate limiter queueing/rejection counters and adaptive concurrency limits
+    """
+    return ai_service.rate_limiter.get_stats()
+
 @router.post("/conversation/start", response_model=ConversationSession)
 async def start_conversation(
     context: ConversationContext,
@@ -124,20 +336,13 @@ async def start_conversation(
     Start a new conversation session
     """
     try:
-        session = ConversationSession(
-            id=str(uuid.uuid4()),
-            context=context,
-            messages=[],
-            provider=provider,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
-        
-        # In a real app, this would be saved to database
+        session = await conversation_store.create_session(context, provider)
         logger.info(f"Started conversation session: {session.id}")
         
         return session
         
+    except CircuitOpenError as e:
+        raise circuit_open_http_exception(e)
     except Exception as e:
         logger.error(f"Start conversation error: {str(e)}")
         raise HTTPException(
@@ -154,15 +359,21 @@ async def add_message_to_conversation(
     Add a message to an existing conversation session
     """
     try:
-        # In a real app, this would update the database
-        logger.info(f"Added message to session {session_id}: {message.content[:50]}...")
+        message_count, message_ids = await conversation_store.append_messages(session_id, [message])
+        ai_service.record_conversation_messages(session_id, [message], message_count, message_ids)
+        logger.debug("Added message to session %s: %.50s...", session_id, message.content)
         
         return {
             "message": "Message added successfully",
             "session_id": session_id,
+            "total_messages": message_count,
             "timestamp": datetime.utcnow()
         }
         
+    except ConversationNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except CircuitOpenError as e:
+        raise circuit_open_http_exception(e)
     except Exception as e:
         logger.error(f"Add message error: {str(e)}")
         raise HTTPException(
@@ -171,32 +382,36 @@ async def add_message_to_conversation(
         )
 
 @router.get("/conversation/{session_id}/history")
-async def get_conversation_history(session_id: str):
+async def get_conversation_history(
+    session_id: str,
+    limit: int = Query(
+        default=settings.CONVERSATION_HISTORY_PAGE_SIZE,
+        ge=1,
+        le=settings.CONVERSATION_HISTORY_MAX_PAGE_SIZE
+    ),
+    before: Optional[int] = Query(default=None, description="Cursor from a previous page's next_cursor")
+):
     """
-    Get conversation history for a session
+    Get conversation history for a session, most recent page first
     """
     try:
-        # In a real app, this would fetch from database
-        # For now, return mock data
-        mock_messages = [
-            AIMessage(
-                role="user",
-                content="Help me study for AWS certification",
-                timestamp=datetime.utcnow()
-            ),
-            AIMessage(
-                role="assistant",
-                content="I'll help you create a study plan for AWS certification. Let's start with the fundamentals.",
-                timestamp=datetime.utcnow()
-            )
-        ]
+        message_count = await conversation_store.get_message_count(session_id)
+        if message_count is None:
+            raise ConversationNotFoundError(session_id)
+        
+        messages, next_cursor = await conversation_store.get_history(session_id, limit, before, message_count)
         
         return {
             "session_id": session_id,
-            "messages": mock_messages,
-            "total_messages": len(mock_messages)
+            "messages": messages,
+            "total_messages": message_count,
+            "next_cursor": next_cursor
         }
         
+    except ConversationNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except CircuitOpenError as e:
+        raise circuit_open_http_exception(e)
     except Exception as e:
         logger.error(f"Get history error: {str(e)}")
         raise HTTPException(
@@ -204,19 +419,28 @@ async def get_conversation_history(session_id: str):
             detail=f"Error fetching conversation history: {str(e)}"
         )
 
+async def schedule_analysis(
+    background_tasks: BackgroundTasks,
+    request: AIRequest,
+    response: AIResponse
+):
+    """
+    Queue conversation analysis on Celery, falling back to a BackgroundTask
+    """
+    if await enqueue_analysis(request, response):
+        return
+    background_tasks.add_task(analyze_conversation_background, request, response)
+
 async def analyze_conversation_background(
-    messages: List[AIMessage],
-    context: ConversationContext,
+    request: AIRequest,
     response: AIResponse
 ):
     """
     Background task for conversation analysis
     """
     try:
-        analysis = await ai_service.analyze_conversation(messages, context)
-        logger.info(f"Background analysis completed: {analysis}")
-        
-        # In a real app, this could trigger notifications, save insights, etc.
+        analyses = await run_analysis_jobs([build_analysis_job(request, response)])
+        logger.debug("Background analysis completed: %s", analyses[0])
         
     except Exception as e:
         logger.error(f"Background analysis error: {str(e)}")
@@ -1,29 +1,238 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
 import redis.asyncio as redis
+from redis import exceptions as redis_errors
+from app.core.circuit_breaker import get_breaker
 from app.core.config import settings
 from app.core.logging import logger
 
+# The active backend: the Redis client, or a MemoryStore while Redis is unreachable.
+# Read it through get_redis() (or `cache.redis_client`) at call time, never via
+# `from app.core.cache import redis_client`, which would capture it before init_redis runs.
 redis_client = None
 
+_redis: Optional[redis.Redis] = None
+# Own connection for availability checks, so a busy pool is not mistaken for an outage
+_probe: Optional[redis.Redis] = None
+_monitor_task: Optional[asyncio.Task] = None
+
+NO_EXPIRY = float("inf")
+
+# Errors that mean Redis is unreachable or overloaded, as opposed to a bad command
+CONNECTION_ERRORS = (redis_errors.ConnectionError, redis_errors.TimeoutError, OSError, asyncio.TimeoutError)
+
+redis_breaker = get_breaker("redis")
+
+def get_redis():
+    """The active cache backend, or None before init_redis"""
+    return redis_client
+
+def redis_available() -> bool:
+    """Whether the active backend is Redis rather than the in-memory fallback"""
+    return redis_client is not None and not isinstance(redis_client, MemoryStore)
+
+@asynccontextmanager
+async def redis_guard():
+    """Circuit breaker around a Redis call; calls to the in-memory fallback are not guarded"""
+    if redis_available():
+        async with redis_breaker.guard(failures=CONNECTION_ERRORS):
+            yield
+    else:
+        yield
+
+def _create_client() -> redis.Redis:
+    pool = redis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL
+    )
+    return redis.Redis(connection_pool=pool)
+
 async def init_redis():
-    """Initialize Redis connection"""
-    global redis_client
+    """Initialize Redis connection, falling back to an in-memory store"""
+    global redis_client, _redis, _probe, _monitor_task
+    _redis = _create_client()
     try:
-        redis_client = redis.from_url(settings.REDIS_URL)
-        await redis_client.ping()
+        await _redis.ping()
+        redis_client = _redis
         logger.info("✅ Redis connection established")
     except Exception as e:
-        logger.warning(f"Redis connection failed: {str(e)}")
-        # Create a mock client for development
-        redis_client = MockRedisClient()
+        logger.warning(f"Redis connection failed, using in-memory cache: {str(e)}")
+        redis_client = MemoryStore()
+    if settings.REDIS_RECONNECT_INTERVAL > 0:
+        _probe = redis.Redis.from_url(
+            settings.REDIS_URL,
+            single_connection_client=True,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT
+        )
+        _monitor_task = asyncio.create_task(_monitor_redis(settings.REDIS_RECONNECT_INTERVAL))
+
+async def close_redis():
+    """Stop the availability monitor and close the connection pool"""
+    global redis_client, _redis, _probe, _monitor_task
+    if _monitor_task is not None:
+        _monitor_task.cancel()
+        try:
+            await _monitor_task
+        except asyncio.CancelledError:
+            pass
+        _monitor_task = None
+    if _probe is not None:
+        await _probe.aclose()
+        _probe = None
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+    redis_client = None
+
+async def _monitor_redis(interval: float):
+    """Switch to the in-memory store when Redis stops answering, and back when it recovers"""
+    global redis_client
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await _probe.ping()
+        except Exception as e:
+            if redis_available():
+                logger.warning(f"Redis unreachable, using in-memory cache: {str(e)}")
+                redis_client = MemoryStore()
+            continue
+        if not redis_available():
+            logger.info("✅ Redis reachable again, reconnected")
+            redis_client = _redis
+
+async def get_many(keys: Sequence[str]) -> List[Optional[bytes]]:
+    """Fetch several keys in one round trip"""
+    client = redis_client
+    if client is None or not keys:
+        return [None] * len(keys)
+    async with redis_guard():
+        return await client.mget(keys)
+
+async def set_many(items: Dict[str, Any], ttl: int):
+    """Store several keys with a TTL in one pipelined round trip"""
+    client = redis_client
+    if client is None or not items:
+        return
+    async with redis_guard(), client.pipeline(transaction=False) as pipe:
+        for key, value in items.items():
+            pipe.setex(key, ttl, value)
+        await pipe.execute()
+
+class TTLCache:
+    """Bounded in-process LRU cache with per-entry TTL"""
+    
+    def __init__(self, max_entries: int = 1024, ttl: int = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+    
+    def delete(self, key: str):
+        self._data.pop(key, None)
+    
+    def clear(self):
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
 
-class MockRedisClient:
-    """Mock Redis client for development when Redis is not available"""
+def _to_bytes(value: Any) -> bytes:
+    # Redis stores everything as bytes
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode()
+    return str(value).encode()
+
+class MemoryStore:
+    """Bounded in-memory LRU/TTL store with the subset of the Redis API the app uses"""
+    
+    def __init__(self, max_entries: int = settings.CACHE_MEMORY_MAX_ENTRIES):
+        self._data = TTLCache(max_entries=max_entries, ttl=NO_EXPIRY)
     
-    async def get(self, key: str):
-        return None
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._data.get(key)
+    
+    async def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return [self._data.get(key) for key in keys]
+    
+    async def set(self, key: str, value: Any, ex: Optional[int] = None, px: Optional[int] = None, nx: bool = False):
+        if nx and self._data.get(key) is not None:
+            return None
+        ttl = ex if ex is not None else (px / 1000 if px is not None else None)
+        self._data.set(key, _to_bytes(value), ttl)
+        return True
+    
+    async def setex(self, key: str, ttl: int, value: Any):
+        self._data.set(key, _to_bytes(value), ttl)
+        return True
     
-    async def setex(self, key: str, ttl: int, value: str):
-        pass
+    async def delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            if self._data.get(key) is not None:
+                self._data.delete(key)
+                deleted += 1
+        return deleted
     
     async def ping(self):
         return True
+    
+    def pipeline(self, transaction: bool = True) -> "MemoryPipeline":
+        return MemoryPipeline(self)
+    
+    async def aclose(self):
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+class MemoryPipeline:
+    """Buffers commands like a Redis pipeline and runs them on execute()"""
+    
+    def __init__(self, store: MemoryStore):
+        self._store = store
+        self._commands: List[Tuple[Callable, tuple, dict]] = []
+    
+    def __getattr__(self, name: str):
+        method = getattr(self._store, name)
+        def queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+        return queue
+    
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await method(*args, **kwargs) for method, args, kwargs in commands]
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self._commands = []
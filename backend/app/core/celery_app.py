@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.schedules import crontab
 from app.core.config import settings
 from app.core.logging import logger
 
@@ -23,6 +24,15 @@ def init_celery():
             enable_utc=True,
         )
         
+        if settings.CACHE_WARM_ENABLED:
+            # Run beat alongside the workers: celery -A app.worker beat
+            celery_app.conf.beat_schedule = {
+                "warm-response-cache": {
+                    "task": "app.tasks.warm_response_cache",
+                    "schedule": crontab(hour=settings.CACHE_WARM_HOUR, minute=settings.CACHE_WARM_MINUTE),
+                },
+            }
+        
         logger.info("✅ Celery initialized for background tasks")
     except Exception as e:
         logger.warning(f"Celery initialization failed: {str(e)}")
@@ -0,0 +1,150 @@
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, List, Tuple, Type
+
+from app.core.config import settings
+from app.core.logging import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open, retry after {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a timed open state and half-open probes"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = settings.CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = settings.CIRCUIT_RESET_TIMEOUT,
+        half_open_max_calls: int = 1,
+        error_window: int = settings.CIRCUIT_ERROR_WINDOW
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.error_window = error_window
+        # [second, calls, failures] per second with any calls, covering the last error_window seconds
+        self._outcomes: Deque[List[int]] = deque()
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call may proceed now; half-open admits a limited number of probes"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def error_rate(self) -> Tuple[int, float]:
+        """Calls and the fraction that failed over the last error_window seconds"""
+        self._prune(int(time.monotonic()))
+        calls = sum(bucket[1] for bucket in self._outcomes)
+        failures = sum(bucket[2] for bucket in self._outcomes)
+        return calls, (failures / calls if calls else 0.0)
+
+    def record_success(self):
+        self._record_outcome(failed=False)
+        if self._state != CLOSED:
+            logger.info(f"Circuit '{self.name}' closed")
+        self._state = CLOSED
+        self._consecutive_failures = 0
+
+    def record_failure(self):
+        self._record_outcome(failed=True)
+        self._consecutive_failures += 1
+        if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self._state != OPEN:
+                logger.warning(f"Circuit '{self.name}' opened after {self._consecutive_failures} failures")
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+
+    @asynccontextmanager
+    async def guard(
+        self,
+        ignore: Tuple[Type[BaseException], ...] = (),
+        failures: Tuple[Type[BaseException], ...] = (Exception,)
+    ):
+        """
+        Fail fast while open; record the outcome of the wrapped call.
+
+        Only `failures` that are not in `ignore` count against the
+        dependency; other errors pass through without affecting the circuit.
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(self.name, self.retry_after())
+        try:
+            yield
+        except Exception as e:
+            if isinstance(e, failures) and not isinstance(e, ignore):
+                self.record_failure()
+            else:
+                # Not a dependency failure (e.g. our own rate limiting)
+                self._release_probe()
+            raise
+        except BaseException:
+            # Cancelled (e.g. a hedged call that lost); the outcome is unknown
+            self._release_probe()
+            raise
+        else:
+            self.record_success()
+
+    def _release_probe(self):
+        if self._state == HALF_OPEN:
+            self._half_open_calls = max(0, self._half_open_calls - 1)
+
+    def _record_outcome(self, failed: bool):
+        now = int(time.monotonic())
+        if not self._outcomes or self._outcomes[-1][0] != now:
+            self._prune(now)
+            self._outcomes.append([now, 0, 0])
+        bucket = self._outcomes[-1]
+        bucket[1] += 1
+        bucket[2] += failed
+
+    def _prune(self, now: int):
+        while self._outcomes and self._outcomes[0][0] <= now - self.error_window:
+            self._outcomes.popleft()
+
+    def get_stats(self) -> Dict[str, object]:
+        calls, error_rate = self.error_rate()
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "recent_calls": calls,
+            "recent_error_rate": round(error_rate, 3),
+        }
+
+breakers: Dict[str, CircuitBreaker] = {}
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Get or create the shared circuit breaker for a dependency"""
+    breaker = breakers.get(name)
+    if breaker is None:
+        breaker = breakers[name] = CircuitBreaker(name)
+    return breaker
@@ -1,11 +1,88 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
+
+from app.core.circuit_breaker import get_breaker
+from app.core.config import settings
 from app.core.logging import logger
 
+# Errors that mean the database is unreachable or overloaded, as opposed to a bad query
+CONNECTION_ERRORS = (
+    exc.OperationalError,
+    exc.InterfaceError,
+    exc.DisconnectionError,
+    exc.TimeoutError,
+    OSError,
+    asyncio.TimeoutError,
+)
+
+database_breaker = get_breaker("database")
+
+engine: Optional[AsyncEngine] = None
+async_session_factory: Optional[async_sessionmaker] = None
+
+class Base(DeclarativeBase):
+    """Declarative base for ORM tables"""
+
+def get_async_database_url(url: str) -> str:
+    """Map sync database URLs onto their async drivers"""
+    if url.startswith("postgresql://") or url.startswith("postgres://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    return url
+
+def create_engine(url: str) -> AsyncEngine:
+    """Create a pooled async engine for the configured database"""
+    url = get_async_database_url(url)
+    if url.startswith("sqlite"):
+        # SQLite uses its own single-file pooling; QueuePool sizing does not apply
+        return create_async_engine(url, echo=settings.DB_ECHO)
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True
+    )
+
 async def init_db():
     """Initialize database connection"""
+    global engine, async_session_factory
     try:
-        # In a real app, this would establish database connections
-        # For now, we'll just log that it's initialized
+        # Register ORM tables on Base.metadata
+        from app.models import db_models  # noqa: F401
+        
+        engine = create_engine(settings.DATABASE_URL)
+        async_session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        
         logger.info("✅ Database connection initialized")
     except Exception as e:
         logger.error(f"Database initialization error: {str(e)}")
         raise
+
+async def close_db():
+    """Dispose of the database connection pool"""
+    global engine, async_session_factory
+    if engine is not None:
+        await engine.dispose()
+    engine = None
+    async_session_factory = None
+
+@asynccontextmanager
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """Open a new database session behind the database circuit breaker"""
+    if async_session_factory is None:
+        raise RuntimeError("Database not initialized")
+    async with database_breaker.guard(failures=CONNECTION_ERRORS):
+        async with async_session_factory() as session:
+            yield session
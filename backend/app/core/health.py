@@ -0,0 +1,103 @@
+"""
+Liveness and readiness reporting.
+
+Readiness probes the database and Redis through their circuit breakers,
+so an open circuit answers immediately and a half-open one gets its trial
+call, and reports every breaker's state and recent error rate. Probe
+results are reused for HEALTH_PROBE_CACHE_TTL seconds so frequent load
+balancer checks stay cheap.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from app.core import cache
+from app.core.circuit_breaker import OPEN, CircuitOpenError, get_breaker
+from app.core.config import settings
+from app.core.database import database_breaker, get_session
+
+async def probe_database():
+    async with get_session() as db:
+        await db.execute(text("SELECT 1"))
+
+async def probe_redis():
+    if cache.redis_available():
+        async with cache.redis_guard():
+            await cache.redis_client.ping()
+
+class HealthChecker:
+    """Cached dependency probes behind /health/ready"""
+
+    def __init__(
+        self,
+        cache_ttl: float = settings.HEALTH_PROBE_CACHE_TTL,
+        timeout: float = settings.HEALTH_PROBE_TIMEOUT
+    ):
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+        self._report: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def readiness(self, providers: Dict[str, bool]) -> Dict[str, Any]:
+        """
+        Dependency report; `providers` maps each provider to whether it is configured.
+
+        Ready needs the database and, if any provider is configured, at least
+        one configured provider whose circuit is not open. Redis is optional
+        (the cache falls back to memory) and only degrades the status.
+        """
+        async with self._lock:
+            if self._report is None or time.monotonic() - self._checked_at >= self.cache_ttl:
+                self._report = await self._check(providers)
+                self._checked_at = time.monotonic()
+            return self._report
+
+    async def _check(self, providers: Dict[str, bool]) -> Dict[str, Any]:
+        database, redis = await asyncio.gather(
+            self._probe(probe_database, database_breaker.get_stats),
+            self._probe(probe_redis, cache.redis_breaker.get_stats)
+        )
+        database["required"] = True
+        redis["required"] = False
+        if cache.redis_client is not None and not cache.redis_available() and redis["status"] == "ok":
+            redis["status"] = "fallback"
+        redis["backend"] = "redis" if cache.redis_available() else "memory"
+
+        dependencies = {"database": database, "redis": redis}
+        for name, configured in providers.items():
+            circuit = get_breaker(name).get_stats()
+            status = "not_configured" if not configured else "down" if circuit["state"] == OPEN else "ok"
+            dependencies[name] = {"status": status, "required": False, "circuit": circuit}
+
+        configured = [name for name, is_configured in providers.items() if is_configured]
+        ready = database["status"] == "ok" and (
+            not configured or any(dependencies[name]["status"] == "ok" for name in configured)
+        )
+        degraded = any(item["status"] not in ("ok", "not_configured") for item in dependencies.values())
+        return {
+            "status": "unavailable" if not ready else "degraded" if degraded else "ok",
+            "ready": ready,
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "dependencies": dependencies,
+        }
+
+    async def _probe(self, probe: Callable[[], Awaitable[None]], circuit: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        result: Dict[str, Any] = {"status": "ok"}
+        try:
+            await asyncio.wait_for(probe(), self.timeout)
+        except CircuitOpenError as e:
+            result = {"status": "down", "error": str(e), "retry_after": round(e.retry_after, 1)}
+        except Exception as e:
+            result = {"status": "down", "error": str(e) or type(e).__name__}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        result["circuit"] = circuit()
+        return result
+
+# Global health checker instance
+health_checker = HealthChecker()
@@ -0,0 +1,55 @@
+import httpx
+from typing import Dict
+
+from app.core.config import settings
+from app.core.logging import logger
+
+http_clients: Dict[str, httpx.AsyncClient] = {}
+
+def _http2_available() -> bool:
+    """Check whether the optional h2 dependency is installed"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _build_client(provider: str) -> httpx.AsyncClient:
+    """Build a pooled keep-alive client using the provider's limits and timeouts"""
+    prefix = provider.upper()
+    limits = httpx.Limits(
+        max_connections=getattr(settings, f"{prefix}_MAX_CONNECTIONS"),
+        max_keepalive_connections=getattr(settings, f"{prefix}_MAX_KEEPALIVE_CONNECTIONS"),
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+    )
+    timeout = httpx.Timeout(
+        getattr(settings, f"{prefix}_TIMEOUT"),
+        connect=settings.HTTP_CONNECT_TIMEOUT
+    )
+    http2 = settings.HTTP2_ENABLED and _http2_available()
+    if settings.HTTP2_ENABLED and not http2:
+        logger.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+    return httpx.AsyncClient(http2=http2, limits=limits, timeout=timeout)
+
+async def init_http_clients():
+    """Initialize shared provider HTTP clients"""
+    for provider in ("openai", "gemini"):
+        if provider not in http_clients:
+            http_clients[provider] = _build_client(provider)
+    logger.info("✅ Provider HTTP clients initialized")
+
+async def close_http_clients():
+    """Close shared provider HTTP clients and their connection pools"""
+    for provider, client in list(http_clients.items()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing {provider} HTTP client: {str(e)}")
+    http_clients.clear()
+
+def get_http_client(provider: str) -> httpx.AsyncClient:
+    """Get the shared HTTP client for a provider, creating it if needed"""
+    client = http_clients.get(provider)
+    if client is None or client.is_closed:
+        client = http_clients[provider] = _build_client(provider)
+    return client
@@ -1,14 +1,206 @@
+"""
+Non-blocking logging.
+
+Records are handed to a bounded queue on the calling thread and written by
+a QueueListener thread, so the event loop never waits on disk or stdout.
+When the queue is full, records are dropped and counted rather than
+blocking. DEBUG records are sampled, and every record carries the request
+ID of the HTTP request it was logged under.
+"""
+
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import random
 import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+
+REQUEST_ID_HEADER = b"x-request-id"
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+def get_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+class ContextFilter(logging.Filter):
+    """Tag records with the current request ID and sample DEBUG records"""
+
+    def __init__(self, debug_sample_rate: float = 1.0):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.DEBUG and self.debug_sample_rate < 1.0:
+            if random.random() >= self.debug_sample_rate:
+                return False
+        record.request_id = request_id_var.get()
+        return True
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now (args may be mutated later), but leave
+        # formatting to the listener thread
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class RequestIdMiddleware:
+    """ASGI middleware binding a request ID (from X-Request-ID or generated) to the request's logs"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
+
+def _build_handlers(per_process: bool = False) -> list:
+    formatter = JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    path = settings.LOG_FILE
+    if path:
+        if per_process:
+            # Rotating handlers in several processes race on rollover and lose lines. Workers append
+            # to the shared file and reopen it when an external tool (e.g. logrotate) moves it away
+            handlers.append(logging.handlers.WatchedFileHandler(path))
+        elif settings.LOG_ROTATION == "time":
+            handlers.append(logging.handlers.TimedRotatingFileHandler(
+                path,
+                when=settings.LOG_ROTATE_WHEN,
+                backupCount=settings.LOG_BACKUP_COUNT,
+                utc=True
+            ))
+        else:
+            handlers.append(logging.handlers.RotatingFileHandler(
+                path,
+                maxBytes=settings.LOG_MAX_BYTES,
+                backupCount=settings.LOG_BACKUP_COUNT
+            ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+queue_handler: Optional[DroppingQueueHandler] = None
+listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging(per_process: bool = False):
+    """
+    Route the root logger through a bounded queue to a background writer thread.
+
+    Worker processes (`per_process`) append to LOG_FILE without rotating it.
+    """
+    global queue_handler, listener
+    stop_logging()
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(ContextFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+    listener = logging.handlers.QueueListener(
+        queue_handler.queue,
+        *_build_handlers(per_process),
+        respect_handler_level=True
+    )
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL)
+    # httpx logs every provider request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    listener.start()
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global listener
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        listener = None
+
+def _reinit_after_fork():
+    # The parent's writer thread does not exist in a forked child and its queue lock
+    # may have been held at fork time, so abandon both rather than stopping them
+    global listener
+    listener = None
+    setup_logging(per_process=True)
+
+# Spawned workers (uvicorn --workers without gunicorn) import this module afresh
+setup_logging(per_process=multiprocessing.parent_process() is not None)
+atexit.register(stop_logging)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('solaris_backend.log')
-    ]
-)
+# Forked workers (Celery prefork, multi-process servers) need their own writer thread
+os.register_at_fork(after_in_child=_reinit_after_fork)
 
 logger = logging.getLogger(__name__)
@@ -0,0 +1,322 @@
+"""
+Prometheus-compatible metrics.
+
+Metrics are plain in-process values updated from the event loop thread, so
+the hot path is a dict lookup plus an add: no locks and no per-request
+allocation once a label set has been seen. Values that already live
+elsewhere (cache and limiter counters) are copied in by collectors at
+scrape time instead of being double-counted on the hot path.
+"""
+
+import asyncio
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core import logging as app_logging
+from app.core.config import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROVIDER_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Starlette appends the charset for text responses
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._default = self.labels()
+        registry.register(self)
+
+    def labels(self, *values: str):
+        """Get the child for a label set, creating it on first use"""
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        return _Value()
+
+    def _label_text(self, values: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for values, child in list(self._children.items()):
+            lines.append(f"{self.name}{self._label_text(values)} {_format(child.value)}")
+        return lines
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format(bound)
+                bucket_labels = self._label_text(values, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(values)} {_format(child.sum)}")
+            lines.append(f"{self.name}_count{self._label_text(values)} {child.count}")
+        return lines
+
+class MetricsRegistry:
+    """Holds metrics and scrape-time collectors"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def register_collector(self, collector: Callable[[], None]):
+        """Register a callback that refreshes metric values right before each scrape"""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+registry = MetricsRegistry()
+
+# HTTP
+HTTP_REQUESTS = Counter("solaris_http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_DURATION = Histogram("solaris_http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("solaris_http_requests_in_flight", "HTTP requests currently being served")
+
+# Admission control
+ADMISSION_WAIT = Histogram("solaris_admission_wait_seconds", "Time /chat requests waited for a processing slot", ("priority",))
+
+# Providers
+PROVIDER_DURATION = Histogram(
+    "solaris_provider_request_duration_seconds",
+    "AI provider call latency",
+    ("provider", "model", "outcome"),
+    buckets=PROVIDER_BUCKETS
+)
+PROVIDER_IN_FLIGHT = Gauge("solaris_provider_requests_in_flight", "AI provider calls in flight", ("provider",))
+PROVIDER_TOKENS = Counter("solaris_provider_tokens_total", "Tokens reported in AIResponse.usage", ("provider", "model", "kind"))
+
+# Dependencies and runtime
+REDIS_DURATION = Histogram("solaris_redis_duration_seconds", "Redis round-trip time", ("operation",), buckets=FAST_BUCKETS)
+EVENT_LOOP_LAG = Histogram("solaris_event_loop_lag_seconds", "Event loop scheduling lag", buckets=FAST_BUCKETS)
+THREADPOOL_THREADS = Gauge("solaris_threadpool_threads", "Threads in the event loop's default executor")
+THREADPOOL_QUEUE = Gauge("solaris_threadpool_queue_depth", "Work items waiting for the default executor")
+LOG_RECORDS_DROPPED = Counter("solaris_log_records_dropped_total", "Log records dropped because the log queue was full")
+
+# Copied from component counters at scrape time
+CACHE_EVENTS = Counter("solaris_response_cache_events_total", "Response cache lookups by outcome", ("event",))
+RATE_LIMIT_EVENTS = Counter("solaris_rate_limit_events_total", "Provider rate limiter events", ("event",))
+CONCURRENCY_LIMIT = Gauge("solaris_provider_concurrency_limit", "Adaptive provider concurrency limit", ("provider", "model"))
+ROUTING_EVENTS = Counter("solaris_routing_events_total", "Hedging and failover events", ("event",))
+ADMISSION_EVENTS = Counter("solaris_admission_events_total", "Admission control outcomes", ("event",))
+ADMISSION_QUEUE_DEPTH = Gauge("solaris_admission_queue_depth", "Requests waiting for a processing slot", ("priority",))
+ADMISSION_IN_FLIGHT = Gauge("solaris_admission_in_flight", "Requests holding a processing slot")
+CIRCUIT_STATE = Gauge("solaris_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("name",))
+CIRCUIT_ERROR_RATE = Gauge("solaris_circuit_error_rate", "Fraction of calls through a circuit that failed recently", ("name",))
+
+def record_usage(provider: str, model: str, usage: dict):
+    """Add token counts from an AIResponse.usage dict"""
+    if not usage:
+        return
+    for kind in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        value = usage.get(kind)
+        if value:
+            PROVIDER_TOKENS.labels(provider, model, kind).inc(value)
+
+# The event loop's default executor, installed by init_default_executor. The
+# loop's own reference is private and uvloop does not expose it, so the
+# thread-pool gauges read this one.
+default_executor: Optional[ThreadPoolExecutor] = None
+
+def init_default_executor():
+    """Install our own default executor on the running loop"""
+    global default_executor
+    if default_executor is None:
+        default_executor = ThreadPoolExecutor(
+            max_workers=settings.THREADPOOL_MAX_WORKERS,
+            thread_name_prefix="solaris-default"
+        )
+    asyncio.get_running_loop().set_default_executor(default_executor)
+
+def shutdown_default_executor():
+    global default_executor
+    if default_executor is not None:
+        default_executor.shutdown(wait=False)
+        default_executor = None
+
+def collect_runtime():
+    """Refresh thread-pool gauges and log queue drops"""
+    if app_logging.queue_handler is not None:
+        LOG_RECORDS_DROPPED.labels().set(app_logging.queue_handler.dropped)
+
+    executor = default_executor
+    if executor is None:
+        THREADPOOL_THREADS.set(0)
+        THREADPOOL_QUEUE.set(0)
+        return
+    THREADPOOL_THREADS.set(len(executor._threads))
+    THREADPOOL_QUEUE.set(executor._work_queue.qsize())
+
+registry.register_collector(collect_runtime)
+
+def preallocate_routes(app):
+    """Create per-route label sets up front so the first requests do not allocate them"""
+    for route in app.routes:
+        for method in getattr(route, "methods", None) or ():
+            HTTP_DURATION.labels(method, route.path)
+            HTTP_REQUESTS.labels(method, route.path, "200")
+
+def preallocate_providers(models: Dict[str, Sequence[str]]):
+    """Create provider label sets for known provider/model pairs"""
+    for provider, provider_models in models.items():
+        PROVIDER_IN_FLIGHT.labels(provider)
+        for model in provider_models:
+            for outcome in ("success", "error"):
+                PROVIDER_DURATION.labels(provider, model, outcome)
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, status and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # The router stores the matched route on the scope; use its template to bound cardinality
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            HTTP_DURATION.labels(method, path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, path, str(status)).inc()
+
+class EventLoopMonitor:
+    """Background task sampling event loop lag"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.observe(max(0.0, loop.time() - started - self.interval))
+
+loop_monitor = EventLoopMonitor()
@@ -0,0 +1,43 @@
+"""
+orjson parsing for JSON request bodies.
+
+FastAPI parses JSON bodies with the standard library before validating
+them. Routes using ORJSONRoute swap only that parse for orjson, falling back
+to the standard library for malformed JSON so error responses are
+unchanged. orjson reads integers wider than 64 bits as floats; on these
+routes such a value only survives validation inside free-form dicts
+(context metadata, analysis parameters), where it arrives as a float.
+
+Validation still builds the pydantic models and is most of the decoding
+time on long histories; benchmarks/request_decoding_benchmark.py times it
+against model_validate_json and a cached TypeAdapter, which are no faster on
+the pinned pydantic.
+"""
+
+import json
+from typing import Any, Callable
+
+import orjson
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+class ORJSONRequest(Request):
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            try:
+                self._json = orjson.loads(body)
+            except orjson.JSONDecodeError:
+                self._json = json.loads(body)
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    """APIRoute whose JSON bodies are parsed with orjson"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return route_handler
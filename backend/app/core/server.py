@@ -0,0 +1,147 @@
+"""
+Server launch modes.
+
+Production runs gunicorn as a process manager with uvicorn workers: the app
+is imported once in the master (preload) and forked into one worker per
+CPU, so code and read-only data are shared copy-on-write. Each worker runs
+the FastAPI lifespan itself, which opens its own Redis, database and
+provider HTTP connections. SIGTERM stops accepting connections and lets
+in-flight requests, including streams, finish for SERVER_GRACEFUL_TIMEOUT
+seconds. Development runs a single reloading uvicorn process.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import logger
+
+APP_PATH = "main:app"
+WORKER_CLASS = "app.core.uvicorn_worker.SolarisUvicornWorker"
+
+def get_worker_count() -> int:
+    """SERVER_WORKERS, or one worker per CPU this process may run on"""
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+def uvicorn_config_kwargs() -> Dict[str, Any]:
+    """uvicorn Config options shared by both process managers"""
+    fast_loop = sys.platform != "win32" and importlib.util.find_spec("uvloop") is not None
+    return {
+        "loop": "uvloop" if fast_loop else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") is not None else "h11",
+        "lifespan": "on",
+        "limit_concurrency": settings.SERVER_LIMIT_CONCURRENCY,
+        # Leave a margin so uvicorn cancels stragglers before the process manager kills it
+        "timeout_graceful_shutdown": max(1, settings.SERVER_GRACEFUL_TIMEOUT - 5),
+    }
+
+def gunicorn_options(host: str, port: int, workers: int) -> Dict[str, Any]:
+    return {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": WORKER_CLASS,
+        "preload_app": True,
+        "backlog": settings.SERVER_BACKLOG,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "timeout": settings.SERVER_WORKER_TIMEOUT,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "post_fork": post_fork,
+    }
+
+def reset_process_state():
+    """
+    Drop connection state inherited from the parent process.
+
+    Sockets, connection pools and event-loop-bound clients cannot be shared
+    across fork. Preloading only imports modules (nothing connects until the
+    lifespan runs), so this is normally a no-op; it guards against state
+    created in the master by accident.
+    """
+    from app.core import cache, database, http_client
+    from app.services.ai_service import ai_service
+
+    cache.redis_client = None
+    cache._redis = None
+    cache._probe = None
+    cache._monitor_task = None
+    http_client.http_clients.clear()
+    database.engine = None
+    database.async_session_factory = None
+    ai_service.openai_client = None
+    ai_service.gemini_client = None
+
+def post_fork(server, worker):
+    reset_process_state()
+
+def prepare_database():
+    """Create tables once in the parent so workers starting together do not race on DDL"""
+    import asyncio
+    from app.core.database import close_db, init_db
+
+    async def create_tables():
+        await init_db()
+        await close_db()
+
+    asyncio.run(create_tables())
+
+def run_production(host: str, port: int, workers: int):
+    """Preloaded multi-worker server; falls back to uvicorn's supervisor without gunicorn"""
+    prepare_database()
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        logger.warning("gunicorn not installed (e.g. on Windows); running uvicorn workers without preloading")
+        import uvicorn
+        uvicorn.run(
+            APP_PATH,
+            host=host,
+            port=port,
+            workers=workers,
+            backlog=settings.SERVER_BACKLOG,
+            timeout_keep_alive=settings.SERVER_KEEPALIVE,
+            **uvicorn_config_kwargs()
+        )
+        return
+
+    class Application(BaseApplication):
+        def __init__(self, options: Dict[str, Any]):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from main import app
+            return app
+
+    Application(gunicorn_options(host, port, workers)).run()
+
+def run_development(host: str, port: int):
+    """Single auto-reloading process"""
+    import uvicorn
+    uvicorn.run(APP_PATH, host=host, port=port, reload=True, log_level="info")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run the Solaris AI backend")
+    parser.add_argument("--reload", action="store_true", help="development mode: one auto-reloading process")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="default: SERVER_WORKERS or the CPU count")
+    args = parser.parse_args(argv)
+
+    if args.reload:
+        run_development(args.host, args.port)
+    else:
+        run_production(args.host, args.port, args.workers or get_worker_count())
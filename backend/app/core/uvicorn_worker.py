@@ -0,0 +1,14 @@
+"""
+gunicorn worker class for the production server (see app.core.server).
+
+Kept separate from app.core.server because importing it requires gunicorn.
+"""
+
+from uvicorn.workers import UvicornWorker
+
+from app.core.server import uvicorn_config_kwargs
+
+class SolarisUvicornWorker(UvicornWorker):
+    """UvicornWorker using uvloop/httptools and the server settings"""
+
+    CONFIG_KWARGS = uvicorn_config_kwargs()
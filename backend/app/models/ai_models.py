@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -36,6 +36,14 @@ class AIRequest(BaseModel):
     model: Optional[str] = None
     temperature: Optional[float] = Field(default=0.7, ge=0.0, le=2.0)
     max_tokens: Optional[int] = Field(default=1000, ge=1, le=4000)
+    conversation_id: Optional[str] = None
+    routing: Optional[Literal["direct", "failover", "hedged"]] = None
+
+class AIBatchChatRequest(BaseModel):
+    """Batch chat request model"""
+    items: List[AIRequest] = Field(min_length=1)
+    concurrency: Optional[int] = Field(default=None, ge=1)
+    item_timeout: Optional[float] = Field(default=None, gt=0)
 
 class AIResponse(BaseModel):
     """AI service response model"""
@@ -46,6 +54,14 @@ class AIResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     request_id: Optional[str] = None
 
+class AIBatchChatResult(BaseModel):
+    """One NDJSON line of a batch chat response"""
+    index: int
+    response: Optional[AIResponse] = None
+    error: Optional[str] = None
+    status_code: int = 200
+    retry_after: Optional[int] = None
+
 class AIProviderConfig(BaseModel):
     """AI provider configuration model"""
     provider: AIProvider
@@ -72,6 +88,12 @@ class AIAnalysisRequest(BaseModel):
     analysis_type: Literal["sentiment", "topics", "recommendations", "progress"]
     parameters: Optional[dict] = None
 
+class AIBatchAnalysisRequest(BaseModel):
+    """AI batch analysis request model"""
+    conversation_ids: List[str] = Field(min_length=1)
+    analysis_type: Literal["sentiment", "topics", "recommendations", "progress"]
+    parameters: Optional[dict] = None
+
 class AIAnalysisResponse(BaseModel):
     """AI analysis response model"""
     analysis_type: str
@@ -80,3 +102,10 @@ class AIAnalysisResponse(BaseModel):
     recommendations: List[str]
     confidence_score: float = Field(ge=0.0, le=1.0)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+class AIBatchAnalysisResponse(BaseModel):
+    """AI batch analysis response model"""
+    analysis_type: str
+    results: Dict[str, dict]
+    errors: Dict[str, str] = {}
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,189 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.models.ai_models import ConversationDomain
+from app.core import metrics
+from app.core.config import settings
+
+PRIORITY_CLASSES = {"high": 0, "normal": 1, "low": 2}
+PRIORITY_NAMES = {value: name for name, value in PRIORITY_CLASSES.items()}
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of being queued or served"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Server overloaded ({reason}), retry after {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+@dataclass(order=True)
+class _Waiter:
+    # Highest priority first, then earliest deadline, then arrival order
+    priority: int
+    deadline: float
+    seq: int
+    future: asyncio.Future = field(compare=False)
+
+class AdmissionController:
+    """
+    Bounded, prioritized admission in front of request processing.
+
+    At most `max_concurrent` requests are processed at once; the rest wait
+    in a queue of at most `queue_size`, ordered by priority class and then
+    deadline. Requests are shed with AdmissionRejected when the queue is
+    full (a higher-priority arrival evicts the lowest-priority waiter
+    instead), when the estimated wait already exceeds their deadline, or
+    when their deadline passes while queued.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = settings.ADMISSION_MAX_CONCURRENT,
+        queue_size: int = settings.ADMISSION_QUEUE_SIZE,
+        queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT
+    ):
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        # Moving average of how long admitted requests hold their slot
+        self._service_time = 1.0
+        self.stats = {
+            "admitted": 0,
+            "queued": 0,
+            "shed_queue_full": 0,
+            "shed_deadline": 0,
+            "evicted": 0,
+            "expired": 0,
+        }
+
+    def resolve_priority(self, domain: ConversationDomain, header: Optional[str] = None) -> int:
+        """Priority class from the caller's header, else the domain's configured class"""
+        name = (header or "").strip().lower()
+        if name not in PRIORITY_CLASSES:
+            name = settings.ADMISSION_DOMAIN_PRIORITIES.get(domain.value, settings.ADMISSION_DEFAULT_PRIORITY)
+        return PRIORITY_CLASSES.get(name, PRIORITY_CLASSES["normal"])
+
+    @asynccontextmanager
+    async def admit(self, priority: int, timeout: Optional[float] = None):
+        """
+        Hold a processing slot for the duration of the block.
+
+        `timeout` is the caller's remaining deadline in seconds; the queue
+        wait is capped at `queue_timeout` either way.
+        """
+        if self.max_concurrent <= 0:
+            yield
+            return
+
+        timeout = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        start = time.monotonic()
+        await self._acquire(priority, start + timeout)
+        admitted = time.monotonic()
+        metrics.ADMISSION_WAIT.labels(PRIORITY_NAMES[priority]).observe(admitted - start)
+        self.stats["admitted"] += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._service_time += 0.1 * (time.monotonic() - admitted - self._service_time)
+            self._wake()
+
+    def retry_after(self) -> float:
+        """Seconds until the current queue is expected to drain"""
+        return max(1.0, math.ceil((len(self._queue) + 1) * self._service_time / self.max_concurrent))
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            **self.stats,
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": self.queue_depth(),
+            "service_time": round(self._service_time, 3),
+        }
+
+    def queue_depth(self) -> Dict[str, int]:
+        depth = {name: 0 for name in PRIORITY_CLASSES}
+        for waiter in self._queue:
+            depth[PRIORITY_NAMES[waiter.priority]] += 1
+        return depth
+
+    async def _acquire(self, priority: int, deadline: float):
+        now = time.monotonic()
+        if deadline <= now:
+            self.stats["expired"] += 1
+            raise AdmissionRejected("deadline passed", self.retry_after())
+        if self.in_flight < self.max_concurrent and not self._queue:
+            self.in_flight += 1
+            return
+
+        # Work that cannot start before its deadline is rejected now rather than after waiting
+        ahead = sum(1 for waiter in self._queue if waiter.priority <= priority)
+        if (ahead + 1) * self._service_time / self.max_concurrent > deadline - now:
+            self.stats["shed_deadline"] += 1
+            raise AdmissionRejected("deadline unreachable", self.retry_after())
+
+        if len(self._queue) >= self.queue_size:
+            worst = max(self._queue)
+            if worst.priority <= priority:
+                self.stats["shed_queue_full"] += 1
+                raise AdmissionRejected("queue full", self.retry_after())
+            self._remove(worst)
+            self.stats["evicted"] += 1
+            worst.future.set_exception(AdmissionRejected("evicted by higher priority", self.retry_after()))
+
+        waiter = _Waiter(priority, deadline, next(self._seq), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, waiter)
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), deadline - now)
+        except AdmissionRejected:
+            raise
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.stats["expired"] += 1
+            raise AdmissionRejected("deadline passed", self.retry_after())
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def _wake(self):
+        now = time.monotonic()
+        while self._queue and self.in_flight < self.max_concurrent:
+            waiter = heapq.heappop(self._queue)
+            if waiter.future.done():
+                continue
+            if waiter.deadline <= now:
+                # The client has given up by now; do not start its work
+                self.stats["expired"] += 1
+                waiter.future.set_exception(AdmissionRejected("deadline passed", self.retry_after()))
+                continue
+            self.in_flight += 1
+            waiter.future.set_result(True)
+
+    def _abandon(self, waiter: _Waiter):
+        if waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+            # A slot was handed over just as we gave up; pass it on
+            self.in_flight -= 1
+            self._wake()
+        else:
+            waiter.future.cancel()
+            self._remove(waiter)
+
+    def _remove(self, waiter: _Waiter):
+        try:
+            self._queue.remove(waiter)
+        except ValueError:
+            return
+        heapq.heapify(self._queue)
+
+# Global admission controller instance
+admission_controller = AdmissionController()
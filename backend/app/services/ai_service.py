@@ -1,87 +1,360 @@
 import asyncio
-import httpx
-from typing import List, Optional, Dict, Any
-import openai
-import google.generativeai as genai
+from contextlib import asynccontextmanager, nullcontext
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple, Union
 from datetime import datetime
 import uuid
+import time
 
 from app.models.ai_models import (
     AIRequest, AIResponse, AIMessage, ConversationContext, 
-    AIProvider, AIProviderConfig, ConversationDomain
+    AIProvider, AIProviderConfig, ConversationDomain, ConversationSession
 )
 from app.core.config import settings
-from app.core.cache import redis_client
 from app.core.logging import logger
+from app.core.http_client import get_http_client
+from app.services.gemini_client import GEMINI_API_URL, GeminiClient
+from app.services.gemini_models import GeminiModelHandle, GeminiModelPool, to_contents
+from app.services.context_manager import ContextWindowManager
+from app.services.topic_engine import TopicEngine
+from app.services.rate_limiter import ProviderRateLimiter, RateLimitExceeded
+from app.services.provider_router import ProviderRouter
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, breakers, get_breaker
+from app.core import metrics
+from app.services.response_cache import ResponseCache, generate_cache_key
+from app.services.admission import admission_controller
+
+DEFAULT_MODELS = {
+    AIProvider.OPENAI: "gpt-4o-mini",
+    AIProvider.GEMINI: "gemini-1.5-flash",
+}
+
+CIRCUIT_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
 
 class AIService:
     """AI service for handling OpenAI and Gemini interactions"""
     
     def __init__(self):
+        # Construction stays cheap: provider SDKs and clients are created on first use
+        # (or by initialize_clients when pre-warming), so importing this module is fast
         self.openai_client = None
         self.gemini_client = None
-        self._initialize_clients()
+        self.gemini_models = GeminiModelPool()
+        self.response_cache = ResponseCache()
+        self.context_manager = ContextWindowManager()
+        self.semantic_cache = self._create_semantic_cache() if settings.SEMANTIC_CACHE_ENABLED else None
+        self._topic_engine: Optional[TopicEngine] = None
+        self._analytics = None
+        self.rate_limiter = ProviderRateLimiter()
+        self.router = ProviderRouter(self._call_provider, self.is_provider_available, DEFAULT_MODELS)
+    
+    @staticmethod
+    def _create_semantic_cache():
+        # NumPy is only needed when the semantic cache is enabled
+        from app.services.semantic_cache import SemanticCache
+        return SemanticCache()
     
-    def _initialize_clients(self):
-        """Initialize AI provider clients"""
+    @property
+    def topic_engine(self) -> TopicEngine:
+        if self._topic_engine is None:
+            self._topic_engine = TopicEngine.from_settings()
+        return self._topic_engine
+    
+    @property
+    def analytics(self):
+        if self._analytics is None:
+            # NumPy is only loaded once analytics are first requested
+            from app.services.analytics import AnalyticsEngine
+            self._analytics = AnalyticsEngine()
+        return self._analytics
+    
+    def initialize_clients(self):
+        """Pre-warm: create configured provider clients now rather than on first request"""
         if settings.OPENAI_API_KEY:
-            openai.api_key = settings.OPENAI_API_KEY
-            self.openai_client = openai
-        
+            self._get_openai_client()
         if settings.GEMINI_API_KEY:
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            self.gemini_client = genai
+            self._get_gemini_client()
+        self.topic_engine  # builds the keyword automaton
+    
+    def _get_openai_client(self):
+        """OpenAI client on the shared pooled HTTP client, importing the SDK on first use"""
+        if self.openai_client is None:
+            if not settings.OPENAI_API_KEY:
+                raise ValueError("OpenAI client not initialized")
+            import openai  # Deferred: the SDK dominates the backend's import time
+            self.openai_client = openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL,
+                http_client=get_http_client("openai"),
+                timeout=settings.OPENAI_TIMEOUT,
+                max_retries=settings.OPENAI_MAX_RETRIES
+            )
+        return self.openai_client
+    
+    def _get_gemini_client(self) -> GeminiClient:
+        """Gemini client on the shared pooled HTTP client, created on first use"""
+        if self.gemini_client is None:
+            if not settings.GEMINI_API_KEY:
+                raise ValueError("Gemini client not initialized")
+            self.gemini_client = GeminiClient(
+                api_key=settings.GEMINI_API_KEY,
+                http_client=get_http_client("gemini"),
+                base_url=settings.GEMINI_BASE_URL or GEMINI_API_URL
+            )
+        return self.gemini_client
+    
+    def prepare_request(self, request: AIRequest) -> Tuple[AIRequest, str]:
+        """Fit a request to its context window and compute its response cache key"""
+        request = self._fit_context(request)
+        return request, self._generate_cache_key(request)
+    
+    async def process_request(
+        self,
+        request: AIRequest,
+        priority: Optional[int] = None,
+        admission_timeout: Optional[float] = None,
+        timeout: Optional[float] = None
+    ) -> AIResponse:
+        """
+        Process AI request and return response.
+        
+        With a `priority` class, a request that has to go to the provider
+        first waits (at most `admission_timeout`) for admission; cache hits
+        and callers sharing an identical in-flight request do not take a
+        slot. `timeout` bounds the provider call once admitted.
+        """
+        request, cache_key = self.prepare_request(request)
+        return await self._respond(request, cache_key, priority, admission_timeout, timeout)
+    
+    async def _respond(
+        self,
+        request: AIRequest,
+        cache_key: str,
+        priority: Optional[int] = None,
+        admission_timeout: Optional[float] = None,
+        timeout: Optional[float] = None
+    ) -> AIResponse:
+        """process_request for a request prepare_request has already fitted"""
+        try:
+            # Identical concurrent requests share a single provider call
+            return await self.response_cache.get_or_load(
+                cache_key,
+                lambda: self._load_response(request, priority, admission_timeout, timeout)
+            )
+            
+        except Exception as e:
+            logger.error(f"Error processing AI request: {str(e)}")
+            raise
+    
+    async def process_batch(
+        self,
+        requests: List[AIRequest],
+        concurrency: int,
+        item_timeout: float,
+        priority: Optional[str] = None,
+        admission_timeout: Optional[float] = None
+    ) -> AsyncIterator[Tuple[List[int], Union[AIResponse, Exception]]]:
+        """
+        Process requests with at most `concurrency` in flight.
+        
+        Yields (indexes, response or error) as each request completes, in
+        completion order. Identical requests run once and are reported for
+        every index they appeared at. Cache misses go through admission
+        control like /chat requests, at the `priority` class (else their
+        domain's), waiting at most `admission_timeout` for a slot. Each
+        provider call gets `item_timeout` seconds once admitted.
+        """
+        prepared = [self.prepare_request(request) for request in requests]
+        groups: Dict[str, List[int]] = {}
+        for index, (_, cache_key) in enumerate(prepared):
+            groups.setdefault(cache_key, []).append(index)
+        
+        # One round trip for every cached answer before fanning out the misses
+        cached = await self.response_cache.get_many(list(groups))
+        for cache_key, response in cached.items():
+            yield groups.pop(cache_key), response
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run(indexes: List[int]) -> Tuple[List[int], Union[AIResponse, Exception]]:
+            request, cache_key = prepared[indexes[0]]
+            async with semaphore:
+                try:
+                    return indexes, await self._respond(
+                        request,
+                        cache_key,
+                        admission_controller.resolve_priority(request.context.domain, priority),
+                        admission_timeout,
+                        item_timeout
+                    )
+                except Exception as e:
+                    return indexes, e
+        
+        tasks = [asyncio.create_task(run(indexes)) for indexes in groups.values()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The client went away or the consumer stopped early
+            for task in tasks:
+                task.cancel()
+    
+    async def warm_response(self, request: AIRequest, cache_key: str, ttl: Optional[int] = None) -> AIResponse:
+        """Generate and cache a response for a prepared request ahead of demand"""
+        response = await self.router.call(request)
+        await self._cache_response(cache_key, response, ttl)
+        return response
+    
+    async def _load_response(
+        self,
+        request: AIRequest,
+        priority: Optional[int] = None,
+        admission_timeout: Optional[float] = None,
+        timeout: Optional[float] = None
+    ) -> AIResponse:
+        """Answer an exact-cache miss from the semantic cache or, once admitted, the provider"""
+        model = request.model or DEFAULT_MODELS[request.provider]
+        if self.semantic_cache:
+            cached_response = self.semantic_cache.lookup(request, model)
+            if cached_response:
+                return cached_response
+        
+        admission = nullcontext() if priority is None else admission_controller.admit(priority, admission_timeout)
+        async with admission:
+            response = await asyncio.wait_for(self.router.call(request), timeout)
+        
+        if self.semantic_cache:
+            self.semantic_cache.add(request, model, response)
+        return response
+    
+    async def _call_provider(self, request: AIRequest) -> AIResponse:
+        """Dispatch request to the selected provider within its rate and concurrency limits"""
+        if request.provider == AIProvider.OPENAI:
+            call = self._call_openai
+        elif request.provider == AIProvider.GEMINI:
+            call = self._call_gemini
+        else:
+            raise ValueError(f"Unsupported AI provider: {request.provider}")
+        
+        model = request.model or DEFAULT_MODELS[request.provider]
+        # Our own queue rejections say nothing about provider health
+        async with get_breaker(request.provider.value).guard(ignore=(RateLimitExceeded,)):
+            async with self.rate_limiter.limit(request.provider, model):
+                async with self._observe_provider(request.provider.value, model) as observation:
+                    response = await call(request)
+                    observation["usage"] = response.usage
+                    return response
     
-    async def process_request(self, request: AIRequest) -> AIResponse:
-        """Process AI request and return response"""
-        request_id = str(uuid.uuid4())
+    @asynccontextmanager
+    async def _observe_provider(self, provider: str, model: str):
+        """Record in-flight, latency and token metrics for one provider call"""
+        observation: Dict[str, Any] = {}
+        in_flight = metrics.PROVIDER_IN_FLIGHT.labels(provider)
+        in_flight.inc()
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            yield observation
+            outcome = "success"
+        finally:
+            in_flight.dec()
+            metrics.PROVIDER_DURATION.labels(provider, model, outcome).observe(time.perf_counter() - start)
+            if outcome == "success":
+                metrics.record_usage(provider, model, observation.get("usage"))
+    
+    def collect_metrics(self):
+        """Copy component counters into the metrics registry at scrape time"""
+        for event, value in self.response_cache.stats.items():
+            metrics.CACHE_EVENTS.labels(event).set(value)
+        for event, value in self.rate_limiter.stats.items():
+            metrics.RATE_LIMIT_EVENTS.labels(event).set(value)
+        for (provider, model), limiter in self.rate_limiter._concurrency.items():
+            metrics.CONCURRENCY_LIMIT.labels(provider, model).set(int(limiter.limit))
+        for event, value in self.router.stats.items():
+            metrics.ROUTING_EVENTS.labels(event).set(value)
+        for event, value in admission_controller.stats.items():
+            metrics.ADMISSION_EVENTS.labels(event).set(value)
+        for priority, depth in admission_controller.queue_depth().items():
+            metrics.ADMISSION_QUEUE_DEPTH.labels(priority).set(depth)
+        metrics.ADMISSION_IN_FLIGHT.set(admission_controller.in_flight)
+        for name, breaker in breakers.items():
+            metrics.CIRCUIT_STATE.labels(name).set(CIRCUIT_STATE_VALUES[breaker.state])
+            metrics.CIRCUIT_ERROR_RATE.labels(name).set(breaker.error_rate()[1])
+    
+    def is_provider_available(self, provider: AIProvider) -> bool:
+        """Whether a client is configured for the provider"""
+        if provider == AIProvider.OPENAI:
+            return self.openai_client is not None or bool(settings.OPENAI_API_KEY)
+        if provider == AIProvider.GEMINI:
+            return self.gemini_client is not None or bool(settings.GEMINI_API_KEY)
+        return False
+    
+    def _fit_context(self, request: AIRequest) -> AIRequest:
+        """Trim conversation history to the model's prompt token budget"""
+        model = request.model or DEFAULT_MODELS[request.provider]
+        return self.context_manager.fit_request(
+            request,
+            model,
+            self._build_system_prompt(request.context)
+        )
+    
+    async def stream_request(self, request: AIRequest) -> AsyncIterator[Union[str, AIResponse]]:
+        """
+        Stream response text deltas as they arrive from the provider.
         
-        # Check cache first
-        cache_key = self._generate_cache_key(request)
+        The final item yielded is the assembled AIResponse, which has already
+        been written to the response cache. Cache hits yield the full content
+        as a single delta.
+        """
+        request, cache_key = self.prepare_request(request)
         cached_response = await self._get_cached_response(cache_key)
+        if not cached_response and self.semantic_cache:
+            model = request.model or DEFAULT_MODELS[request.provider]
+            cached_response = self.semantic_cache.lookup(request, model)
         if cached_response:
-            return cached_response
+            yield cached_response.content
+            yield cached_response
+            return
+        
+        if request.provider == AIProvider.OPENAI:
+            stream = self._stream_openai(request)
+        elif request.provider == AIProvider.GEMINI:
+            stream = self._stream_gemini(request)
+        else:
+            raise ValueError(f"Unsupported AI provider: {request.provider}")
         
         try:
-            if request.provider == AIProvider.OPENAI:
-                response = await self._call_openai(request)
-            elif request.provider == AIProvider.GEMINI:
-                response = await self._call_gemini(request)
-            else:
-                raise ValueError(f"Unsupported AI provider: {request.provider}")
-            
-            # Cache the response
-            await self._cache_response(cache_key, response)
+            chunks = []
+            response = None
+            model = request.model or DEFAULT_MODELS[request.provider]
+            async with get_breaker(request.provider.value).guard(ignore=(RateLimitExceeded,)), \
+                    self.rate_limiter.limit(request.provider, model), \
+                    self._observe_provider(request.provider.value, model) as observation:
+                async for item in stream:
+                    if isinstance(item, AIResponse):
+                        response = item
+                        observation["usage"] = item.usage
+                        continue
+                    chunks.append(item)
+                    yield item
             
-            return response
+            response.content = "".join(chunks)
+            await self._cache_response(cache_key, response)
+            if self.semantic_cache:
+                self.semantic_cache.add(request, request.model or DEFAULT_MODELS[request.provider], response)
+            yield response
             
         except Exception as e:
-            logger.error(f"Error processing AI request: {str(e)}")
+            logger.error(f"Error streaming AI request: {str(e)}")
             raise
     
     async def _call_openai(self, request: AIRequest) -> AIResponse:
         """Call OpenAI API"""
-        if not self.openai_client:
-            raise ValueError("OpenAI client not initialized")
+        client = self._get_openai_client()
         
         try:
-            # Prepare messages for OpenAI
-            messages = []
-            if request.context.domain != "general":
-                system_prompt = self._build_system_prompt(request.context)
-                messages.append({"role": "system", "content": system_prompt})
-            
-            for msg in request.messages:
-                messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
-            
-            # Make API call
-            response = await asyncio.to_thread(
-                self.openai_client.ChatCompletion.create,
-                model=request.model or "gpt-4o-mini",
-                messages=messages,
+            response = await client.chat.completions.create(
+                model=request.model or DEFAULT_MODELS[AIProvider.OPENAI],
+                messages=self._build_openai_messages(request),
                 temperature=request.temperature,
                 max_tokens=request.max_tokens
             )
@@ -90,7 +363,7 @@ class AIService:
                 content=response.choices[0].message.content,
                 model=response.model,
                 provider=AIProvider.OPENAI,
-                usage=response.usage.dict() if response.usage else None,
+                usage=response.usage.model_dump() if response.usage else None,
                 request_id=str(uuid.uuid4())
             )
             
@@ -98,32 +371,74 @@ class AIService:
             logger.error(f"OpenAI API error: {str(e)}")
             raise
     
+    async def _stream_openai(self, request: AIRequest) -> AsyncIterator[Union[str, AIResponse]]:
+        """Stream OpenAI chat completion deltas"""
+        client = self._get_openai_client()
+        
+        try:
+            model = request.model or DEFAULT_MODELS[AIProvider.OPENAI]
+            messages = self._build_openai_messages(request)
+            stream = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens,
+                stream=True,
+                # Usage arrives in a final chunk; the pinned SDK predates the stream_options argument
+                extra_body={"stream_options": {"include_usage": True}}
+            )
+            
+            usage = None
+            chunks = []
+            async for chunk in stream:
+                model = chunk.model or model
+                chunk_usage = getattr(chunk, "usage", None)
+                if chunk_usage:
+                    usage = chunk_usage if isinstance(chunk_usage, dict) else chunk_usage.model_dump()
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+            
+            if usage is None:
+                # Compatible servers may ignore stream_options
+                prompt = "\n\n".join(message["content"] for message in messages)
+                usage = self.context_manager.counter.usage(prompt, "".join(chunks), model)
+            
+            yield AIResponse(
+                content="",
+                model=model,
+                provider=AIProvider.OPENAI,
+                usage=usage,
+                request_id=str(uuid.uuid4())
+            )
+            
+        except Exception as e:
+            logger.error(f"OpenAI streaming error: {str(e)}")
+            raise
+    
     async def _call_gemini(self, request: AIRequest) -> AIResponse:
         """Call Gemini API"""
-        if not self.gemini_client:
-            raise ValueError("Gemini client not initialized")
+        client = self._get_gemini_client()
         
         try:
-            # Prepare prompt for Gemini
-            system_prompt = self._build_system_prompt(request.context)
-            conversation_prompt = self._format_conversation_for_gemini(request.messages)
-            full_prompt = f"{system_prompt}\n\n{conversation_prompt}"
+            model = request.model or DEFAULT_MODELS[AIProvider.GEMINI]
+            handle = self._get_gemini_handle(request, model)
+            contents = to_contents(request.messages)
             
-            # Make API call
-            model = self.gemini_client.GenerativeModel(
-                request.model or 'gemini-1.5-flash'
+            response = await client.generate_content(
+                model,
+                contents,
+                self._build_gemini_generation_config(request),
+                handle.system_instruction
             )
             
-            response = await asyncio.to_thread(
-                model.generate_content,
-                full_prompt
-            )
+            content = GeminiClient.extract_text(response)
             
             return AIResponse(
-                content=response.text,
-                model=request.model or 'gemini-1.5-flash',
+                content=content,
+                model=model,
                 provider=AIProvider.GEMINI,
-                usage={"total_tokens": len(full_prompt.split())},  # Approximate
+                usage=GeminiClient.extract_usage(response) or self._estimate_gemini_usage(handle, contents, content),
                 request_id=str(uuid.uuid4())
             )
             
@@ -131,6 +446,75 @@ class AIService:
             logger.error(f"Gemini API error: {str(e)}")
             raise
     
+    async def _stream_gemini(self, request: AIRequest) -> AsyncIterator[Union[str, AIResponse]]:
+        """Stream Gemini content chunks"""
+        client = self._get_gemini_client()
+        
+        try:
+            model = request.model or DEFAULT_MODELS[AIProvider.GEMINI]
+            handle = self._get_gemini_handle(request, model)
+            contents = to_contents(request.messages)
+            
+            usage = None
+            chunks = []
+            async for chunk in client.stream_generate_content(
+                model,
+                contents,
+                self._build_gemini_generation_config(request),
+                handle.system_instruction
+            ):
+                usage = GeminiClient.extract_usage(chunk) or usage
+                text = GeminiClient.extract_text(chunk)
+                if text:
+                    chunks.append(text)
+                    yield text
+            
+            content = "".join(chunks)
+            
+            yield AIResponse(
+                content="",
+                model=model,
+                provider=AIProvider.GEMINI,
+                usage=usage or self._estimate_gemini_usage(handle, contents, content),
+                request_id=str(uuid.uuid4())
+            )
+            
+        except Exception as e:
+            logger.error(f"Gemini streaming error: {str(e)}")
+            raise
+    
+    def _build_openai_messages(self, request: AIRequest) -> List[Dict[str, str]]:
+        """Build OpenAI chat messages, including the domain system prompt"""
+        messages = []
+        if request.context.domain != "general":
+            system_prompt = self._build_system_prompt(request.context)
+            messages.append({"role": "system", "content": system_prompt})
+        
+        for msg in request.messages:
+            messages.append({
+                "role": msg.role,
+                "content": msg.content
+            })
+        return messages
+    
+    def _get_gemini_handle(self, request: AIRequest, model: str) -> GeminiModelHandle:
+        """Pooled handle carrying the model's system instruction"""
+        return self.gemini_models.get(model, self._build_system_prompt(request.context))
+    
+    def _estimate_gemini_usage(self, handle: GeminiModelHandle, contents: List[Dict[str, Any]], completion: str) -> Dict[str, int]:
+        """Token usage from the tokenizer when Gemini does not report usageMetadata"""
+        prompt = "\n\n".join([handle.system_prompt] + [content["parts"][0]["text"] for content in contents])
+        return self.context_manager.counter.usage(prompt, completion, handle.model)
+    
+    def _build_gemini_generation_config(self, request: AIRequest) -> Dict[str, Any]:
+        """Map request sampling parameters to a Gemini generationConfig"""
+        config = {}
+        if request.temperature is not None:
+            config["temperature"] = request.temperature
+        if request.max_tokens is not None:
+            config["maxOutputTokens"] = request.max_tokens
+        return config
+    
     def _build_system_prompt(self, context: ConversationContext) -> str:
         """Build system prompt based on conversation context"""
         base_prompt = "You are Solaris, a helpful AI assistant designed to help with various domains. Be concise, helpful, and professional."
@@ -145,51 +529,29 @@ class AIService:
         
         return f"{base_prompt}\n\n{domain_prompts.get(context.domain.value, domain_prompts['general'])}"
     
-    def _format_conversation_for_gemini(self, messages: List[AIMessage]) -> str:
-        """Format conversation history for Gemini"""
-        formatted = []
-        for msg in messages:
-            role = "User" if msg.role == "user" else "Assistant"
-            formatted.append(f"{role}: {msg.content}")
-        return "\n\n".join(formatted)
-    
     def _generate_cache_key(self, request: AIRequest) -> str:
         """Generate cache key for request"""
-        # Create a hash of the request content for caching
-        content_hash = hash(str(request.messages) + str(request.context) + request.provider.value)
-        return f"ai_response:{content_hash}"
+        model = request.model or DEFAULT_MODELS[request.provider]
+        return generate_cache_key(request, model)
     
     async def _get_cached_response(self, cache_key: str) -> Optional[AIResponse]:
         """Get cached response if available"""
-        try:
-            cached = await redis_client.get(cache_key)
-            if cached:
-                return AIResponse.parse_raw(cached)
-        except Exception as e:
-            logger.warning(f"Cache retrieval error: {str(e)}")
-        return None
+        return await self.response_cache.get(cache_key)
     
-    async def _cache_response(self, cache_key: str, response: AIResponse, ttl: int = 3600):
+    async def _cache_response(self, cache_key: str, response: AIResponse, ttl: Optional[int] = None):
         """Cache response with TTL"""
-        try:
-            await redis_client.setex(cache_key, ttl, response.json())
-        except Exception as e:
-            logger.warning(f"Cache storage error: {str(e)}")
+        await self.response_cache.set(cache_key, response, ttl)
     
     async def analyze_conversation(self, messages: List[AIMessage], context: ConversationContext) -> Dict[str, Any]:
         """Analyze conversation for insights"""
         try:
-            # Simple analysis - can be enhanced with more sophisticated ML
-            analysis = {
-                "message_count": len(messages),
-                "user_messages": len([m for m in messages if m.role == "user"]),
-                "assistant_messages": len([m for m in messages if m.role == "assistant"]),
+            # Counts, length and topics come from a single pass over the messages
+            analysis = self.topic_engine.analyze(messages)
+            analysis.update({
                 "domain": context.domain.value,
-                "conversation_length": sum(len(m.content) for m in messages),
-                "topics": self._extract_topics(messages),
                 "sentiment": "positive",  # Placeholder - could use sentiment analysis
                 "recommendations": self._generate_recommendations(context.domain, messages)
-            }
+            })
             
             return analysis
             
@@ -197,22 +559,48 @@ class AIService:
             logger.error(f"Conversation analysis error: {str(e)}")
             return {"error": str(e)}
     
+    async def analyze_sessions(
+        self,
+        sessions: Dict[str, Tuple[ConversationSession, int]],
+        analysis_type: str
+    ) -> Dict[str, Any]:
+        """Analyze sessions (with their current message counts) from incrementally updated aggregates"""
+        aggregates = await self.analytics.refresh(sessions)
+        activity = await self.analytics.load_activity(aggregates.values()) if analysis_type == "progress" else None
+        return {
+            session_id: self.analytics.analyze(
+                aggregate,
+                analysis_type,
+                self._generate_recommendations(sessions[session_id][0].context.domain, []),
+                activity
+            )
+            for session_id, aggregate in aggregates.items()
+        }
+    
+    def record_conversation_messages(
+        self,
+        session_id: str,
+        messages: List[AIMessage],
+        message_count: int,
+        message_ids: List[int]
+    ):
+        """Keep analytics aggregates current as messages are appended"""
+        if self._analytics is not None and message_ids:
+            self._analytics.record_append(session_id, messages, message_count, message_ids[-1])
+    
+    async def analyze_conversations(
+        self,
+        conversations: List[Tuple[List[AIMessage], ConversationContext]]
+    ) -> List[Dict[str, Any]]:
+        """Analyze many conversations with the shared topic engine"""
+        return [
+            await self.analyze_conversation(messages, context)
+            for messages, context in conversations
+        ]
+    
     def _extract_topics(self, messages: List[AIMessage]) -> List[str]:
         """Extract main topics from conversation"""
-        # Simple topic extraction - could be enhanced with NLP
-        topics = []
-        for msg in messages:
-            content = msg.content.lower()
-            if "aws" in content:
-                topics.append("AWS")
-            if "ec2" in content or "lambda" in content or "s3" in content:
-                topics.append("AWS Services")
-            if "study" in content or "learn" in content:
-                topics.append("Learning")
-            if "project" in content:
-                topics.append("Project Management")
-        
-        return list(set(topics))
+        return self.topic_engine.extract_topics(messages)
     
     def _generate_recommendations(self, domain: ConversationDomain, messages: List[AIMessage]) -> List[str]:
         """Generate recommendations based on domain and conversation"""
@@ -0,0 +1,338 @@
+"""
+Conversation analytics.
+
+Messages are loaded into columnar NumPy arrays (one row per message) and
+reduced into one count vector per session. Vectors are kept in memory
+and extended as messages are appended, so re-analyzing a session only
+reads its new messages, by keyset on the last message id counted. Comparisons with a session's domain and user
+use the session and message counts of the conversation table, so every
+worker sees the same baseline whatever it has cached.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.ai_models import AIMessage, ConversationSession
+from app.core.config import settings
+from app.services.conversation_store import ActivityTotals, conversation_store
+from app.services.topic_engine import TopicEngine, load_taxonomy
+
+POSITIVE = "__positive__"
+NEGATIVE = "__negative__"
+
+# Matched like topic keywords (whole words, "*" marks a stem), in user messages only
+SENTIMENT_LEXICON: Dict[str, List[str]] = {
+    POSITIVE: [
+        "thank*", "great", "good", "helpful", "awesome", "excellent", "love", "perfect",
+        "nice", "clear", "clearer", "understand*", "passed", "progress*", "works", "solved",
+    ],
+    NEGATIVE: [
+        "confus*", "stuck", "frustrat*", "difficult*", "hard", "wrong", "fail", "fails", "failed",
+        "failing", "failure*", "error", "errors", "worried", "anxious", "overwhelm*", "lost",
+        "struggl*", "broken", "behind",
+    ],
+}
+
+TOPIC_RECOMMENDATIONS: Dict[str, str] = {
+    "AWS": "Map what you have covered to the exam guide's domains",
+    "AWS Services": "Build a small project that combines the services you have discussed",
+    "AWS Certification": "Take a timed practice exam to find weak areas",
+    "Learning": "Use spaced repetition to review what you have studied",
+    "Project Management": "Review open milestones and re-estimate remaining work",
+    "Finance": "Compare this month's spending against your budget",
+}
+
+# Count vector columns: message counts by role, total characters, sentiment hits, then one per topic
+COL_USER, COL_ASSISTANT, COL_OTHER, COL_CHARS, COL_POSITIVE, COL_NEGATIVE = range(6)
+TOPIC_OFFSET = 6
+ROLE_COLUMNS = {"user": COL_USER, "assistant": COL_ASSISTANT}
+
+@dataclass
+class SessionAggregate:
+    """Counts for the first `message_count` messages of a session, up to message id `last_message_id`"""
+    session_id: str
+    domain: str
+    user_id: Optional[str]
+    counts: np.ndarray
+    message_count: int = 0
+    last_message_id: int = 0
+    # Messages per day, keyed by proleptic Gregorian ordinal
+    daily: Dict[int, int] = field(default_factory=dict)
+
+@dataclass
+class Analysis:
+    results: Dict[str, Any]
+    insights: List[str]
+    recommendations: List[str]
+    confidence_score: float
+
+class AnalyticsEngine:
+    """Incrementally maintained per-session conversation aggregates"""
+
+    def __init__(self, max_sessions: int = settings.ANALYTICS_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        taxonomy = load_taxonomy()
+        self.topics: List[str] = [topic for topic in taxonomy if topic not in SENTIMENT_LEXICON]
+        # One automaton for topics and sentiment, so each message is scanned once
+        self._matcher = TopicEngine({**{topic: taxonomy[topic] for topic in self.topics}, **SENTIMENT_LEXICON})
+        self._columns = np.array(
+            [TOPIC_OFFSET + i for i in range(len(self.topics))] + [COL_POSITIVE, COL_NEGATIVE]
+        )
+        self.width = TOPIC_OFFSET + len(self.topics)
+        self._sessions: "OrderedDict[str, SessionAggregate]" = OrderedDict()
+        self.stats = {
+            "full_loads": 0,
+            "incremental_loads": 0,
+            "up_to_date": 0,
+            "appended": 0,
+        }
+
+    async def refresh(self, sessions: Dict[str, Tuple[ConversationSession, int]]) -> Dict[str, SessionAggregate]:
+        """Bring the aggregates of the given sessions up to their current message counts"""
+        cursors: Dict[str, int] = {}
+        for session_id, (session, message_count) in sessions.items():
+            aggregate = self._sessions.get(session_id)
+            if aggregate is not None and aggregate.message_count > message_count:
+                # History shrank; start over
+                self.discard(session_id)
+                aggregate = None
+            if aggregate is None:
+                self._sessions[session_id] = SessionAggregate(
+                    session_id=session_id,
+                    domain=session.context.domain.value,
+                    user_id=session.user_id,
+                    counts=np.zeros(self.width, dtype=np.int64)
+                )
+                cursors[session_id] = 0
+                self.stats["full_loads"] += 1
+            elif aggregate.message_count < message_count:
+                cursors[session_id] = aggregate.last_message_id
+                self.stats["incremental_loads"] += 1
+            else:
+                self.stats["up_to_date"] += 1
+
+        if cursors:
+            loaded = await conversation_store.get_messages_since(
+                cursors,
+                {session_id: sessions[session_id][1] for session_id in cursors}
+            )
+            # Skip sessions another refresh or an append advanced while this one was loading
+            current = {
+                session_id: tail
+                for session_id, tail in loaded.items()
+                if session_id in self._sessions and self._sessions[session_id].last_message_id == cursors[session_id]
+            }
+            self.fold(
+                {session_id: messages for session_id, (messages, _) in current.items()},
+                {session_id: last_id for session_id, (_, last_id) in current.items()}
+            )
+        result = {}
+        for session_id in sessions:
+            aggregate = self._sessions.get(session_id)
+            if aggregate is not None:
+                self._sessions.move_to_end(session_id)
+                result[session_id] = aggregate
+        self._evict()
+        return result
+
+    def record_append(self, session_id: str, messages: List[AIMessage], message_count: int, last_message_id: int):
+        """Extend a cached session with messages just appended to it, the last of them with id `last_message_id`"""
+        aggregate = self._sessions.get(session_id)
+        if aggregate is None:
+            return
+        if aggregate.message_count != message_count - len(messages):
+            # Appends happened elsewhere (another worker); catch up on the next refresh
+            return
+        self.fold({session_id: messages}, {session_id: last_message_id})
+        self.stats["appended"] += len(messages)
+
+    def fold(self, messages_by_session: Dict[str, List[AIMessage]], last_ids: Dict[str, int]):
+        """Add messages to the aggregates of already-registered sessions, up to the given last message ids"""
+        session_ids = [session_id for session_id, messages in messages_by_session.items() if messages]
+        if not session_ids:
+            return
+
+        rows, session_index, days = self._build_frame(session_ids, messages_by_session)
+        sums = np.zeros((len(session_ids), self.width), dtype=np.int64)
+        np.add.at(sums, session_index, rows)
+        day_keys, day_counts = np.unique(np.stack([session_index, days]), axis=1, return_counts=True)
+
+        for i, session_id in enumerate(session_ids):
+            aggregate = self._sessions[session_id]
+            aggregate.counts += sums[i]
+            aggregate.message_count += len(messages_by_session[session_id])
+            aggregate.last_message_id = last_ids[session_id]
+        for (i, day), count in zip(day_keys.T.tolist(), day_counts.tolist()):
+            daily = self._sessions[session_ids[i]].daily
+            daily[day] = daily.get(day, 0) + count
+
+    async def load_activity(self, aggregates: Iterable[SessionAggregate]) -> ActivityTotals:
+        """Session and message counts of the domains and users of the given sessions"""
+        aggregates = list(aggregates)
+        return await conversation_store.get_activity_totals(
+            {aggregate.domain for aggregate in aggregates},
+            {aggregate.user_id for aggregate in aggregates if aggregate.user_id}
+        )
+
+    def analyze(
+        self,
+        aggregate: SessionAggregate,
+        analysis_type: str,
+        base_recommendations: List[str],
+        activity: Optional[ActivityTotals] = None
+    ) -> Analysis:
+        """
+        Results, insights, recommendations and a confidence score for one session.
+
+        Progress analyses compare the session with its domain and user when
+        given their `activity` (see load_activity).
+        """
+        counts = aggregate.counts
+        topic_counts = counts[TOPIC_OFFSET:]
+        order = np.argsort(-topic_counts, kind="stable")
+        ranked = [(self.topics[i], int(topic_counts[i])) for i in order if topic_counts[i]]
+        results: Dict[str, Any] = {
+            "domain": aggregate.domain,
+            "message_count": aggregate.message_count,
+            "user_messages": int(counts[COL_USER]),
+            "assistant_messages": int(counts[COL_ASSISTANT]),
+            "conversation_length": int(counts[COL_CHARS]),
+            "topics": [topic for topic, _ in ranked],
+            "topic_counts": dict(ranked),
+        }
+        if analysis_type == "topics":
+            insights, evidence = self._analyze_topics(aggregate, results)
+        elif analysis_type == "sentiment":
+            insights, evidence = self._analyze_sentiment(aggregate, results)
+        elif analysis_type == "progress":
+            insights, evidence = self._analyze_progress(aggregate, results, activity)
+        else:
+            insights, evidence = [], int(counts[COL_USER])
+
+        recommendations = self._recommend(aggregate, ranked, base_recommendations)
+        if analysis_type == "recommendations":
+            results["recommendations"] = recommendations
+            if ranked:
+                insights.append(f"Recommendations focus on {ranked[0][0]}, the most discussed topic")
+
+        prior = settings.ANALYTICS_CONFIDENCE_PRIOR
+        return Analysis(
+            results=results,
+            insights=insights,
+            recommendations=recommendations,
+            confidence_score=round(evidence / (evidence + prior), 2) if prior > 0 else 1.0
+        )
+
+    def discard(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "sessions": len(self._sessions)}
+
+    def _evict(self):
+        while len(self._sessions) > self.max_sessions:
+            self.discard(next(iter(self._sessions)))
+
+    def _build_frame(
+        self,
+        session_ids: List[str],
+        messages_by_session: Dict[str, List[AIMessage]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """One count row, session index and day number per message"""
+        messages = [msg for session_id in session_ids for msg in messages_by_session[session_id]]
+        session_index = np.repeat(
+            np.arange(len(session_ids)),
+            [len(messages_by_session[session_id]) for session_id in session_ids]
+        )
+        rows = np.zeros((len(messages), self.width), dtype=np.int64)
+        roles = np.array([ROLE_COLUMNS.get(msg.role, COL_OTHER) for msg in messages])
+        rows[np.arange(len(messages)), roles] = 1
+        rows[:, COL_CHARS] = [len(msg.content) for msg in messages]
+        days = np.array([msg.timestamp.toordinal() for msg in messages], dtype=np.int64)
+
+        # Keyword matching is per message; everything after is columnar
+        hit_rows, hit_columns, hit_counts = [], [], []
+        for i, msg in enumerate(messages):
+            for column, count in self._matcher.match(msg.content).items():
+                hit_rows.append(i)
+                hit_columns.append(column)
+                hit_counts.append(count)
+        if hit_rows:
+            rows[hit_rows, self._columns[hit_columns]] = hit_counts
+        # Sentiment only counts what the user wrote
+        rows[roles != COL_USER, COL_POSITIVE:COL_NEGATIVE + 1] = 0
+        return rows, session_index, days
+
+    def _analyze_topics(self, aggregate: SessionAggregate, results: Dict[str, Any]) -> Tuple[List[str], int]:
+        topic_counts = aggregate.counts[TOPIC_OFFSET:]
+        share = topic_counts / max(1, topic_counts.sum())
+        results["topic_share"] = {self.topics[i]: round(float(share[i]), 3) for i in np.flatnonzero(share)}
+
+        insights = []
+        if results["topics"]:
+            insights.append(f"Most discussed topic: {results['topics'][0]} ({share.max():.0%} of topic mentions)")
+        if not results["topics"]:
+            insights.append("No known topics mentioned yet")
+        return insights, int(topic_counts.sum())
+
+    def _analyze_sentiment(self, aggregate: SessionAggregate, results: Dict[str, Any]) -> Tuple[List[str], int]:
+        positive, negative = (int(value) for value in aggregate.counts[[COL_POSITIVE, COL_NEGATIVE]])
+        score = (positive - negative) / (positive + negative) if positive + negative else 0.0
+        label = "positive" if score > 0.2 else "negative" if score < -0.2 else "neutral"
+
+        results.update({
+            "sentiment": label,
+            "sentiment_score": round(score, 3),
+            "positive_signals": positive,
+            "negative_signals": negative,
+        })
+        insights = [f"Overall sentiment is {label}"]
+        if label == "negative":
+            insights.append("The user expressed difficulty; consider simpler explanations or smaller steps")
+        return insights, positive + negative
+
+    def _analyze_progress(
+        self,
+        aggregate: SessionAggregate,
+        results: Dict[str, Any],
+        activity: Optional[ActivityTotals]
+    ) -> Tuple[List[str], int]:
+        days = np.array(sorted(aggregate.daily), dtype=np.int64)
+        per_day = np.array([aggregate.daily[day] for day in days], dtype=np.float64)
+        # Messages per day gained (or lost) per day, over the active days
+        trend = round(float(np.polyfit(days - days[0], per_day, 1)[0]), 3) if len(days) >= 2 else 0.0
+        domain_sessions, domain_total = activity.domains.get(aggregate.domain, (0, 0)) if activity else (0, 0)
+        domain_messages = domain_total / domain_sessions if domain_sessions else 0.0
+
+        results.update({
+            "active_days": len(days),
+            "first_activity": date.fromordinal(int(days[0])).isoformat() if len(days) else None,
+            "last_activity": date.fromordinal(int(days[-1])).isoformat() if len(days) else None,
+            "messages_per_active_day": round(float(per_day.mean()), 2) if len(days) else 0.0,
+            "activity_trend": trend,
+            "domain_average_messages": round(domain_messages, 1),
+            "topics_covered": int(np.count_nonzero(aggregate.counts[TOPIC_OFFSET:])),
+        })
+        if aggregate.user_id and activity and aggregate.user_id in activity.users:
+            user_sessions, user_messages = activity.users[aggregate.user_id]
+            results["user"] = {"sessions": user_sessions, "messages": user_messages}
+
+        insights = [f"Active on {len(days)} day{'s' if len(days) != 1 else ''}, {results['topics_covered']} topics covered"]
+        if trend > 0:
+            insights.append("Activity is increasing")
+        elif trend < 0:
+            insights.append("Activity is decreasing; a regular schedule may help")
+        if domain_messages and aggregate.message_count > 1.5 * domain_messages:
+            insights.append(f"More engaged than the average {aggregate.domain} conversation")
+        return insights, len(days)
+
+    def _recommend(self, aggregate: SessionAggregate, ranked: List[Tuple[str, int]], base: List[str]) -> List[str]:
+        recommendations = [TOPIC_RECOMMENDATIONS[topic] for topic, _ in ranked[:2] if topic in TOPIC_RECOMMENDATIONS]
+        if len(aggregate.daily) == 1 and aggregate.message_count >= 10:
+            recommendations.append("Split long sessions across several days to retain more")
+        recommendations.extend(item for item in base if item not in recommendations)
+        return recommendations
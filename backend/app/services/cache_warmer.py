@@ -0,0 +1,286 @@
+"""
+Off-peak response cache warming.
+
+The warmer replays a corpus of prompts for every configured provider,
+skips those already in the shared cache, and stores the rest with
+CACHE_WARM_TTL so they survive until peak hours. Provider calls go through the normal router and the
+Redis-backed rate limiter, at low concurrency and backing off when the
+limiter pushes back, so live traffic keeps its quota.
+
+The built-in corpus is a stand-in: prompts written around the frontend's
+certification templates, not prompts observed in traffic, so it only
+helps as far as clients happen to send the same text. For real gains set
+CACHE_WARM_CORPUS_PATH to frequent prompts taken from production
+requests.
+
+Run it nightly on Celery beat (CACHE_WARM_ENABLED) or by hand:
+
+    python -m app.services.cache_warmer [--dry-run] [--refresh]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from app.models.ai_models import AIMessage, AIProvider, AIRequest, ConversationContext
+from app.core import cache
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.context_manager import load_tokenizers
+from app.services.rate_limiter import RateLimitExceeded
+
+# Mirrors src/lib/projects/templates/aws-templates.ts: name -> weekly topics. The
+# prompts below are phrased for warming; the frontend does not send them verbatim.
+CERTIFICATION_TEMPLATES: Dict[str, List[str]] = {
+    "AWS Certified Developer - Associate": [
+        "Week 1: AWS Fundamentals & IAM",
+        "Week 2: EC2 & VPC Basics",
+        "Week 3: S3 & Storage Services",
+        "Week 4: Lambda & Serverless",
+        "Week 5: API Gateway & DynamoDB",
+        "Week 6: CloudFormation & CDK",
+        "Week 7: CI/CD with CodePipeline",
+        "Week 8: Monitoring & Logging",
+        "Week 9: Security & Compliance",
+        "Week 10: Advanced Lambda & EventBridge",
+        "Week 11: Practice Exams & Review",
+        "Week 12: Final Preparation & Exam",
+    ],
+    "AWS Certified Solutions Architect - Associate": [
+        "Week 1: AWS Fundamentals & Well-Architected Framework",
+        "Week 2: IAM & Security Fundamentals",
+        "Week 3: VPC & Networking",
+        "Week 4: EC2 & Compute Services",
+        "Week 5: S3 & Storage Solutions",
+        "Week 6: RDS & Database Services",
+        "Week 7: Load Balancing & Auto Scaling",
+        "Week 8: CloudFront & CDN",
+        "Week 9: Lambda & Serverless Architecture",
+        "Week 10: CloudFormation & Infrastructure as Code",
+        "Week 11: Monitoring & Logging",
+        "Week 12: High Availability & Disaster Recovery",
+        "Week 13: Practice Exams & Review",
+        "Week 14: Final Preparation & Exam",
+    ],
+    "AWS Certified SysOps Administrator - Associate": [
+        "Week 1: AWS Fundamentals & IAM",
+        "Week 2: VPC & Networking",
+        "Week 3: EC2 & Compute Management",
+        "Week 4: S3 & Storage Management",
+        "Week 5: RDS & Database Operations",
+        "Week 6: CloudWatch & Monitoring",
+        "Week 7: CloudTrail & Logging",
+        "Week 8: Auto Scaling & Load Balancing",
+        "Week 9: Backup & Recovery",
+        "Week 10: Security & Compliance",
+        "Week 11: Troubleshooting & Support",
+        "Week 12: Practice Exams & Review",
+        "Week 13: Final Preparation & Exam",
+    ],
+}
+
+STUDY_PLAN_PROMPT = "Create a {weeks}-week study plan for the {name} exam."
+WEEKLY_TOPIC_PROMPT = "I'm studying for the {name} exam. Explain the key concepts for {topic} and suggest hands-on practice."
+
+def default_corpus() -> List[Dict[str, Any]]:
+    """One study-plan prompt per template and one prompt per weekly topic"""
+    corpus = []
+    for name, topics in CERTIFICATION_TEMPLATES.items():
+        corpus.append({"domain": "aws", "prompt": STUDY_PLAN_PROMPT.format(weeks=len(topics), name=name)})
+        corpus.extend(
+            {"domain": "aws", "prompt": WEEKLY_TOPIC_PROMPT.format(name=name, topic=topic)}
+            for topic in topics
+        )
+    return corpus
+
+def load_corpus() -> List[Dict[str, Any]]:
+    """
+    The corpus from CACHE_WARM_CORPUS_PATH, falling back to the template corpus.
+
+    Entries need "prompt" and "domain"; "specific_context", "provider",
+    "model", "temperature" and "max_tokens" are optional and must match
+    what the client sends for the warmed answer to be a hit.
+    """
+    path = settings.CACHE_WARM_CORPUS_PATH
+    if path:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Cache warming corpus load failed, using templates: {str(e)}")
+    return default_corpus()
+
+class CacheWarmer:
+    """Replays a prompt corpus into the shared response cache"""
+
+    def __init__(
+        self,
+        service,
+        concurrency: int = settings.CACHE_WARM_CONCURRENCY,
+        ttl: int = settings.CACHE_WARM_TTL,
+        max_attempts: int = settings.CACHE_WARM_MAX_ATTEMPTS
+    ):
+        self.service = service
+        self.concurrency = concurrency
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+
+    def build_requests(self, corpus: List[Dict[str, Any]]) -> Dict[str, AIRequest]:
+        """Prepared requests by cache key, for every provider each entry applies to"""
+        providers = [
+            AIProvider(name) for name in settings.CACHE_WARM_PROVIDERS
+        ] or [provider for provider in AIProvider if self.service.is_provider_available(provider)]
+
+        requests: Dict[str, AIRequest] = {}
+        for entry in corpus:
+            entry_providers = [AIProvider(entry["provider"])] if entry.get("provider") else providers
+            for provider in entry_providers:
+                request = AIRequest(
+                    messages=[AIMessage(role="user", content=entry["prompt"])],
+                    context=ConversationContext(
+                        domain=entry["domain"],
+                        specific_context=entry.get("specific_context")
+                    ),
+                    provider=provider,
+                    model=entry.get("model"),
+                    # Latency does not matter off-peak; one provider call per prompt
+                    routing="direct",
+                    **{field: entry[field] for field in ("temperature", "max_tokens") if field in entry}
+                )
+                request, cache_key = self.service.prepare_request(request)
+                requests[cache_key] = request
+        return requests
+
+    async def run(
+        self,
+        corpus: Optional[List[Dict[str, Any]]] = None,
+        refresh: bool = False,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Warm the cache and report corpus coverage before and after.
+
+        Coverage is the fraction of corpus requests present in the shared
+        cache, and coverage_gain is how much this run added. Neither is a
+        hit rate: that depends on how often live traffic sends corpus
+        prompts. `refresh` regenerates entries that are already cached,
+        extending their TTL.
+        """
+        start = time.monotonic()
+        requests = self.build_requests(load_corpus() if corpus is None else corpus)
+        report: Dict[str, Any] = {
+            "requests": len(requests),
+            "warmed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "rate_limited": 0,
+        }
+        if not requests:
+            return report
+        if not cache.redis_available():
+            # The in-memory fallback is private to this process, so nothing would be shared
+            logger.warning("Cache warming skipped: Redis unavailable")
+            report["error"] = "Redis unavailable"
+            return report
+
+        cached = await self._cached_keys(list(requests))
+        report["coverage_before"] = round(len(cached) / len(requests), 4)
+        pending = [key for key in requests if refresh or key not in cached]
+        if not dry_run:
+            await self._warm(requests, pending, report)
+
+        cached = await self._cached_keys(list(requests))
+        report["coverage_after"] = round(len(cached) / len(requests), 4)
+        report["coverage_gain"] = round(report["coverage_after"] - report["coverage_before"], 4)
+        report["duration_s"] = round(time.monotonic() - start, 2)
+        logger.info(f"Cache warming finished: {report}")
+        return report
+
+    async def _cached_keys(self, keys: List[str]) -> set:
+        # Ask the shared tier directly; this process's local tier says nothing about other workers
+        values = await cache.get_many(keys)
+        return {key for key, value in zip(keys, values) if value}
+
+    async def _warm(self, requests: Dict[str, AIRequest], pending: List[str], report: Dict[str, Any]):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        open_circuits = set()
+
+        async def warm(cache_key: str):
+            request = requests[cache_key]
+            async with semaphore:
+                for attempt in range(1, self.max_attempts + 1):
+                    if request.provider in open_circuits:
+                        report["skipped"] += 1
+                        return
+                    try:
+                        await self.service.warm_response(request, cache_key, self.ttl)
+                        report["warmed"] += 1
+                        return
+                    except RateLimitExceeded as e:
+                        report["rate_limited"] += 1
+                        if attempt < self.max_attempts:
+                            await asyncio.sleep(e.retry_after)
+                    except CircuitOpenError:
+                        # The provider is failing; leave its prompts for the next run
+                        open_circuits.add(request.provider)
+                        report["skipped"] += 1
+                        return
+                    except Exception as e:
+                        logger.warning(f"Cache warming failed for {request.provider.value}: {str(e)}")
+                        break
+                report["failed"] += 1
+
+        await asyncio.gather(*(warm(cache_key) for cache_key in pending))
+
+async def save_report(report: Dict[str, Any]):
+    """Keep the last run's report for /cache/stats"""
+    try:
+        await cache.redis_client.set(settings.CACHE_WARM_REPORT_KEY, json.dumps(report), ex=7 * 24 * 3600)
+    except Exception as e:
+        logger.warning(f"Saving cache warming report failed: {str(e)}")
+
+async def load_report() -> Optional[Dict[str, Any]]:
+    if cache.redis_client is None:
+        return None
+    try:
+        raw = await cache.redis_client.get(settings.CACHE_WARM_REPORT_KEY)
+        return json.loads(raw) if raw else None
+    except Exception as e:
+        logger.warning(f"Loading cache warming report failed: {str(e)}")
+        return None
+
+async def warm_response_cache(refresh: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+    """Warm the shared cache from the configured corpus, connecting to Redis if needed"""
+    from app.services.ai_service import ai_service
+
+    if cache.redis_client is None:
+        await cache.init_redis()
+    # The warmer fits requests exactly as /chat does, so it needs the same token counts
+    await load_tokenizers(ai_service.context_manager.counter)
+    report = await CacheWarmer(ai_service).run(refresh=refresh, dry_run=dry_run)
+    report["timestamp"] = time.time()
+    if not dry_run and "error" not in report:
+        await save_report(report)
+    return report
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Warm the response cache from the prompt corpus")
+    parser.add_argument("--dry-run", action="store_true", help="only report current coverage")
+    parser.add_argument("--refresh", action="store_true", help="regenerate prompts that are already cached")
+    args = parser.parse_args(argv)
+
+    async def run() -> Dict[str, Any]:
+        try:
+            return await warm_response_cache(refresh=args.refresh, dry_run=args.dry_run)
+        finally:
+            from app.core.http_client import close_http_clients
+            await cache.close_redis()
+            await close_http_clients()
+
+    print(json.dumps(asyncio.run(run()), indent=2))
+
+if __name__ == "__main__":
+    main()
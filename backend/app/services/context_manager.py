@@ -0,0 +1,163 @@
+import asyncio
+import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from app.models.ai_models import AIMessage, AIRequest
+from app.core.config import settings
+from app.core.logging import logger
+
+# Context window sizes in tokens, per model
+MODEL_CONTEXT_LIMITS = {
+    "gpt-4o-mini": 128000,
+    "gpt-4o": 128000,
+    "gpt-3.5-turbo": 16385,
+    "gemini-1.5-flash": 1048576,
+    "gemini-1.5-pro": 2097152,
+    "gemini-1.0-pro": 30720,
+}
+DEFAULT_CONTEXT_LIMIT = 16385
+
+# Chat-format framing tokens (role markers, separators) per message and per prompt
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_PROMPT = 3
+
+FALLBACK_ENCODING = "cl100k_base"
+ENCODINGS = ("o200k_base", FALLBACK_ENCODING)
+
+class TokenCounter:
+    """
+    Tokenizer-based token counter with a per-text count cache.
+
+    Tokenizers are loaded by load(), never on the request path: on a cold
+    cache tiktoken downloads the encoding. Until an encoding is loaded its
+    counts are estimated from text length.
+    """
+
+    def __init__(self, cache_size: int = settings.TOKEN_COUNT_CACHE_SIZE):
+        self._encoders: Dict[str, Optional[Callable[[str], Any]]] = {}
+        # Message contents are immutable, so a repeated history only tokenizes new turns
+        self._count = lru_cache(maxsize=cache_size)(self._count_uncached)
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        """Count tokens in a piece of text"""
+        if not text:
+            return 0
+        return self._count(text, self._encoding_name(model))
+
+    def count_message(self, message: AIMessage, model: Optional[str] = None) -> int:
+        """Count tokens in a chat message including its framing overhead"""
+        return self.count(message.content, model) + TOKENS_PER_MESSAGE
+
+    def usage(self, prompt: str, completion: str, model: Optional[str] = None) -> Dict[str, int]:
+        """Build an OpenAI-style usage dict from prompt and completion text"""
+        prompt_tokens = self.count(prompt, model)
+        completion_tokens = self.count(completion, model)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def cache_info(self):
+        return self._count.cache_info()
+
+    def load(self, encoding_names=ENCODINGS):
+        """Load tokenizers (blocking, and may download on a cold cache)"""
+        if settings.TIKTOKEN_CACHE_DIR:
+            os.environ.setdefault("TIKTOKEN_CACHE_DIR", settings.TIKTOKEN_CACHE_DIR)
+        for encoding_name in encoding_names:
+            if self._encoders.get(encoding_name) is not None:
+                continue
+            try:
+                import tiktoken
+                self._encoders[encoding_name] = tiktoken.get_encoding(encoding_name).encode
+            except Exception as e:
+                logger.warning(f"Tokenizer '{encoding_name}' unavailable, using length estimate: {str(e)}")
+        # Drop estimates counted before the tokenizers were available
+        self._count.cache_clear()
+
+    def _encoding_name(self, model: Optional[str]) -> str:
+        # Gemini has no offline tokenizer; cl100k_base is a close proxy for budgeting
+        if model and model.startswith("gpt-4o"):
+            return "o200k_base"
+        return FALLBACK_ENCODING
+
+    def _count_uncached(self, text: str, encoding_name: str) -> int:
+        encode = self._get_encoder(encoding_name)
+        if encode is None:
+            # Roughly four characters per token for English text
+            return max(1, (len(text) + 3) // 4)
+        return len(encode(text, disallowed_special=()))
+
+    def _get_encoder(self, encoding_name: str) -> Optional[Callable[[str], Any]]:
+        return self._encoders.get(encoding_name)
+
+async def load_tokenizers(counter: TokenCounter, timeout: float = settings.TOKENIZER_LOAD_TIMEOUT):
+    """Load tokenizers off the event loop; past the timeout, keep estimating until they arrive"""
+    try:
+        await asyncio.wait_for(asyncio.to_thread(counter.load), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Tokenizers not loaded after {timeout}s, using length estimates meanwhile")
+
+class ContextWindowManager:
+    """Fits conversation history into a per-model prompt token budget"""
+
+    def __init__(self, counter: Optional[TokenCounter] = None):
+        self.counter = counter or TokenCounter()
+
+    def get_budget(self, model: str, max_tokens: Optional[int]) -> int:
+        """Prompt token budget for a model, leaving room for the completion"""
+        context_limit = MODEL_CONTEXT_LIMITS.get(model, DEFAULT_CONTEXT_LIMIT)
+        budget = context_limit - (max_tokens or 0)
+        if settings.CONTEXT_MAX_PROMPT_TOKENS:
+            budget = min(budget, settings.CONTEXT_MAX_PROMPT_TOKENS)
+        return budget
+
+    def fit_messages(
+        self,
+        messages: List[AIMessage],
+        model: str,
+        budget: int,
+        reserved_tokens: int = 0
+    ) -> List[AIMessage]:
+        """
+        Keep leading system messages and as many of the most recent turns as fit.
+
+        The latest message is always kept, even if it exceeds the budget on its own.
+        """
+        if not messages:
+            return messages
+
+        remaining = budget - reserved_tokens - TOKENS_PER_PROMPT
+        pinned = 0
+        while pinned < len(messages) - 1 and messages[pinned].role == "system":
+            remaining -= self.counter.count_message(messages[pinned], model)
+            pinned += 1
+
+        start = len(messages) - 1
+        remaining -= self.counter.count_message(messages[start], model)
+        while start > pinned:
+            cost = self.counter.count_message(messages[start - 1], model)
+            if cost > remaining:
+                break
+            remaining -= cost
+            start -= 1
+
+        if start == pinned:
+            return messages
+        logger.info(f"Context window trimmed {start - pinned} of {len(messages)} messages for {model}")
+        return messages[:pinned] + messages[start:]
+
+    def fit_request(self, request: AIRequest, model: str, system_prompt: Optional[str] = None) -> AIRequest:
+        """Return the request with its history trimmed to the model's budget"""
+        reserved = self.counter.count(system_prompt, model) + TOKENS_PER_MESSAGE if system_prompt else 0
+        messages = self.fit_messages(
+            request.messages,
+            model,
+            self.get_budget(model, request.max_tokens),
+            reserved
+        )
+        if messages is request.messages:
+            return request
+        return request.model_copy(update={"messages": messages})
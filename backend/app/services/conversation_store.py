@@ -0,0 +1,352 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import uuid
+
+from sqlalchemy import and_, func, insert, or_, select, update
+
+from app.models.ai_models import AIMessage, AIProvider, ConversationContext, ConversationSession
+from app.models.db_models import AnalysisRecord, ConversationRecord, MessageRecord
+from app.core.database import get_session
+from app.services.session_memory import CompactHistory, SessionMemory
+
+class ConversationNotFoundError(Exception):
+    """Raised when a conversation session does not exist"""
+
+    def __init__(self, session_id: str):
+        super().__init__(f"Conversation session not found: {session_id}")
+        self.session_id = session_id
+
+@dataclass
+class ActivityTotals:
+    """(session count, message count) per domain and per user"""
+    domains: Dict[str, Tuple[int, int]]
+    users: Dict[str, Tuple[int, int]]
+
+class ConversationStore:
+    """
+    Conversation sessions backed by an append-only message table.
+
+    Recently used sessions' histories are also kept in process, in compact
+    form (see session_memory), to serve history pages and analytics without
+    reading the messages again. AIMessage objects are built on the way out.
+    """
+
+    def __init__(self):
+        self.memory = SessionMemory()
+
+    async def create_session(
+        self,
+        context: ConversationContext,
+        provider: AIProvider,
+        user_id: Optional[str] = None
+    ) -> ConversationSession:
+        """Create and persist a new, empty conversation session"""
+        now = datetime.utcnow()
+        record = ConversationRecord(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            domain=context.domain.value,
+            specific_context=context.specific_context,
+            context_metadata=context.metadata,
+            provider=provider.value,
+            message_count=0,
+            is_active=True,
+            created_at=now,
+            updated_at=now
+        )
+        async with get_session() as db:
+            db.add(record)
+            await db.commit()
+        self.memory.put(record.id, CompactHistory())
+        return self._to_session(record, [])
+
+    async def get_session(self, session_id: str) -> Optional[ConversationSession]:
+        """Get session metadata without loading its messages"""
+        async with get_session() as db:
+            record = await db.get(ConversationRecord, session_id)
+        if record is None:
+            return None
+        return self._to_session(record, [])
+
+    async def get_sessions(self, session_ids: List[str]) -> Dict[str, ConversationSession]:
+        """Get metadata for many sessions in one query"""
+        async with get_session() as db:
+            records = (await db.execute(
+                select(ConversationRecord).where(ConversationRecord.id.in_(session_ids))
+            )).scalars().all()
+        return {record.id: self._to_session(record, []) for record in records}
+
+    async def get_sessions_with_counts(self, session_ids: List[str]) -> Dict[str, Tuple[ConversationSession, int]]:
+        """Get metadata and message counts for many sessions in one query"""
+        async with get_session() as db:
+            records = (await db.execute(
+                select(ConversationRecord).where(ConversationRecord.id.in_(session_ids))
+            )).scalars().all()
+        return {record.id: (self._to_session(record, []), record.message_count) for record in records}
+
+    async def get_activity_totals(self, domains: Iterable[str], user_ids: Iterable[str]) -> ActivityTotals:
+        """Count the sessions and messages of some domains and users from the conversation table"""
+        domains, user_ids = list(domains), list(user_ids)
+        totals = ActivityTotals(domains={}, users={})
+        async with get_session() as db:
+            for column, keys, result in (
+                (ConversationRecord.domain, domains, totals.domains),
+                (ConversationRecord.user_id, user_ids, totals.users),
+            ):
+                if not keys:
+                    continue
+                rows = (await db.execute(
+                    select(column, func.count(), func.coalesce(func.sum(ConversationRecord.message_count), 0))
+                    .where(column.in_(keys))
+                    .group_by(column)
+                )).all()
+                result.update({key: (sessions, messages) for key, sessions, messages in rows})
+        return totals
+
+    async def get_messages_bulk(self, session_ids: List[str]) -> Dict[str, List[AIMessage]]:
+        """Get the full message lists of many sessions in one query"""
+        histories = {session_id: CompactHistory() for session_id in session_ids}
+        query = (
+            select(
+                MessageRecord.conversation_id,
+                MessageRecord.id,
+                MessageRecord.role,
+                MessageRecord.content,
+                MessageRecord.created_at
+            )
+            .where(MessageRecord.conversation_id.in_(session_ids))
+            .order_by(MessageRecord.conversation_id, MessageRecord.id)
+        )
+        async with get_session() as db:
+            rows = (await db.execute(query)).all()
+        for row in rows:
+            histories[row.conversation_id].extend([(row.id, row.role, row.content, row.created_at)])
+
+        messages = {}
+        for session_id, history in histories.items():
+            messages[session_id] = history.messages()
+            self.memory.put(session_id, history)
+        return messages
+
+    async def get_messages_since(
+        self,
+        cursors: Dict[str, int],
+        message_counts: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Tuple[List[AIMessage], int]]:
+        """
+        Get each session's messages with ids after its cursor, the last message id seen (0 to read from the start).
+
+        Returns the messages and the id of the last one, which is the
+        session's next cursor. Sessions whose current `message_counts` match
+        their in-process history are served from memory; the rest share one
+        keyset query over the (conversation_id, id) index.
+        """
+        messages: Dict[str, Tuple[List[AIMessage], int]] = {}
+        if message_counts:
+            for session_id, last_id in cursors.items():
+                history = self.memory.get(session_id, message_counts.get(session_id, -1))
+                tail = history.since(last_id) if history is not None else None
+                if tail is not None:
+                    messages[session_id] = tail
+            cursors = {session_id: last_id for session_id, last_id in cursors.items() if session_id not in messages}
+        if not cursors:
+            return messages
+
+        query = (
+            select(
+                MessageRecord.conversation_id,
+                MessageRecord.id,
+                MessageRecord.role,
+                MessageRecord.content,
+                MessageRecord.created_at
+            )
+            .where(or_(*(
+                and_(MessageRecord.conversation_id == session_id, MessageRecord.id > last_id)
+                for session_id, last_id in cursors.items()
+            )))
+            .order_by(MessageRecord.conversation_id, MessageRecord.id)
+        )
+        async with get_session() as db:
+            rows = (await db.execute(query)).all()
+        rows_by_session: Dict[str, List[Any]] = {session_id: [] for session_id in cursors}
+        for row in rows:
+            rows_by_session[row.conversation_id].append(row)
+
+        for session_id, session_rows in rows_by_session.items():
+            last_id = session_rows[-1].id if session_rows else cursors[session_id]
+            if cursors[session_id] <= 0:
+                # A whole history: keep it for the next read
+                history = CompactHistory((row.id, row.role, row.content, row.created_at) for row in session_rows)
+                self.memory.put(session_id, history)
+                messages[session_id] = history.messages(), last_id
+            else:
+                messages[session_id] = [
+                    AIMessage(role=row.role, content=row.content, timestamp=row.created_at)
+                    for row in session_rows
+                ], last_id
+        return messages
+
+    async def get_message_count(self, session_id: str) -> Optional[int]:
+        """Get a session's message count, or None if it does not exist"""
+        async with get_session() as db:
+            result = await db.execute(
+                select(ConversationRecord.message_count).where(ConversationRecord.id == session_id)
+            )
+        return result.scalar_one_or_none()
+
+    async def append_messages(self, session_id: str, messages: List[AIMessage]) -> Tuple[int, List[int]]:
+        """
+        Append messages to a session in one batched insert.
+
+        Returns the session's new message count and the ids of the new messages.
+        """
+        async with get_session() as db:
+            result = await db.execute(
+                update(ConversationRecord)
+                .where(ConversationRecord.id == session_id)
+                .values(
+                    message_count=ConversationRecord.message_count + len(messages),
+                    updated_at=datetime.utcnow()
+                )
+                .returning(ConversationRecord.message_count)
+            )
+            message_count = result.scalar_one_or_none()
+            if message_count is None:
+                raise ConversationNotFoundError(session_id)
+
+            message_ids = []
+            if messages:
+                message_ids = (await db.execute(
+                    insert(MessageRecord).returning(MessageRecord.id, sort_by_parameter_order=True),
+                    [
+                        {
+                            "conversation_id": session_id,
+                            "role": msg.role,
+                            "content": msg.content,
+                            "created_at": msg.timestamp
+                        }
+                        for msg in messages
+                    ]
+                )).scalars().all()
+            await db.commit()
+        self.memory.append(
+            session_id,
+            [(message_id, msg.role, msg.content, msg.timestamp) for message_id, msg in zip(message_ids, messages)],
+            message_count
+        )
+        return message_count, message_ids
+
+    async def get_history(
+        self,
+        session_id: str,
+        limit: int,
+        before: Optional[int] = None,
+        message_count: Optional[int] = None
+    ) -> Tuple[List[AIMessage], Optional[int]]:
+        """
+        Get one page of history, newest page first, using keyset pagination.
+
+        Messages in the page are returned oldest first. The returned cursor is
+        passed back as `before` to fetch the next (older) page, and is None
+        once the start of the conversation is reached. With the session's
+        current `message_count`, pages are served from the in-process
+        history when it holds them; pages read from the database are added
+        to it, so it fills in as the client pages back.
+        """
+        cacheable = message_count is not None and message_count <= self.memory.max_messages
+        if cacheable:
+            history = self.memory.get(session_id, message_count)
+            page = history.page(limit, before) if history is not None else None
+            if page is not None:
+                return page
+
+        query = (
+            select(MessageRecord.id, MessageRecord.role, MessageRecord.content, MessageRecord.created_at)
+            .where(MessageRecord.conversation_id == session_id)
+            .order_by(MessageRecord.id.desc())
+            .limit(limit + 1)
+        )
+        if before is not None:
+            query = query.where(MessageRecord.id < before)
+
+        async with get_session() as db:
+            rows = (await db.execute(query)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1].id
+        rows.reverse()
+
+        if cacheable:
+            self.memory.add_page(session_id, rows, message_count, before, next_cursor is None)
+        messages = [
+            AIMessage(role=row.role, content=row.content, timestamp=row.created_at)
+            for row in rows
+        ]
+        return messages, next_cursor
+
+    async def get_messages(self, session_id: str, limit: Optional[int] = None) -> List[AIMessage]:
+        """Get the most recent messages of a session, oldest first"""
+        if limit is not None:
+            messages, _ = await self.get_history(session_id, limit)
+            return messages
+
+        query = (
+            select(MessageRecord.role, MessageRecord.content, MessageRecord.created_at)
+            .where(MessageRecord.conversation_id == session_id)
+            .order_by(MessageRecord.id)
+        )
+        async with get_session() as db:
+            rows = (await db.execute(query)).all()
+        return [
+            AIMessage(role=row.role, content=row.content, timestamp=row.created_at)
+            for row in rows
+        ]
+
+    async def save_analyses(self, analyses: List[Dict[str, Any]]):
+        """
+        Store analysis results in one batched insert.
+
+        Each item needs `domain` and `results`, and may carry
+        `conversation_id`, `provider` and `model`.
+        """
+        if not analyses:
+            return
+        now = datetime.utcnow()
+        async with get_session() as db:
+            await db.execute(
+                insert(AnalysisRecord),
+                [
+                    {
+                        "conversation_id": item.get("conversation_id"),
+                        "domain": item["domain"],
+                        "provider": item.get("provider"),
+                        "model": item.get("model"),
+                        "results": item["results"],
+                        "created_at": now
+                    }
+                    for item in analyses
+                ]
+            )
+            await db.commit()
+
+    def _to_session(self, record: ConversationRecord, messages: List[AIMessage]) -> ConversationSession:
+        return ConversationSession(
+            id=record.id,
+            user_id=record.user_id,
+            context=ConversationContext(
+                domain=record.domain,
+                specific_context=record.specific_context,
+                metadata=record.context_metadata
+            ),
+            messages=messages,
+            provider=record.provider,
+            created_at=record.created_at,
+            updated_at=record.updated_at,
+            is_active=record.is_active
+        )
+
+# Global conversation store instance
+conversation_store = ConversationStore()
@@ -0,0 +1,94 @@
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+class GeminiAPIError(Exception):
+    """Error returned by the Gemini API"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Gemini API error {status_code}: {message}")
+        self.status_code = status_code
+
+class GeminiClient:
+    """Async Gemini REST client running on a shared pooled httpx client"""
+
+    def __init__(self, api_key: str, http_client: httpx.AsyncClient, base_url: str = GEMINI_API_URL):
+        self.api_key = api_key
+        self.http_client = http_client
+        self.base_url = base_url.rstrip("/")
+
+    async def generate_content(
+        self,
+        model: str,
+        contents: List[Dict[str, Any]],
+        generation_config: Optional[Dict[str, Any]] = None,
+        system_instruction: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Call models/{model}:generateContent"""
+        response = await self.http_client.post(
+            f"{self.base_url}/models/{model}:generateContent",
+            headers={"x-goog-api-key": self.api_key},
+            json=self._build_body(contents, generation_config, system_instruction)
+        )
+        if response.status_code != 200:
+            raise GeminiAPIError(response.status_code, response.text)
+        return response.json()
+
+    async def stream_generate_content(
+        self,
+        model: str,
+        contents: List[Dict[str, Any]],
+        generation_config: Optional[Dict[str, Any]] = None,
+        system_instruction: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Call models/{model}:streamGenerateContent and yield each SSE payload"""
+        async with self.http_client.stream(
+            "POST",
+            f"{self.base_url}/models/{model}:streamGenerateContent",
+            params={"alt": "sse"},
+            headers={"x-goog-api-key": self.api_key},
+            json=self._build_body(contents, generation_config, system_instruction)
+        ) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise GeminiAPIError(response.status_code, body.decode("utf-8", "replace"))
+            async for line in response.aiter_lines():
+                if line.startswith("data:"):
+                    yield json.loads(line[5:])
+
+    @staticmethod
+    def extract_text(payload: Dict[str, Any]) -> str:
+        """Concatenate the text parts of the first candidate"""
+        candidates = payload.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    @staticmethod
+    def extract_usage(payload: Dict[str, Any]) -> Optional[Dict[str, int]]:
+        """Map usageMetadata to the OpenAI-style usage dict used in AIResponse"""
+        metadata = payload.get("usageMetadata")
+        if not metadata:
+            return None
+        return {
+            "prompt_tokens": metadata.get("promptTokenCount", 0),
+            "completion_tokens": metadata.get("candidatesTokenCount", 0),
+            "total_tokens": metadata.get("totalTokenCount", 0),
+        }
+
+    @staticmethod
+    def _build_body(
+        contents: List[Dict[str, Any]],
+        generation_config: Optional[Dict[str, Any]],
+        system_instruction: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        body: Dict[str, Any] = {"contents": contents}
+        if system_instruction:
+            body["systemInstruction"] = system_instruction
+        if generation_config:
+            body["generationConfig"] = generation_config
+        return body
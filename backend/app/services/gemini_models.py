@@ -0,0 +1,56 @@
+"""
+Gemini request state.
+
+Gemini takes the system prompt as a `systemInstruction` and the
+conversation as native multi-turn `contents` (user/model turns).
+GeminiModelPool keeps the prebuilt instruction per (model, system prompt).
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+from app.models.ai_models import AIMessage
+from app.core.config import settings
+
+Content = Dict[str, Any]
+
+def to_content(role: str, text: str) -> Content:
+    """One Gemini content entry; assistant turns are "model", everything else is "user" """
+    return {"role": "model" if role == "assistant" else "user", "parts": [{"text": text}]}
+
+def to_contents(messages: Sequence[AIMessage]) -> List[Content]:
+    return [to_content(msg.role, msg.content) for msg in messages]
+
+@dataclass(frozen=True)
+class GeminiModelHandle:
+    """Prebuilt per-model request state"""
+    model: str
+    system_prompt: str
+    system_instruction: Content
+
+class GeminiModelPool:
+    """Bounded LRU pool of model handles keyed by model name and system prompt"""
+
+    def __init__(self, max_handles: int = settings.GEMINI_MODEL_POOL_SIZE):
+        self.max_handles = max_handles
+        self._handles: "OrderedDict[Tuple[str, str], GeminiModelHandle]" = OrderedDict()
+
+    def get(self, model: str, system_prompt: str) -> GeminiModelHandle:
+        key = (model, system_prompt)
+        handle = self._handles.get(key)
+        if handle is None:
+            handle = GeminiModelHandle(
+                model=model,
+                system_prompt=system_prompt,
+                system_instruction={"parts": [{"text": system_prompt}]}
+            )
+            self._handles[key] = handle
+            while len(self._handles) > self.max_handles:
+                self._handles.popitem(last=False)
+        else:
+            self._handles.move_to_end(key)
+        return handle
+
+    def __len__(self) -> int:
+        return len(self._handles)
@@ -0,0 +1,140 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from app.models.ai_models import AIProvider, AIRequest, AIResponse
+from app.core.config import settings
+from app.core.logging import logger
+
+ProviderCall = Callable[[AIRequest], Awaitable[AIResponse]]
+
+def percentile(samples: Iterable[float], q: float) -> float:
+    """Linearly interpolated percentile (numpy's default method) of a small sample"""
+    values = sorted(samples)
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+class ProviderRouter:
+    """
+    Opt-in request routing across providers.
+
+    - direct: call the requested provider/model only.
+    - failover: on error (including an open circuit), retry once on the alternate.
+    - hedged: failover, plus send a second request to the alternate if the
+      primary has not answered within its observed latency percentile; the
+      first good answer wins and the other call is cancelled.
+    """
+
+    def __init__(
+        self,
+        call: ProviderCall,
+        is_available: Callable[[AIProvider], bool],
+        default_models: Dict[AIProvider, str]
+    ):
+        self._call = call
+        self._is_available = is_available
+        self._default_models = default_models
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self.stats = {
+            "hedges": 0,
+            "hedge_wins": 0,
+            "primary_wins": 0,
+            "cancellations": 0,
+            "failovers": 0,
+        }
+
+    async def call(self, request: AIRequest) -> AIResponse:
+        """Route a request according to its routing mode"""
+        mode = request.routing or settings.ROUTING_MODE
+        alternate = self._get_alternate(request) if mode in ("failover", "hedged") else None
+        if alternate is None:
+            return await self._timed_call(request)
+        if mode == "hedged":
+            return await self._hedged_call(request, alternate)
+        return await self._failover_call(request, alternate)
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            **self.stats,
+            "hedge_delays": {
+                f"{provider}:{model}": round(self.get_hedge_delay(provider, model), 3)
+                for provider, model in self._latencies
+            },
+        }
+
+    def get_hedge_delay(self, provider: str, model: str) -> float:
+        """Delay before hedging: the configured latency percentile of recent successes"""
+        samples = self._latencies.get((provider, model))
+        if not samples or len(samples) < settings.HEDGE_MIN_SAMPLES:
+            return settings.HEDGE_DEFAULT_DELAY
+        return max(settings.HEDGE_MIN_DELAY, percentile(samples, settings.HEDGE_PERCENTILE))
+
+    async def _failover_call(self, request: AIRequest, alternate: AIRequest) -> AIResponse:
+        try:
+            return await self._timed_call(request)
+        except Exception as e:
+            logger.warning(f"{request.provider.value} failed, failing over to {alternate.provider.value}: {str(e)}")
+            self.stats["failovers"] += 1
+            return await self._timed_call(alternate)
+
+    async def _hedged_call(self, request: AIRequest, alternate: AIRequest) -> AIResponse:
+        primary = asyncio.create_task(self._timed_call(request))
+        hedge = None
+        try:
+            delay = self.get_hedge_delay(request.provider.value, self._model(request))
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            
+            if done:
+                if primary.exception() is None:
+                    self.stats["primary_wins"] += 1
+                    return primary.result()
+                logger.warning(f"{request.provider.value} failed, failing over to {alternate.provider.value}: {primary.exception()}")
+                self.stats["failovers"] += 1
+                return await self._timed_call(alternate)
+            
+            self.stats["hedges"] += 1
+            hedge = asyncio.create_task(self._timed_call(alternate))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.stats["hedge_wins" if task is hedge else "primary_wins"] += 1
+                        return task.result()
+            # Both failed; surface the primary's error
+            raise primary.exception()
+        finally:
+            # Cancel the loser (or both, if the caller itself was cancelled)
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+                    self.stats["cancellations"] += 1
+
+    async def _timed_call(self, request: AIRequest) -> AIResponse:
+        start = time.monotonic()
+        response = await self._call(request)
+        key = (request.provider.value, self._model(request))
+        samples = self._latencies.get(key)
+        if samples is None:
+            samples = self._latencies[key] = deque(maxlen=200)
+        samples.append(time.monotonic() - start)
+        return response
+
+    def _get_alternate(self, request: AIRequest) -> Optional[AIRequest]:
+        target = settings.ROUTING_ALTERNATES.get(request.provider.value)
+        if not target:
+            return None
+        provider_name, _, model = target.partition(":")
+        provider = AIProvider(provider_name)
+        if not self._is_available(provider):
+            return None
+        return request.model_copy(update={
+            "provider": provider,
+            "model": model or self._default_models[provider],
+        })
+
+    def _model(self, request: AIRequest) -> str:
+        return request.model or self._default_models[request.provider]
@@ -0,0 +1,266 @@
+import asyncio
+import math
+import sys
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional, Tuple
+
+import httpx
+
+from app.models.ai_models import AIProvider, AIProviderConfig
+from app.core import cache
+from app.core.circuit_breaker import CircuitOpenError
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.gemini_client import GeminiAPIError
+
+# Token bucket refilled continuously at `rate` tokens/ms, using the Redis server clock
+# so every worker agrees on time. Returns 0 when a token was taken, else ms to wait.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) + 1000)
+return wait
+"""
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot get provider capacity before its queue deadline"""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for {provider}, retry after {retry_after:.1f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+def _openai_errors(*names: str) -> tuple:
+    # The SDK is imported lazily with the first OpenAI client; until then none of its errors can occur
+    openai = sys.modules.get("openai")
+    return tuple(getattr(openai, name) for name in names) if openai else ()
+
+def is_provider_rate_limit(error: Exception) -> bool:
+    """Whether the provider rejected a call as over its rate limit or capacity"""
+    if isinstance(error, GeminiAPIError):
+        return error.status_code in (429, 503)
+    return isinstance(error, _openai_errors("RateLimitError"))
+
+def is_overload_error(error: Exception) -> bool:
+    """Whether a provider error means we are sending too much"""
+    if isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError)):
+        return True
+    return is_provider_rate_limit(error) or isinstance(error, _openai_errors("APITimeoutError"))
+
+def get_retry_after(error: Exception, default: float = 1.0) -> float:
+    """Read Retry-After from a provider error response if present"""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after", default))
+    except (AttributeError, TypeError, ValueError):
+        return default
+
+class LocalTokenBucket:
+    """In-process token bucket used when Redis is unavailable"""
+
+    def __init__(self):
+        self._state: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, key: str, rate: float, capacity: float) -> int:
+        now = time.monotonic() * 1000
+        tokens, ts = self._state.get(key, (capacity, now))
+        tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+        wait = 0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = math.ceil((1 - tokens) / rate)
+        self._state[key] = (tokens, now)
+        return wait
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit: grows by one per window of successes, halves on overload"""
+
+    def __init__(
+        self,
+        initial_limit: int = settings.CONCURRENCY_INITIAL_LIMIT,
+        min_limit: int = settings.CONCURRENCY_MIN_LIMIT,
+        max_limit: int = settings.CONCURRENCY_MAX_LIMIT,
+        backoff_ratio: float = settings.CONCURRENCY_BACKOFF_RATIO,
+        cooldown: float = 1.0
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    async def acquire(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for a slot"""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        if timeout <= 0:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            return False
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        return True
+
+    def release(self, overloaded: bool = False, succeeded: bool = True):
+        """Return a slot and adjust the limit from the call's outcome"""
+        self.in_flight -= 1
+        if overloaded:
+            now = time.monotonic()
+            # One decrease per cooldown, so a burst of 429s does not collapse the limit
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self._last_decrease = now
+        elif succeeded:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(True)
+
+    def _abandon(self, waiter: asyncio.Future):
+        if waiter.done():
+            # A slot was handed over just as we gave up; pass it on
+            self.in_flight -= 1
+            self._wake()
+        else:
+            waiter.cancel()
+            self._waiters.remove(waiter)
+
+class ProviderRateLimiter:
+    """Distributed per-provider/model token bucket in front of an adaptive concurrency limit"""
+
+    def __init__(self):
+        self._local_buckets = LocalTokenBucket()
+        self._concurrency: Dict[Tuple[str, str], AdaptiveConcurrencyLimiter] = {}
+        self._scripts: Dict[int, object] = {}
+        self.stats = {"queued": 0, "rejected": 0, "provider_429": 0}
+
+    def get_config(self, provider: AIProvider, model: str) -> AIProviderConfig:
+        """Provider config for a model; rate_limit is requests per minute"""
+        if provider == AIProvider.OPENAI:
+            api_key, rpm = settings.OPENAI_API_KEY, settings.OPENAI_RATE_LIMIT_RPM
+        else:
+            api_key, rpm = settings.GEMINI_API_KEY, settings.GEMINI_RATE_LIMIT_RPM
+        return AIProviderConfig(
+            provider=provider,
+            api_key=api_key or "",
+            model=model,
+            rate_limit=settings.MODEL_RATE_LIMIT_RPM.get(model, rpm)
+        )
+
+    @asynccontextmanager
+    async def limit(self, provider: AIProvider, model: str, timeout: Optional[float] = None):
+        """
+        Hold provider capacity for one call.
+
+        Waits up to `timeout` seconds (RATE_LIMIT_QUEUE_TIMEOUT by default) for a
+        rate token and a concurrency slot, else raises RateLimitExceeded. Provider
+        429s and timeouts shrink the concurrency limit and surface as
+        RateLimitExceeded too.
+        """
+        config = self.get_config(provider, model)
+        deadline = time.monotonic() + (settings.RATE_LIMIT_QUEUE_TIMEOUT if timeout is None else timeout)
+
+        if config.rate_limit:
+            await self._take_token(config, deadline)
+
+        limiter = self._get_concurrency_limiter(provider.value, model)
+        if not await limiter.acquire(deadline - time.monotonic()):
+            self.stats["rejected"] += 1
+            raise RateLimitExceeded(provider.value, 1.0)
+
+        overloaded = False
+        succeeded = False
+        try:
+            yield
+            succeeded = True
+        except Exception as e:
+            overloaded = is_overload_error(e)
+            if is_provider_rate_limit(e):
+                self.stats["provider_429"] += 1
+                raise RateLimitExceeded(provider.value, get_retry_after(e)) from e
+            raise
+        finally:
+            limiter.release(overloaded, succeeded)
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            **self.stats,
+            "concurrency": {
+                f"{provider}:{model}": {"limit": int(limiter.limit), "in_flight": limiter.in_flight}
+                for (provider, model), limiter in self._concurrency.items()
+            },
+        }
+
+    async def _take_token(self, config: AIProviderConfig, deadline: float):
+        rate = config.rate_limit / 60000.0  # tokens per ms
+        capacity = max(1.0, config.rate_limit * settings.RATE_LIMIT_BURST_SECONDS / 60.0)
+        key = f"ratelimit:{config.provider.value}:{config.model}"
+
+        while True:
+            wait_ms = await self._take(key, rate, capacity)
+            if not wait_ms:
+                return
+            remaining = deadline - time.monotonic()
+            if wait_ms / 1000 > remaining:
+                self.stats["rejected"] += 1
+                raise RateLimitExceeded(config.provider.value, wait_ms / 1000)
+            self.stats["queued"] += 1
+            await asyncio.sleep(wait_ms / 1000)
+
+    async def _take(self, key: str, rate: float, capacity: float) -> int:
+        client = cache.get_redis()
+        # Token buckets are only shared across processes through Redis
+        if cache.redis_available():
+            try:
+                script = self._scripts.get(id(client))
+                if script is None:
+                    script = self._scripts[id(client)] = client.register_script(TOKEN_BUCKET_SCRIPT)
+                start = time.perf_counter()
+                async with cache.redis_guard():
+                    wait_ms = int(await script(keys=[key], args=[rate, capacity]))
+                metrics.REDIS_DURATION.labels("rate_limit").observe(time.perf_counter() - start)
+                return wait_ms
+            except CircuitOpenError:
+                pass
+            except Exception as e:
+                logger.warning(f"Distributed rate limiter unavailable, using local bucket: {str(e)}")
+        return self._local_buckets.take(key, rate, capacity)
+
+    def _get_concurrency_limiter(self, provider: str, model: str) -> AdaptiveConcurrencyLimiter:
+        limiter = self._concurrency.get((provider, model))
+        if limiter is None:
+            limiter = self._concurrency[(provider, model)] = AdaptiveConcurrencyLimiter()
+        return limiter
@@ -0,0 +1,279 @@
+import asyncio
+import hashlib
+import json
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import orjson
+
+from app.models.ai_models import AIProvider, AIRequest, AIResponse
+from app.core import cache
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.config import settings
+from app.core.logging import logger
+
+CACHE_KEY_PREFIX = "ai_response:v2"
+
+def normalize_request(request: AIRequest, model: str) -> Dict[str, Any]:
+    """Build the canonical, timestamp-free view of a request used for cache keys"""
+    return {
+        "messages": [[msg.role, msg.content.strip()] for msg in request.messages],
+        "context": request.context.model_dump(mode="json"),
+        "provider": request.provider.value,
+        "model": model,
+        "temperature": request.temperature,
+        "max_tokens": request.max_tokens,
+    }
+
+def generate_cache_key(request: AIRequest, model: str) -> str:
+    """Generate a stable, content-addressed cache key for a request"""
+    normalized = normalize_request(request, model)
+    try:
+        # Same bytes as the compact, sorted json.dumps below, several times faster
+        payload = orjson.dumps(normalized, option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        # Metadata orjson cannot encode, e.g. integers wider than 64 bits
+        payload = json.dumps(
+            normalized,
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False
+        ).encode("utf-8")
+    digest = hashlib.sha256(payload).hexdigest()
+    return f"{CACHE_KEY_PREFIX}:{digest}"
+
+# Cached value layout: version byte, codec byte, payload. The payload is a
+# positional orjson array (no repeated field names), zlib-compressed when large.
+# JSON never starts with these bytes, so entries written as JSON by older
+# releases are still readable during a rollout.
+CACHE_FORMAT_VERSION = 1
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+
+class CacheDecodeError(ValueError):
+    """Raised when a cached value is in an unknown format"""
+
+def encode_response(response: AIResponse, compress_min_bytes: int = settings.RESPONSE_CACHE_COMPRESS_MIN_BYTES) -> bytes:
+    """Encode a response for the shared cache"""
+    payload = orjson.dumps([
+        response.content,
+        response.model,
+        response.provider.value,
+        response.usage,
+        response.timestamp.isoformat(),
+        response.request_id,
+    ])
+    codec = CODEC_RAW
+    if len(payload) >= compress_min_bytes:
+        payload = zlib.compress(payload, 1)
+        codec = CODEC_ZLIB
+    return bytes((CACHE_FORMAT_VERSION, codec)) + payload
+
+def decode_response(data: bytes) -> AIResponse:
+    """Decode a cached response written by encode_response (or legacy JSON)"""
+    if data[:1] == b"{":
+        return AIResponse.model_validate_json(data)
+    if len(data) < 2 or data[0] != CACHE_FORMAT_VERSION:
+        raise CacheDecodeError(f"Unknown cache format version {data[:1]!r}")
+
+    payload = data[2:]
+    if data[1] == CODEC_ZLIB:
+        payload = zlib.decompress(payload)
+    elif data[1] != CODEC_RAW:
+        raise CacheDecodeError(f"Unknown cache codec {data[1]}")
+
+    content, model, provider, usage, timestamp, request_id = orjson.loads(payload)
+    # Written by encode_response from a validated model, so skip re-validation
+    return AIResponse.model_construct(
+        content=content,
+        model=model,
+        provider=AIProvider(provider),
+        usage=usage,
+        timestamp=datetime.fromisoformat(timestamp),
+        request_id=request_id
+    )
+
+class ResponseCache:
+    """Two-tier (in-process + Redis) AI response cache with single-flight coalescing"""
+
+    def __init__(
+        self,
+        ttl: int = settings.RESPONSE_CACHE_TTL,
+        local_ttl: int = settings.RESPONSE_CACHE_LOCAL_TTL,
+        local_max_entries: int = settings.RESPONSE_CACHE_LOCAL_MAX_ENTRIES
+    ):
+        self.ttl = ttl
+        self.local = TTLCache(max_entries=local_max_entries, ttl=local_ttl)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+        }
+
+    async def get(self, cache_key: str) -> Optional[AIResponse]:
+        """Look up a response in the local tier, then Redis"""
+        response = self.local.get(cache_key)
+        if response is not None:
+            self.stats["local_hits"] += 1
+            return response
+
+        response = await self._get_remote(cache_key)
+        if response is not None:
+            self.stats["redis_hits"] += 1
+            self.local.set(cache_key, response)
+        return response
+
+    async def set(self, cache_key: str, response: AIResponse, ttl: Optional[int] = None):
+        """Store a response in both tiers"""
+        self.local.set(cache_key, response)
+        await self._set_remote(cache_key, response, ttl or self.ttl)
+
+    async def get_many(self, cache_keys: List[str]) -> Dict[str, AIResponse]:
+        """Look up several responses: the local tier, then one Redis MGET for the rest"""
+        found: Dict[str, AIResponse] = {}
+        remote_keys = []
+        for cache_key in cache_keys:
+            response = self.local.get(cache_key)
+            if response is not None:
+                self.stats["local_hits"] += 1
+                found[cache_key] = response
+            else:
+                remote_keys.append(cache_key)
+        if not remote_keys:
+            return found
+
+        try:
+            start = time.perf_counter()
+            values = await cache.get_many(remote_keys)
+            metrics.REDIS_DURATION.labels("mget").observe(time.perf_counter() - start)
+        except CircuitOpenError:
+            # Redis is known to be down; skip it rather than wait for a timeout
+            return found
+        except Exception as e:
+            logger.warning(f"Cache retrieval error: {str(e)}")
+            return found
+        for cache_key, value in zip(remote_keys, values):
+            if not value:
+                continue
+            try:
+                response = decode_response(value)
+            except Exception as e:
+                logger.warning(f"Cache decode error: {str(e)}")
+                continue
+            self.stats["redis_hits"] += 1
+            self.local.set(cache_key, response)
+            found[cache_key] = response
+        return found
+
+    async def set_many(self, responses: Dict[str, AIResponse], ttl: Optional[int] = None):
+        """Store several responses in both tiers with one pipelined Redis round trip"""
+        for cache_key, response in responses.items():
+            self.local.set(cache_key, response)
+        try:
+            start = time.perf_counter()
+            await cache.set_many(
+                {cache_key: encode_response(response) for cache_key, response in responses.items()},
+                ttl or self.ttl
+            )
+            metrics.REDIS_DURATION.labels("pipeline").observe(time.perf_counter() - start)
+        except CircuitOpenError:
+            pass
+        except Exception as e:
+            logger.warning(f"Cache storage error: {str(e)}")
+
+    async def get_or_load(
+        self,
+        cache_key: str,
+        loader: Callable[[], Awaitable[AIResponse]]
+    ) -> AIResponse:
+        """
+        Return a cached response or run the loader once for all concurrent callers.
+
+        If the caller running the loader is cancelled (a batch item timeout or
+        a client disconnect), its waiters are not: the next one takes over the
+        load.
+        """
+        while True:
+            response = self.local.get(cache_key)
+            if response is not None:
+                self.stats["local_hits"] += 1
+                return response
+
+            inflight = self._inflight.get(cache_key)
+            if inflight is None:
+                return await self._load(cache_key, loader)
+
+            self.stats["coalesced"] += 1
+            # Unlike awaiting the future, wait() only raises if this caller is cancelled
+            await asyncio.wait({inflight})
+            if not inflight.cancelled():
+                return inflight.result()
+
+    async def _load(self, cache_key: str, loader: Callable[[], Awaitable[AIResponse]]) -> AIResponse:
+        future = asyncio.get_running_loop().create_future()
+        # Avoid "exception was never retrieved" warnings when nobody is waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[cache_key] = future
+        try:
+            response = await self._get_remote(cache_key)
+            if response is not None:
+                self.stats["redis_hits"] += 1
+                self.local.set(cache_key, response)
+            else:
+                self.stats["misses"] += 1
+                response = await loader()
+                await self.set(cache_key, response)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Snapshot of cache counters"""
+        return {
+            **self.stats,
+            "inflight": len(self._inflight),
+            "local_entries": len(self.local),
+        }
+
+    async def _get_remote(self, cache_key: str) -> Optional[AIResponse]:
+        try:
+            if cache.redis_client is None:
+                return None
+            start = time.perf_counter()
+            async with cache.redis_guard():
+                cached = await cache.redis_client.get(cache_key)
+            metrics.REDIS_DURATION.labels("get").observe(time.perf_counter() - start)
+            if cached:
+                return decode_response(cached)
+        except CircuitOpenError:
+            # Redis is known to be down; skip it rather than wait for a timeout
+            pass
+        except Exception as e:
+            logger.warning(f"Cache retrieval error: {str(e)}")
+        return None
+
+    async def _set_remote(self, cache_key: str, response: AIResponse, ttl: int):
+        try:
+            if cache.redis_client is None:
+                return
+            start = time.perf_counter()
+            async with cache.redis_guard():
+                await cache.redis_client.setex(cache_key, ttl, encode_response(response))
+            metrics.REDIS_DURATION.labels("setex").observe(time.perf_counter() - start)
+        except CircuitOpenError:
+            pass
+        except Exception as e:
+            logger.warning(f"Cache storage error: {str(e)}")
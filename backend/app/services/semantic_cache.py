@@ -0,0 +1,218 @@
+import json
+import math
+import os
+import re
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.ai_models import AIRequest, AIResponse, ConversationDomain
+from app.core.config import settings
+from app.core.logging import logger
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Function words and question phrasing that do not change what is being asked
+STOP_WORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "be", "of", "to", "in", "on", "for", "and", "or",
+    "it", "its", "this", "that", "what", "whats", "how", "why", "can", "could", "would",
+    "you", "me", "my", "i", "please", "explain", "describe", "tell", "about", "do", "does",
+})
+
+class HashingEmbedder:
+    """Offline hashing vectorizer over word unigrams and bigrams"""
+
+    def __init__(self, dim: int = settings.SEMANTIC_CACHE_DIM):
+        self.dim = dim
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed text as an L2-normalized float32 vector"""
+        tokens = [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOP_WORDS]
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+        counts: Dict[int, float] = {}
+        for feature in features:
+            # crc32 is stable across processes, unlike hash(), so snapshots stay valid
+            h = zlib.crc32(feature.encode("utf-8"))
+            index = h % self.dim
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            counts[index] = counts.get(index, 0.0) + sign
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for index, count in counts.items():
+            # Sublinear term frequency
+            vector[index] = math.copysign(1.0 + math.log(abs(count)), count) if count else 0.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+class SemanticIndex:
+    """Bounded cosine-similarity index backed by a growable NumPy matrix"""
+
+    INITIAL_ROWS = 1024
+
+    def __init__(self, capacity: int, dim: int):
+        self.capacity = capacity
+        self.dim = dim
+        self.size = 0
+        self._clock = 0
+        rows = min(self.INITIAL_ROWS, capacity)
+        self.vectors = np.zeros((rows, dim), dtype=np.float32)
+        self.scopes = np.zeros(rows, dtype=np.int32)
+        self.expires_at = np.zeros(rows, dtype=np.float64)
+        self.last_used = np.zeros(rows, dtype=np.int64)
+        self.responses: List[Optional[AIResponse]] = [None] * rows
+
+    def search(self, vector: np.ndarray, scope: int, now: float) -> Tuple[int, float]:
+        """Return the best live row for a scope and its cosine similarity"""
+        if self.size == 0:
+            return -1, 0.0
+        scores = self.vectors[:self.size] @ vector
+        invalid = (self.scopes[:self.size] != scope) | (self.expires_at[:self.size] <= now)
+        scores[invalid] = -1.0
+        row = int(np.argmax(scores))
+        return row, float(scores[row])
+
+    def touch(self, row: int):
+        self._clock += 1
+        self.last_used[row] = self._clock
+
+    def add(self, vector: np.ndarray, scope: int, response: AIResponse, expires_at: float):
+        """Insert an entry, evicting the least recently used one when full"""
+        if self.size < self.capacity:
+            if self.size == len(self.vectors):
+                self._grow(min(self.capacity, len(self.vectors) * 2))
+            row = self.size
+            self.size += 1
+        else:
+            row = int(np.argmin(self.last_used[:self.size]))
+        self.vectors[row] = vector
+        self.scopes[row] = scope
+        self.expires_at[row] = expires_at
+        self.responses[row] = response
+        self.touch(row)
+
+    def _grow(self, rows: int):
+        extra = rows - len(self.vectors)
+        self.vectors = np.vstack([self.vectors, np.zeros((extra, self.dim), dtype=np.float32)])
+        self.scopes = np.concatenate([self.scopes, np.zeros(extra, dtype=np.int32)])
+        self.expires_at = np.concatenate([self.expires_at, np.zeros(extra, dtype=np.float64)])
+        self.last_used = np.concatenate([self.last_used, np.zeros(extra, dtype=np.int64)])
+        self.responses.extend([None] * extra)
+
+class SemanticCache:
+    """Paraphrase-tolerant response cache, one similarity index per conversation domain"""
+
+    def __init__(
+        self,
+        threshold: float = settings.SEMANTIC_CACHE_THRESHOLD,
+        capacity: int = settings.SEMANTIC_CACHE_CAPACITY,
+        dim: int = settings.SEMANTIC_CACHE_DIM,
+        ttl: int = settings.RESPONSE_CACHE_TTL
+    ):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl = ttl
+        self.embedder = HashingEmbedder(dim)
+        self.indexes: Dict[str, SemanticIndex] = {}
+        self._scope_ids: Dict[str, int] = {}
+        self.stats = {"hits": 0, "misses": 0, "skipped": 0}
+
+    def lookup(self, request: AIRequest, model: str) -> Optional[AIResponse]:
+        """Return a cached response for a semantically equivalent question"""
+        query = self._get_query(request)
+        if query is None:
+            self.stats["skipped"] += 1
+            return None
+
+        index = self.indexes.get(request.context.domain.value)
+        scope = self._scope_ids.get(self._scope_key(request, model))
+        if index is None or scope is None:
+            self.stats["misses"] += 1
+            return None
+
+        row, score = index.search(self.embedder.embed(query), scope, time.time())
+        if row < 0 or score < self.threshold:
+            self.stats["misses"] += 1
+            return None
+
+        index.touch(row)
+        self.stats["hits"] += 1
+        return index.responses[row]
+
+    def add(self, request: AIRequest, model: str, response: AIResponse):
+        """Index a response under the request's last user message"""
+        query = self._get_query(request)
+        if query is None:
+            return
+        domain = request.context.domain.value
+        index = self.indexes.get(domain)
+        if index is None:
+            index = self.indexes[domain] = SemanticIndex(self.capacity, self.embedder.dim)
+        scope_key = self._scope_key(request, model)
+        scope = self._scope_ids.setdefault(scope_key, len(self._scope_ids))
+        index.add(self.embedder.embed(query), scope, response, time.time() + self.ttl)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            "entries": sum(index.size for index in self.indexes.values()),
+        }
+
+    def snapshot(self, path: str):
+        """Write all indexes to a single .npz file"""
+        arrays = {"scope_ids": np.array(json.dumps(self._scope_ids))}
+        for domain, index in self.indexes.items():
+            n = index.size
+            arrays[f"{domain}__vectors"] = index.vectors[:n]
+            arrays[f"{domain}__scopes"] = index.scopes[:n]
+            arrays[f"{domain}__expires_at"] = index.expires_at[:n]
+            arrays[f"{domain}__responses"] = np.array(
+                json.dumps([response.model_dump(mode="json") for response in index.responses[:n]])
+            )
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        logger.info(f"Semantic cache snapshot written: {self.get_stats()['entries']} entries")
+
+    def restore(self, path: str):
+        """Load indexes from a snapshot, skipping entries that have expired"""
+        now = time.time()
+        with np.load(path, allow_pickle=False) as data:
+            self._scope_ids = json.loads(str(data["scope_ids"]))
+            self.indexes = {}
+            for domain in ConversationDomain:
+                key = domain.value
+                if f"{key}__vectors" not in data:
+                    continue
+                responses = json.loads(str(data[f"{key}__responses"]))
+                index = self.indexes[key] = SemanticIndex(self.capacity, self.embedder.dim)
+                for vector, scope, expires_at, response in zip(
+                    data[f"{key}__vectors"],
+                    data[f"{key}__scopes"],
+                    data[f"{key}__expires_at"],
+                    responses
+                ):
+                    if expires_at > now and vector.shape[0] == self.embedder.dim:
+                        index.add(vector, int(scope), AIResponse.model_validate(response), float(expires_at))
+        logger.info(f"Semantic cache restored: {self.get_stats()['entries']} entries")
+
+    def _get_query(self, request: AIRequest) -> Optional[str]:
+        # Only single-turn questions are safe to answer by similarity; follow-ups depend on history
+        turns = [msg for msg in request.messages if msg.role != "system"]
+        if len(turns) != 1 or turns[0].role != "user":
+            return None
+        return turns[0].content
+
+    def _scope_key(self, request: AIRequest, model: str) -> str:
+        return json.dumps([
+            request.provider.value,
+            model,
+            request.temperature,
+            request.max_tokens,
+            request.context.specific_context,
+        ])
@@ -0,0 +1,339 @@
+"""
+Compact in-process conversation history.
+
+A List[AIMessage] costs several hundred bytes per message on top of its
+text: the pydantic model and its __dict__, a datetime and a role string.
+CompactHistory keeps a session's messages as parallel arrays instead: one
+byte per role code, message ids and epoch-microsecond timestamps in
+array("q"), and every content in one contiguous UTF-8 buffer addressed by
+end offsets. AIMessage objects are only built at the edge, for the
+messages a caller asks for. A history may hold only the newest messages
+of a conversation; history pages read from the database extend it
+backwards, a page at a time.
+
+SessionMemory keeps recently used sessions in this form. Sessions idle for
+SESSION_MEMORY_COLD_AFTER seconds have their text compressed (zstd when the
+zstandard package is installed, zlib otherwise) until they are read again.
+"""
+
+import bisect
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.ai_models import AIMessage
+from app.core.config import settings
+
+try:
+    import zstandard  # Optional: better ratio and speed than zlib for cold sessions
+except ImportError:
+    zstandard = None
+
+ROLES = ("user", "assistant", "system")
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+EPOCH = datetime(1970, 1, 1)
+
+# (message id, role, content, timestamp)
+MessageRow = Tuple[int, str, str, datetime]
+
+def to_epoch_us(timestamp: datetime) -> int:
+    """Naive-UTC datetime (as stored in the database) to epoch microseconds"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = timestamp - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+def from_epoch_us(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+def compress(data: bytes) -> bytes:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return zlib.compress(data, 1)
+
+def decompress(data: bytes) -> bytes:
+    if zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+class CompactHistory:
+    """
+    One session's messages in parallel arrays, oldest first.
+
+    The first `skipped` messages of the conversation are not held. Message
+    positions (len, messages) count from the start of the conversation.
+    """
+
+    __slots__ = ("ids", "roles", "timestamps", "ends", "text", "packed", "last_used", "skipped")
+
+    def __init__(self, rows: Iterable[MessageRow] = (), skipped: int = 0):
+        self.skipped = skipped
+        self.ids = array("q")
+        self.roles = bytearray()
+        self.timestamps = array("q")
+        # End offset of each message's content in `text`
+        self.ends = array("Q")
+        self.text = bytearray()
+        # Compressed `text` while the session is cold
+        self.packed: Optional[bytes] = None
+        self.last_used = time.monotonic()
+        self.extend(rows)
+
+    def __len__(self) -> int:
+        return self.skipped + len(self.roles)
+
+    @property
+    def cold(self) -> bool:
+        return self.packed is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held, for the store's budget"""
+        count = len(self.roles)
+        return count * 25 + (len(self.packed) if self.packed is not None else len(self.text))
+
+    def extend(self, rows: Iterable[MessageRow]):
+        self.thaw()
+        for message_id, role, content, timestamp in rows:
+            self.ids.append(message_id)
+            self.roles.append(ROLE_CODES[role])
+            self.timestamps.append(to_epoch_us(timestamp))
+            self.text += content.encode("utf-8")
+            self.ends.append(len(self.text))
+
+    def prepend(self, rows: List[MessageRow]):
+        """Add the held messages' immediate predecessors, oldest first"""
+        self.thaw()
+        head = CompactHistory(rows)
+        shift = len(head.text)
+        self.ids = head.ids + self.ids
+        self.roles = head.roles + self.roles
+        self.timestamps = head.timestamps + self.timestamps
+        self.ends = head.ends + array("Q", (end + shift for end in self.ends))
+        self.text = head.text + self.text
+        self.skipped -= len(rows)
+
+    def messages(self, start: int = 0, stop: Optional[int] = None) -> List[AIMessage]:
+        """Build API messages for a slice of the conversation; `start` must not be before the held messages"""
+        if start < self.skipped:
+            raise IndexError(f"Messages before {self.skipped} are not held")
+        return self._build(start - self.skipped, len(self.roles) if stop is None else stop - self.skipped)
+
+    def since(self, last_id: int) -> Optional[Tuple[List[AIMessage], int]]:
+        """
+        The messages with ids after `last_id`, and the id of the last one (`last_id` if there are none).
+
+        None if some of them are not held.
+        """
+        if self.skipped and not (self.ids and last_id >= self.ids[0]):
+            return None
+        start = bisect.bisect_right(self.ids, last_id)
+        return self._build(start, len(self.ids)), (self.ids[-1] if start < len(self.ids) else last_id)
+
+    def page(self, limit: int, before: Optional[int] = None) -> Optional[Tuple[List[AIMessage], Optional[int]]]:
+        """
+        Same paging as ConversationStore.get_history: the `limit` messages before id `before`.
+
+        None if the page reaches back past the held messages.
+        """
+        stop = len(self.ids) if before is None else bisect.bisect_left(self.ids, before)
+        start = stop - limit
+        if start < 0:
+            if self.skipped:
+                return None
+            start = 0
+        return self._build(start, stop), (self.ids[start] if start > 0 or self.skipped else None)
+
+    def _build(self, start: int, stop: int) -> List[AIMessage]:
+        # Indexes into the held arrays
+        self.thaw()
+        text, ends = self.text, self.ends
+        offset = ends[start - 1] if start > 0 else 0
+        messages = []
+        for index in range(start, stop):
+            end = ends[index]
+            # Validating is cheaper than model_construct for a model this small
+            messages.append(AIMessage(
+                role=ROLES[self.roles[index]],
+                content=text[offset:end].decode("utf-8"),
+                timestamp=from_epoch_us(self.timestamps[index])
+            ))
+            offset = end
+        return messages
+
+    def freeze(self):
+        """Compress the text of a session that has gone cold"""
+        if self.packed is None:
+            self.packed = compress(bytes(self.text))
+            self.text = bytearray()
+
+    def thaw(self):
+        if self.packed is not None:
+            self.text = bytearray(decompress(self.packed))
+            self.packed = None
+
+class SessionMemory:
+    """
+    Recently used sessions' histories within a memory budget.
+
+    Histories are only served when their length matches the session's
+    message count from the database, so appends made by other workers are
+    detected and the stale copy is dropped. Sessions idle for `cold_after`
+    seconds are compressed; the least recently used are evicted, cold ones
+    first, while there are more than `max_sessions` or they hold more than
+    `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = settings.SESSION_MEMORY_MAX_SESSIONS,
+        max_bytes: int = settings.SESSION_MEMORY_MAX_BYTES,
+        cold_after: float = settings.SESSION_MEMORY_COLD_AFTER,
+        max_messages: int = settings.SESSION_MEMORY_MAX_MESSAGES
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.cold_after = cold_after
+        self.max_messages = max_messages
+        self.total_bytes = 0
+        # Both in least recently used order
+        self._hot: "OrderedDict[str, CompactHistory]" = OrderedDict()
+        self._cold: "OrderedDict[str, CompactHistory]" = OrderedDict()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "frozen": 0,
+            "evicted": 0,
+        }
+
+    def get(self, session_id: str, message_count: int) -> Optional[CompactHistory]:
+        """The session's history if it is cached and holds exactly `message_count` messages"""
+        history = self._lookup(session_id)
+        if history is None:
+            self.stats["misses"] += 1
+            return None
+        if len(history) != message_count:
+            self.stats["stale"] += 1
+            self.discard(session_id)
+            return None
+        self.stats["hits"] += 1
+        self._touch(session_id, history)
+        self._sweep()
+        return history
+
+    def put(self, session_id: str, history: CompactHistory):
+        if len(history) > self.max_messages:
+            return
+        self.discard(session_id)
+        self._hot[session_id] = history
+        self.total_bytes += history.nbytes
+        self._sweep()
+
+    def append(self, session_id: str, rows: List[MessageRow], message_count: int):
+        """Extend a cached history with rows just appended, if it was current before them"""
+        history = self._lookup(session_id)
+        if history is None:
+            return
+        if len(history) != message_count - len(rows) or message_count > self.max_messages:
+            # Appends happened elsewhere (another worker); reload on next read
+            self.discard(session_id)
+            return
+        self._touch(session_id, history)
+        self.total_bytes -= history.nbytes
+        history.extend(rows)
+        self.total_bytes += history.nbytes
+        self._sweep()
+
+    def add_page(
+        self,
+        session_id: str,
+        rows: List[MessageRow],
+        message_count: int,
+        before: Optional[int],
+        reached_start: bool
+    ):
+        """
+        Keep a history page just read from the database, oldest row first.
+
+        The newest page starts a history holding only those messages; a page
+        reaching back past a cached history's first message extends it.
+        """
+        if message_count > self.max_messages:
+            return
+        history = self._lookup(session_id)
+        if history is None:
+            skipped = 0 if reached_start else message_count - len(rows)
+            if before is None and skipped >= 0:
+                self.put(session_id, CompactHistory(rows, skipped))
+            return
+        if len(history) != message_count or not history.ids or (before is not None and before < history.ids[0]):
+            return
+
+        first_id = history.ids[0]
+        older = [row for row in rows if row[0] < first_id]
+        skipped = history.skipped - len(older)
+        if skipped < 0 or (reached_start and skipped):
+            # The database disagrees with the cached history
+            self.discard(session_id)
+            return
+        self.total_bytes -= history.nbytes
+        history.prepend(older)
+        self.total_bytes += history.nbytes
+        self._sweep()
+
+    def discard(self, session_id: str):
+        history = self._hot.pop(session_id, None)
+        if history is None:
+            history = self._cold.pop(session_id, None)
+        if history is not None:
+            self.total_bytes -= history.nbytes
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            "sessions": len(self),
+            "cold_sessions": len(self._cold),
+            "bytes": self.total_bytes,
+        }
+
+    def __len__(self) -> int:
+        return len(self._hot) + len(self._cold)
+
+    def _lookup(self, session_id: str) -> Optional[CompactHistory]:
+        # Not `or`: an empty history is falsy
+        history = self._hot.get(session_id)
+        return self._cold.get(session_id) if history is None else history
+
+    def _touch(self, session_id: str, history: CompactHistory):
+        history.last_used = time.monotonic()
+        if history.cold:
+            del self._cold[session_id]
+            self.total_bytes -= history.nbytes
+            history.thaw()
+            self.total_bytes += history.nbytes
+            self._hot[session_id] = history
+        else:
+            self._hot.move_to_end(session_id)
+
+    def _sweep(self):
+        now = time.monotonic()
+        while self._hot:
+            session_id, history = next(iter(self._hot.items()))
+            if now - history.last_used < self.cold_after:
+                break
+            del self._hot[session_id]
+            self.total_bytes -= history.nbytes
+            history.freeze()
+            self.total_bytes += history.nbytes
+            self._cold[session_id] = history
+            self.stats["frozen"] += 1
+
+        while len(self) > self.max_sessions or (self.total_bytes > self.max_bytes and len(self) > 1):
+            sessions = self._cold or self._hot
+            session_id, history = sessions.popitem(last=False)
+            self.total_bytes -= history.nbytes
+            self.stats["evicted"] += 1
@@ -0,0 +1,165 @@
+import json
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+from app.models.ai_models import AIMessage
+from app.core.config import settings
+from app.core.logging import logger
+
+# A letter or digit; keywords start and end where the text around them is not one
+WORD_CHAR = re.compile(r"[^\W_]")
+BOUNDARY = r"(?![^\W_])"
+WORD_END, STEM_END = "<word>", "<stem>"
+
+# Topic -> keywords. Keywords match whole words; a trailing "*" marks a stem, so "learn*" also matches "learning"
+DEFAULT_TAXONOMY: Dict[str, List[str]] = {
+    "AWS": ["aws", "amazon web services"],
+    "AWS Services": [
+        "ec2", "lambda", "s3", "dynamodb", "rds", "aurora", "vpc", "iam", "cloudfront",
+        "cloudformation", "cloudwatch", "sqs", "sns", "kinesis", "ecs", "eks", "fargate",
+        "api gateway", "route 53", "route53", "elasticache", "cognito", "step functions",
+    ],
+    "AWS Certification": [
+        "certif*", "exam", "exams", "developer associate",
+        "solutions architect*", "sysops", "practice test*",
+    ],
+    "Learning": [
+        "study", "studies", "studying", "studied", "learn*", "course", "courses",
+        "lecture*", "revision*", "flashcard*", "homework",
+    ],
+    "Project Management": ["project", "projects", "milestone*", "deadline*", "roadmap*", "sprint*", "task", "tasks"],
+    "Finance": [
+        "budget*", "saving*", "expense*", "invest*", "income", "debt*", "loan*",
+        "retirement", "credit*", "spending",
+    ],
+}
+
+def load_taxonomy() -> Dict[str, List[str]]:
+    """The taxonomy from TOPIC_TAXONOMY_PATH, falling back to the default taxonomy"""
+    path = settings.TOPIC_TAXONOMY_PATH
+    if path:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Topic taxonomy load failed, using defaults: {str(e)}")
+    return DEFAULT_TAXONOMY
+
+class TopicEngine:
+    """
+    Tags topics with one compiled regex over each text.
+
+    The keywords of every topic are merged into a single alternation,
+    factored by common prefix so the regex engine picks a branch per
+    character instead of trying every keyword at every position. Each match
+    maps back to the topics of the keyword it found, plus those of shorter
+    keywords that also matched at the same word start: stems, and whole
+    keywords that end at a word boundary inside it.
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        self.topics: List[str] = list(taxonomy)
+        # (keyword, is stem) -> topic indices
+        keyword_topics: Dict[Tuple[str, bool], List[int]] = {}
+        for topic_index, keywords in enumerate(taxonomy.values()):
+            for keyword in keywords:
+                keyword = keyword.lower().strip()
+                stem = keyword.endswith("*")
+                key = (keyword.rstrip("*"), stem)
+                if key[0] and topic_index not in keyword_topics.setdefault(key, []):
+                    keyword_topics[key].append(topic_index)
+        # Matched keyword -> topic indices to count when it ends at a word boundary, and when the word goes on
+        self._hits: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {
+            keyword: (_matched_topics(keyword, True, keyword_topics), _matched_topics(keyword, False, keyword_topics))
+            for keyword, _ in keyword_topics
+        }
+        # Not preceded by a letter or digit; the lookahead lets matches overlap. The second group
+        # captures the next character if it continues the word, so stems and whole words can share a match
+        self._pattern = (
+            re.compile(rf"(?<![^\W_])(?=({_trie_pattern(keyword_topics)})([^\W_]?))") if keyword_topics else None
+        )
+
+    @classmethod
+    def from_settings(cls) -> "TopicEngine":
+        """Build the engine from TOPIC_TAXONOMY_PATH, falling back to the default taxonomy"""
+        return cls(load_taxonomy())
+
+    def match(self, text: str) -> Dict[int, int]:
+        """Count keyword hits per topic index"""
+        counts: Dict[int, int] = {}
+        if self._pattern is None:
+            return counts
+        hits = self._hits
+        for keyword, following in self._pattern.findall(text.lower()):
+            for topic in hits[keyword][bool(following)]:
+                counts[topic] = counts.get(topic, 0) + 1
+        return counts
+
+    def extract_topics(self, messages: Iterable[AIMessage]) -> List[str]:
+        """Topics mentioned in the messages, most frequent first"""
+        return self.analyze(messages)["topics"]
+
+    def analyze(self, messages: Iterable[AIMessage]) -> Dict[str, Any]:
+        """Compute message counts, length and topic frequencies in one pass"""
+        message_count = 0
+        user_messages = 0
+        assistant_messages = 0
+        conversation_length = 0
+        topic_counts = [0] * len(self.topics)
+
+        for msg in messages:
+            message_count += 1
+            if msg.role == "user":
+                user_messages += 1
+            elif msg.role == "assistant":
+                assistant_messages += 1
+            conversation_length += len(msg.content)
+            for topic, count in self.match(msg.content).items():
+                topic_counts[topic] += count
+
+        ranked = sorted(
+            ((self.topics[i], count) for i, count in enumerate(topic_counts) if count),
+            key=lambda item: -item[1]
+        )
+        return {
+            "message_count": message_count,
+            "user_messages": user_messages,
+            "assistant_messages": assistant_messages,
+            "conversation_length": conversation_length,
+            "topics": [topic for topic, _ in ranked],
+            "topic_counts": dict(ranked),
+        }
+
+def _matched_topics(matched: str, at_boundary: bool, keyword_topics: Dict[Tuple[str, bool], List[int]]) -> Tuple[int, ...]:
+    """Topics of every keyword that matches where `matched` did"""
+    topics: List[int] = []
+    for (keyword, stem), keyword_topic_indices in keyword_topics.items():
+        if not matched.startswith(keyword):
+            continue
+        # A whole keyword needs a boundary right after it: the end of the match, or a non-word character inside it
+        if stem or (at_boundary if keyword == matched else not WORD_CHAR.match(matched, len(keyword))):
+            topics.extend(topic for topic in keyword_topic_indices if topic not in topics)
+    return tuple(topics)
+
+def _trie_pattern(keywords: Iterable[Tuple[str, bool]]) -> str:
+    """Alternation of the keywords factored into a prefix tree, longest match first"""
+    trie: Dict[str, dict] = {}
+    for keyword, stem in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        # Keys longer than one character mark where a keyword ends
+        node[STEM_END if stem else WORD_END] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if len(char) == 1]
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")" if branches else ""
+        # A keyword ends here: the longer continuations are tried first, then the keyword itself,
+        # which as a whole word must be followed by a word boundary
+        if STEM_END in node:
+            return f"(?:{body})?" if body else ""
+        if WORD_END in node:
+            return f"(?:{body}|{BOUNDARY})" if body else BOUNDARY
+        return body
+
+    return emit(trie)
@@ -0,0 +1,196 @@
+"""
+Celery tasks for post-chat conversation analysis and cache warming.
+
+The API pushes analysis jobs onto a Redis list and schedules at most one
+drain task per batch window, as long as a worker answers pings and the
+list is below ANALYSIS_QUEUE_MAX_LENGTH; otherwise it analyzes in-process. Workers pop up to ANALYSIS_WORKER_BATCH_SIZE
+jobs at a time, analyze them and store the results with one batched insert.
+Cache warming runs off-peak on Celery beat (see app/services/cache_warmer.py).
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import redis
+from celery import shared_task
+
+from app.models.ai_models import AIMessage, AIRequest, AIResponse, ConversationContext
+from app.core import cache
+from app.core import celery_app as celery_core
+from app.core import database
+from app.core.config import settings
+from app.core.logging import logger
+
+SCHEDULED_KEY_SUFFIX = ":scheduled"
+
+def build_analysis_job(request: AIRequest, response: AIResponse) -> Dict[str, Any]:
+    """Serialize what the analysis needs from a chat exchange"""
+    return {
+        "conversation_id": request.conversation_id,
+        # Plain dicts: model_dump costs several times more per message on long histories
+        "messages": [
+            {"role": msg.role, "content": msg.content, "timestamp": msg.timestamp.isoformat()}
+            for msg in request.messages
+        ],
+        "context": request.context.model_dump(mode="json"),
+        "provider": response.provider.value,
+        "model": response.model,
+    }
+
+async def run_analysis_jobs(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Analyze a batch of jobs and store the results"""
+    from app.services.ai_service import ai_service
+    from app.services.conversation_store import conversation_store
+
+    conversations = [
+        (
+            [AIMessage.model_validate(msg) for msg in job["messages"]],
+            ConversationContext.model_validate(job["context"])
+        )
+        for job in jobs
+    ]
+    analyses = await ai_service.analyze_conversations(conversations)
+
+    try:
+        await conversation_store.save_analyses([
+            {
+                "conversation_id": job.get("conversation_id"),
+                "domain": job["context"]["domain"],
+                "provider": job.get("provider"),
+                "model": job.get("model"),
+                "results": analysis,
+            }
+            for job, analysis in zip(jobs, analyses)
+        ])
+    except Exception as e:
+        logger.error(f"Saving analysis results failed: {str(e)}")
+    return analyses
+
+# Worker liveness as last seen by this API process, refreshed in the background
+_workers_alive: Optional[bool] = None
+_workers_checked_at = float("-inf")
+_workers_check: Optional[asyncio.Task] = None
+
+def workers_available() -> bool:
+    """Whether a Celery worker answered the last ping; starts a new ping when that one is stale"""
+    global _workers_check, _workers_checked_at
+    now = time.monotonic()
+    if now - _workers_checked_at >= settings.ANALYSIS_WORKER_PING_INTERVAL and (
+        _workers_check is None or _workers_check.done()
+    ):
+        _workers_checked_at = now
+        _workers_check = asyncio.create_task(_ping_workers())
+    return bool(_workers_alive)
+
+async def _ping_workers():
+    global _workers_alive
+    try:
+        replies = await asyncio.to_thread(
+            celery_core.celery_app.control.ping,
+            timeout=settings.ANALYSIS_WORKER_PING_TIMEOUT
+        )
+    except Exception as e:
+        logger.warning(f"Celery worker ping failed: {str(e)}")
+        replies = []
+    alive = bool(replies)
+    if alive != _workers_alive:
+        if alive:
+            logger.info(f"✅ {len(replies)} Celery worker(s) available for analysis")
+        else:
+            logger.warning("No Celery worker answered; analyzing conversations in-process")
+    _workers_alive = alive
+
+async def enqueue_analysis(request: AIRequest, response: AIResponse) -> bool:
+    """
+    Queue a chat exchange for batched analysis on the Celery workers.
+
+    Returns False when Celery or Redis is unavailable, no worker is alive or
+    the queue is full, so the caller can fall back to running the analysis
+    in-process.
+    """
+    if celery_core.celery_app is None or not cache.redis_available() or not workers_available():
+        return False
+
+    try:
+        queue_key = settings.ANALYSIS_QUEUE_KEY
+        if await cache.redis_client.llen(queue_key) >= settings.ANALYSIS_QUEUE_MAX_LENGTH:
+            logger.debug("Analysis queue full, running in-process")
+            return False
+        await cache.redis_client.rpush(queue_key, json.dumps(build_analysis_job(request, response)))
+
+        # Only the first job of a window schedules the drain task
+        window_ms = settings.ANALYSIS_WORKER_BATCH_WINDOW_MS
+        if await cache.redis_client.set(queue_key + SCHEDULED_KEY_SUFFIX, 1, nx=True, px=window_ms * 10):
+            await asyncio.to_thread(
+                process_analysis_batch.apply_async,
+                countdown=window_ms / 1000
+            )
+        return True
+    except Exception as e:
+        logger.warning(f"Analysis enqueue failed, running in-process: {str(e)}")
+        return False
+
+# Worker-side state: one sync Redis client and one event loop per worker process
+_worker_redis: Optional[redis.Redis] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_worker_redis() -> redis.Redis:
+    global _worker_redis
+    if _worker_redis is None:
+        _worker_redis = redis.Redis.from_url(settings.REDIS_URL)
+    return _worker_redis
+
+def _run_async(coro):
+    """Run a coroutine on the worker's persistent loop, initializing the database once"""
+    global _worker_loop
+    if _worker_loop is None:
+        _worker_loop = asyncio.new_event_loop()
+        _worker_loop.run_until_complete(database.init_db())
+    return _worker_loop.run_until_complete(coro)
+
+def _pop_jobs(client: redis.Redis, count: int) -> List[Dict[str, Any]]:
+    """Atomically pop up to `count` jobs from the head of the queue"""
+    queue_key = settings.ANALYSIS_QUEUE_KEY
+    pipe = client.pipeline(transaction=True)
+    pipe.lrange(queue_key, 0, count - 1)
+    pipe.ltrim(queue_key, count, -1)
+    raw_jobs, _ = pipe.execute()
+
+    jobs = []
+    for raw in raw_jobs:
+        try:
+            jobs.append(json.loads(raw))
+        except ValueError as e:
+            logger.error(f"Dropping malformed analysis job: {str(e)}")
+    return jobs
+
+@shared_task(name="app.tasks.process_analysis_batch", ignore_result=True)
+def process_analysis_batch() -> int:
+    """Drain one micro-batch of analysis jobs"""
+    client = _get_worker_redis()
+    queue_key = settings.ANALYSIS_QUEUE_KEY
+    scheduled_key = queue_key + SCHEDULED_KEY_SUFFIX
+
+    jobs = _pop_jobs(client, settings.ANALYSIS_WORKER_BATCH_SIZE)
+    if jobs:
+        _run_async(run_analysis_jobs(jobs))
+        logger.info(f"Analyzed batch of {len(jobs)} conversations")
+
+    if client.llen(queue_key):
+        # More than one batch arrived in the window; keep draining immediately
+        process_analysis_batch.delay()
+    else:
+        client.delete(scheduled_key)
+        # A job pushed between the last pop and the delete would otherwise wait for the next enqueue
+        if client.llen(queue_key) and client.set(scheduled_key, 1, nx=True, px=settings.ANALYSIS_WORKER_BATCH_WINDOW_MS * 10):
+            process_analysis_batch.delay()
+    return len(jobs)
+
+@shared_task(name="app.tasks.warm_response_cache", ignore_result=True)
+def warm_response_cache() -> Dict[str, Any]:
+    """Replay the prompt corpus into the shared response cache"""
+    from app.services.cache_warmer import warm_response_cache as warm
+
+    return _run_async(warm())
@@ -0,0 +1,11 @@
+"""
+Celery worker entry point
+
+    celery -A app.worker worker --loglevel=info
+    celery -A app.worker beat --loglevel=info   # scheduled cache warming (CACHE_WARM_ENABLED)
+"""
+
+from app.core import celery_app as celery_core
+
+celery_core.init_celery()
+app = celery_core.celery_app
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the backend
+
+Starts the stub providers and `main:app` as subprocesses, drives the API
+at a fixed request rate with bounded concurrency, and writes latency
+percentiles, throughput and server memory to a JSON file. Run from the
+backend directory:
+
+    python -m benchmarks.load_test --rps 50 --duration 30 --output results.json
+    python -m benchmarks.load_test --scenarios chat --baseline results.json
+
+Latency is measured from each request's scheduled send time, so time spent
+waiting for a concurrency slot counts (no coordinated omission); service
+time is measured from the actual send. Provider rate limits are disabled
+so the numbers reflect the backend itself; pass
+--app-env OPENAI_RATE_LIMIT_RPM=500 to include them.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from benchmarks.stub_providers import add_config_arguments, config_from_args, config_to_argv
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("chat", "chat_stream", "analyze", "conversation")
+DOMAINS = ("aws", "finance", "projects", "university", "general")
+TOPICS = ("s3 bucket policies", "lambda cold starts", "budget planning", "exam prep", "project milestones")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process in MiB (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+@contextmanager
+def background_process(argv: List[str], env: Dict[str, str]):
+    process = subprocess.Popen(argv, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited during startup:\n{process.stderr.read().decode()}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+class MemorySampler:
+    """Samples a process's RSS in the background"""
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Dict[str, Optional[float]]:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._sample()
+        if not self.samples:
+            return {"rss_start_mb": None, "rss_peak_mb": None, "rss_end_mb": None}
+        return {
+            "rss_start_mb": round(self.samples[0], 1),
+            "rss_peak_mb": round(max(self.samples), 1),
+            "rss_end_mb": round(self.samples[-1], 1),
+        }
+
+    def _sample(self):
+        rss = read_rss_mb(self.pid)
+        if rss is not None:
+            self.samples.append(rss)
+
+    async def _run(self):
+        while True:
+            self._sample()
+            await asyncio.sleep(self.interval)
+
+class Workload:
+    """Builds requests for each scenario against one running backend"""
+
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.session_ids: List[str] = []
+        self._counter = 0
+
+    def provider(self) -> str:
+        if self.args.provider == "mixed":
+            return self.rng.choice(("openai", "gemini"))
+        return self.args.provider
+
+    def question(self) -> str:
+        # A fraction of requests repeat a small pool of prompts to exercise the response cache
+        if self.rng.random() < self.args.cache_hit_ratio:
+            return f"How do {self.rng.choice(TOPICS)} work? (common question {self.rng.randrange(10)})"
+        self._counter += 1
+        return f"How do {self.rng.choice(TOPICS)} work? (request {self._counter} seed {self.args.seed})"
+
+    def chat_body(self) -> Dict[str, Any]:
+        return {
+            "messages": [{"role": "user", "content": self.question()}],
+            "context": {"domain": self.rng.choice(DOMAINS)},
+            "provider": self.provider(),
+        }
+
+    async def setup(self):
+        """Create the conversations used by the analyze and conversation scenarios"""
+        for _ in range(self.args.sessions):
+            response = await self.client.post(
+                "/api/v1/ai/conversation/start",
+                params={"provider": self.provider()},
+                json={"domain": self.rng.choice(DOMAINS)}
+            )
+            response.raise_for_status()
+            session_id = response.json()["id"]
+            self.session_ids.append(session_id)
+            for i in range(self.args.messages_per_session):
+                role = "user" if i % 2 == 0 else "assistant"
+                await self.client.post(
+                    f"/api/v1/ai/conversation/{session_id}/message",
+                    json={"role": role, "content": f"{self.rng.choice(TOPICS)} message {i}"}
+                )
+
+    async def chat(self) -> Dict[str, Any]:
+        response = await self.client.post("/api/v1/ai/chat", json=self.chat_body())
+        return {"status": response.status_code}
+
+    async def chat_stream(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        first_delta = None
+        async with self.client.stream("POST", "/api/v1/ai/chat/stream", json=self.chat_body()) as response:
+            async for line in response.aiter_lines():
+                if first_delta is None and line == "event: delta":
+                    first_delta = time.perf_counter() - start
+        return {"status": response.status_code, "ttfb": first_delta}
+
+    async def analyze(self) -> Dict[str, Any]:
+        response = await self.client.post("/api/v1/ai/analyze", json={
+            "conversation_id": self.rng.choice(self.session_ids),
+            "analysis_type": self.rng.choice(("topics", "sentiment", "recommendations", "progress")),
+        })
+        return {"status": response.status_code}
+
+    async def conversation(self) -> Dict[str, Any]:
+        session_id = self.rng.choice(self.session_ids)
+        if self.rng.random() < 0.7:
+            response = await self.client.post(
+                f"/api/v1/ai/conversation/{session_id}/message",
+                json={"role": "user", "content": self.question()}
+            )
+        else:
+            response = await self.client.get(f"/api/v1/ai/conversation/{session_id}/history")
+        return {"status": response.status_code}
+
+async def run_scenario(
+    name: str,
+    call: Callable[[], Awaitable[Dict[str, Any]]],
+    rps: float,
+    duration: float,
+    concurrency: int
+) -> Dict[str, Any]:
+    """Open-loop load: one request every 1/rps seconds, at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    service_times: List[float] = []
+    ttfbs: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors: Dict[str, int] = {}
+
+    async def one(scheduled: float):
+        async with semaphore:
+            sent = time.perf_counter()
+            try:
+                result = await call()
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                return
+            done = time.perf_counter()
+        status = str(result["status"])
+        statuses[status] = statuses.get(status, 0) + 1
+        if result["status"] < 400:
+            latencies.append(done - scheduled)
+            service_times.append(done - sent)
+            if result.get("ttfb") is not None:
+                ttfbs.append(result["ttfb"])
+
+    total = max(1, int(rps * duration))
+    tasks = []
+    start = time.perf_counter()
+    for i in range(total):
+        scheduled = start + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    succeeded = len(latencies)
+    result = {
+        "requests": total,
+        "succeeded": succeeded,
+        "failed": total - succeeded,
+        "status_counts": statuses,
+        "client_errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "target_rps": rps,
+        "throughput_rps": round(succeeded / elapsed, 2),
+        "latency_ms": summarize(latencies),
+        "service_time_ms": summarize(service_times),
+    }
+    if ttfbs:
+        result["time_to_first_delta_ms"] = summarize(ttfbs)
+    print(f"{name}: {succeeded}/{total} ok, {result['throughput_rps']} req/s, "
+          f"p50 {result['latency_ms']['p50']} ms, p99 {result['latency_ms']['p99']} ms", file=sys.stderr)
+    return result
+
+def summarize(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "mean": None, "max": None}
+    values = np.array(samples) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50": round(float(p50), 2),
+        "p95": round(float(p95), 2),
+        "p99": round(float(p99), 2),
+        "mean": round(float(values.mean()), 2),
+        "max": round(float(values.max()), 2),
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], max_regression: float) -> List[str]:
+    """Scenario p95/p99 latency and throughput changes beyond the allowed regression"""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        for metric in ("p95", "p99"):
+            old, new = before["latency_ms"][metric], result["latency_ms"][metric]
+            if old and new and new > old * (1 + max_regression):
+                regressions.append(f"{name} {metric} latency {old} -> {new} ms")
+        old, new = before["throughput_rps"], result["throughput_rps"]
+        if old and new < old * (1 - max_regression):
+            regressions.append(f"{name} throughput {old} -> {new} req/s")
+    return regressions
+
+def parse_env(pairs: List[str]) -> Dict[str, str]:
+    env = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        env[key] = value
+    return env
+
+async def drive(args: argparse.Namespace, base_url: str, server_pid: int) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        workload = Workload(client, args)
+        if {"analyze", "conversation"} & set(args.scenarios):
+            await workload.setup()
+
+        sampler = MemorySampler(server_pid)
+        sampler.start()
+        scenarios = {}
+        for name in args.scenarios:
+            scenarios[name] = await run_scenario(name, getattr(workload, name), args.rps, args.duration, args.concurrency)
+        memory = await sampler.stop()
+
+        metrics_response = await client.get("/metrics")
+    return {
+        "scenarios": scenarios,
+        "memory": memory,
+        "server_metrics_bytes": len(metrics_response.content),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--rps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--provider", choices=["openai", "gemini", "mixed"], default="mixed")
+    parser.add_argument("--cache-hit-ratio", type=float, default=0.0)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--messages-per-session", type=int, default=50)
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--app-env", nargs="*", default=[], metavar="KEY=VALUE", help="extra backend settings")
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.1, help="allowed fractional regression vs baseline")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    stub_config = config_from_args(args)
+    stub_port, app_port = free_port(), free_port()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "OPENAI_API_KEY": "stub",
+            "GEMINI_API_KEY": "stub",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{stub_port}/v1",
+            "GEMINI_BASE_URL": f"http://127.0.0.1:{stub_port}/v1beta",
+            "DATABASE_URL": args.database_url or f"sqlite:///{tmp}/bench.db",
+            "OPENAI_RATE_LIMIT_RPM": "0",
+            "GEMINI_RATE_LIMIT_RPM": "0",
+            **parse_env(args.app_env),
+        }
+        stub_argv = [sys.executable, "-m", "benchmarks.stub_providers", "--port", str(stub_port)] + config_to_argv(stub_config)
+        app_argv = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(app_port), "--log-level", "warning"]
+
+        with background_process(stub_argv, env) as stub, background_process(app_argv, env) as server:
+            wait_ready(f"http://127.0.0.1:{stub_port}/health", stub)
+            wait_ready(f"http://127.0.0.1:{app_port}/health", server)
+            run = asyncio.run(drive(args, f"http://127.0.0.1:{app_port}", server.pid))
+            stub_stats = httpx.get(f"http://127.0.0.1:{stub_port}/stats").json()
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "rps": args.rps,
+            "duration_s": args.duration,
+            "concurrency": args.concurrency,
+            "provider": args.provider,
+            "cache_hit_ratio": args.cache_hit_ratio,
+            "app_env": parse_env(args.app_env),
+        },
+        "stub": stub_stats,
+        **run,
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), results, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
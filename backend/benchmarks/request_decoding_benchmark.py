@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+/chat request decoding benchmark
+
+Times the per-request work that scales with history length, for the
+previous implementation (stdlib JSON parse, json.dumps cache key,
+model_dump analysis job) and the current one, at several history
+lengths. The "decode" entry also times validating the raw body with
+AIRequest.model_validate_json and a cached TypeAdapter, against the
+orjson parse plus model_validate that ORJSONRoute does. Run from the
+backend directory:
+
+    python -m benchmarks.request_decoding_benchmark --lengths 10 50 200 1000
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import time
+from typing import Callable, Dict, List
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.models.ai_models import AIProvider, AIRequest, AIResponse
+from app.services.response_cache import CACHE_KEY_PREFIX, generate_cache_key, normalize_request
+from app.tasks import build_analysis_job
+
+REQUEST_ADAPTER = TypeAdapter(AIRequest)
+
+WORDS = "aws lambda s3 bucket policy iam role exam study plan week deploy function ✓ café".split()
+
+def make_body(rng: random.Random, length: int) -> bytes:
+    messages = []
+    for index in range(length):
+        role = "user" if index % 2 == 0 else "assistant"
+        words = rng.randint(8, 30) if role == "user" else rng.randint(40, 120)
+        messages.append({"role": role, "content": " ".join(rng.choices(WORDS, k=words))})
+    return json.dumps({
+        "messages": messages,
+        "context": {"domain": "aws"},
+        "provider": "openai",
+        "conversation_id": "bench",
+    }).encode()
+
+def legacy_cache_key(request: AIRequest, model: str) -> str:
+    payload = json.dumps(
+        normalize_request(request, model),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False
+    )
+    return f"{CACHE_KEY_PREFIX}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+def legacy_analysis_messages(request: AIRequest) -> List[dict]:
+    return [msg.model_dump(mode="json") for msg in request.messages]
+
+def time_us(fn: Callable[[], object], repeat: int) -> float:
+    """Best-of-five mean, in microseconds"""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1e6
+
+def run_length(rng: random.Random, length: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    body = make_body(rng, length)
+    request = AIRequest.model_validate(json.loads(body))
+    response = AIResponse(content="ok", model="gpt-4o-mini", provider=AIProvider.OPENAI)
+    model = "gpt-4o-mini"
+    assert legacy_cache_key(request, model) == generate_cache_key(request, model), "cache keys changed"
+
+    stages = {
+        "parse": (lambda: json.loads(body), lambda: orjson.loads(body)),
+        "validate": (lambda: AIRequest.model_validate(json.loads(body)), lambda: AIRequest.model_validate(orjson.loads(body))),
+        "cache_key": (lambda: legacy_cache_key(request, model), lambda: generate_cache_key(request, model)),
+        "analysis_job": (lambda: legacy_analysis_messages(request), lambda: build_analysis_job(request, response)),
+    }
+    results = {}
+    for name, (legacy, current) in stages.items():
+        results[name] = {"legacy_us": round(time_us(legacy, repeat), 1), "current_us": round(time_us(current, repeat), 1)}
+    # "validate" includes its parse, so the total counts the parse once
+    legacy_total = sum(stage["legacy_us"] for name, stage in results.items() if name != "parse")
+    current_total = sum(stage["current_us"] for name, stage in results.items() if name != "parse")
+    results["total"] = {
+        "legacy_us": round(legacy_total, 1),
+        "current_us": round(current_total, 1),
+        "speedup": round(legacy_total / current_total, 2),
+    }
+    results["decode"] = {
+        "orjson_model_validate_us": results["validate"]["current_us"],
+        "model_validate_json_us": round(time_us(lambda: AIRequest.model_validate_json(body), repeat), 1),
+        "type_adapter_validate_json_us": round(time_us(lambda: REQUEST_ADAPTER.validate_json(body), repeat), 1),
+    }
+    results["body_kib"] = round(len(body) / 1024, 1)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(json.dumps(
+        {str(length): run_length(rng, length, max(1, args.repeat * 200 // max(length, 200))) for length in args.lengths},
+        indent=2
+    ))
+
+if __name__ == "__main__":
+    main()
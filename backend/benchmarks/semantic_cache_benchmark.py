@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Semantic cache lookup benchmark
+
+Fills one domain index with N entries and measures embed + search latency.
+Run from the backend directory:
+
+    python -m benchmarks.semantic_cache_benchmark --entries 100000
+"""
+
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from app.models.ai_models import AIMessage, AIProvider, AIRequest, AIResponse, ConversationContext
+from app.services.semantic_cache import SemanticCache
+
+AWS_TERMS = [
+    "s3", "ec2", "lambda", "dynamodb", "iam", "vpc", "cloudfront", "sqs", "sns", "kinesis",
+    "rds", "aurora", "ecs", "eks", "fargate", "cloudwatch", "cloudformation", "route53",
+    "elasticache", "step", "functions", "api", "gateway", "cognito", "kms", "bucket", "policy",
+]
+PHRASES = [
+    "what is {a} and how does it work with {b}",
+    "explain {a} vs {b} for the developer exam",
+    "how do i configure {a} to talk to {b}",
+    "best practices for {a} when using {b}",
+]
+
+def make_question(rng: random.Random) -> str:
+    a, b = rng.sample(AWS_TERMS, 2)
+    return rng.choice(PHRASES).format(a=a, b=b) + f" case {rng.randrange(10 ** 6)}"
+
+def make_request(question: str) -> AIRequest:
+    return AIRequest(
+        messages=[AIMessage(role="user", content=question)],
+        context=ConversationContext(domain="aws"),
+        provider=AIProvider.OPENAI
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cache = SemanticCache(capacity=args.entries, dim=args.dim)
+    response = AIResponse(content="cached answer", model="gpt-4o-mini", provider=AIProvider.OPENAI)
+
+    start = time.perf_counter()
+    for _ in range(args.entries):
+        cache.add(make_request(make_question(rng)), "gpt-4o-mini", response)
+    fill_seconds = time.perf_counter() - start
+
+    requests = [make_request(make_question(rng)) for _ in range(args.queries)]
+    embed_ms, lookup_ms = [], []
+    for request in requests:
+        t0 = time.perf_counter()
+        cache.embedder.embed(request.messages[-1].content)
+        t1 = time.perf_counter()
+        cache.lookup(request, "gpt-4o-mini")
+        t2 = time.perf_counter()
+        embed_ms.append((t1 - t0) * 1000)
+        lookup_ms.append((t2 - t1) * 1000)
+
+    index = cache.indexes["aws"]
+    results = {
+        "entries": index.size,
+        "dim": args.dim,
+        "matrix_mb": round(index.vectors.nbytes / 2 ** 20, 1),
+        "fill_seconds": round(fill_seconds, 2),
+        "embed_ms": {p: round(float(np.percentile(embed_ms, q)), 3) for p, q in (("p50", 50), ("p99", 99))},
+        "lookup_ms": {p: round(float(np.percentile(lookup_ms, q)), 3) for p, q in (("p50", 50), ("p95", 95), ("p99", 99))},
+        "stats": cache.get_stats(),
+    }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
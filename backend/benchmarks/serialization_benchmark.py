@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Response serialization microbenchmark
+
+Compares the cache encoding (encode_response/decode_response, at the
+configured compression threshold and forced raw/zlib) with the previous
+pydantic-v1 JSON path, and the default JSON response renderer
+with ORJSONResponse, across content sizes. Reports microseconds per
+operation and per KB of content, plus encoded size. Run from the backend
+directory:
+
+    python -m benchmarks.serialization_benchmark --sizes-kb 1 4 16 64
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import warnings
+from typing import Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.models.ai_models import AIProvider, AIResponse
+from app.services.response_cache import decode_response, encode_response
+
+WORDS = (
+    "configure the bucket policy so that lambda functions can read objects while "
+    "keeping public access blocked and logging enabled for every request"
+).split()
+
+def make_response(size_kb: float, rng: random.Random) -> AIResponse:
+    target = int(size_kb * 1024)
+    words = []
+    length = 0
+    while length < target:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return AIResponse(
+        content=" ".join(words)[:target],
+        model="gpt-4o-mini",
+        provider=AIProvider.OPENAI,
+        usage={"prompt_tokens": 120, "completion_tokens": target // 4, "total_tokens": 120 + target // 4},
+        request_id="3f2b8c9e-8d4f-4c1e-9a55-0c6f1f7d2e11"
+    )
+
+def time_per_op(func: Callable[[], object], min_seconds: float) -> float:
+    """Mean seconds per call over at least `min_seconds`"""
+    func()
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for _ in range(10):
+            func()
+        calls += 10
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+def bench_size(size_kb: float, min_seconds: float, rng: random.Random) -> Dict[str, object]:
+    response = make_response(size_kb, rng)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        legacy = response.json()
+        cases = {
+            "legacy_encode": lambda: response.json(),
+            "legacy_decode": lambda: AIResponse.parse_raw(legacy),
+        }
+        encoded = encode_response(response)
+        raw = encode_response(response, compress_min_bytes=sys.maxsize)
+        compressed = encode_response(response, compress_min_bytes=0)
+        cases.update({
+            "cache_encode": lambda: encode_response(response),
+            "cache_decode": lambda: decode_response(encoded),
+            "cache_encode_raw": lambda: encode_response(response, compress_min_bytes=sys.maxsize),
+            "cache_decode_raw": lambda: decode_response(raw),
+            "cache_encode_zlib": lambda: encode_response(response, compress_min_bytes=0),
+            "cache_decode_zlib": lambda: decode_response(compressed),
+            "render_json_response": lambda: JSONResponse(jsonable_encoder(response)),
+            "render_orjson_response": lambda: ORJSONResponse(response.model_dump()),
+        })
+        timings = {name: time_per_op(func, min_seconds) for name, func in cases.items()}
+
+    return {
+        "content_kb": size_kb,
+        "bytes": {"legacy_json": len(legacy), "cache_raw": len(raw), "cache_zlib": len(compressed)},
+        "us_per_op": {name: round(seconds * 1e6, 2) for name, seconds in timings.items()},
+        "us_per_kb": {name: round(seconds * 1e6 / size_kb, 3) for name, seconds in timings.items()},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes-kb", type=float, nargs="+", default=[1, 4, 16, 64, 256])
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="minimum timing window per case")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = {
+        "python": sys.version.split()[0],
+        "results": [bench_size(size_kb, args.min_seconds, rng) for size_kb in args.sizes_kb],
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+In-process conversation history memory benchmark
+
+Holds N sessions x M messages as ConversationSession models (List[AIMessage])
+and as compact histories, hot and compressed, and reports traced memory,
+build time and the cost of building the latest history page. Run from the
+backend directory:
+
+    python -m benchmarks.session_memory_benchmark --sessions 10000 --messages 200
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app.models.ai_models import AIMessage, AIProvider, ConversationContext, ConversationSession
+from app.services import session_memory
+from app.services.session_memory import CompactHistory, SessionMemory
+
+WORDS = (
+    "aws lambda s3 bucket policy iam role vpc subnet cloudformation stack exam practice "
+    "question answer the a to of and for with your you can use how what when why which "
+    "should configure deploy function event trigger storage class lifecycle rule budget "
+    "plan week study review module cost security group instance region availability zone"
+).split()
+
+def make_rows(rng: random.Random, count: int, start: datetime, first_id: int):
+    rows = []
+    for index in range(count):
+        role = "user" if index % 2 == 0 else "assistant"
+        length = rng.randint(8, 30) if role == "user" else rng.randint(40, 120)
+        content = " ".join(rng.choices(WORDS, k=length))
+        rows.append((first_id + index, role, content, start + timedelta(seconds=30 * index)))
+    return rows
+
+def measure(build):
+    """Traced bytes retained by what `build` returns, and how long it took"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, retained, elapsed
+
+def page_latency_us(histories, limit: int, samples: int, rng: random.Random) -> float:
+    keys = rng.sample(list(histories), min(samples, len(histories)))
+    start = time.perf_counter()
+    for key in keys:
+        histories[key].page(limit)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--page", type=int, default=50, help="history page size for the latency measurement")
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = datetime(2024, 1, 1)
+    corpus = [
+        make_rows(rng, args.messages, start, session * args.messages + 1)
+        for session in range(args.sessions)
+    ]
+    text_bytes = sum(len(content.encode("utf-8")) for rows in corpus for _, _, content, _ in rows)
+    context = ConversationContext(domain="aws")
+
+    def build_models():
+        return {
+            f"s{index}": ConversationSession(
+                id=f"s{index}",
+                context=context,
+                provider=AIProvider.OPENAI,
+                # Fresh strings, as a database read would produce
+                messages=[AIMessage(role=role, content=content.encode().decode(), timestamp=ts) for _, role, content, ts in rows]
+            )
+            for index, rows in enumerate(corpus)
+        }
+
+    models, models_bytes, models_s = measure(build_models)
+    sample = rng.sample(list(models), min(args.samples, len(models)))
+    page_start = time.perf_counter()
+    for key in sample:
+        models[key].messages[-args.page:]
+    models_page_us = (time.perf_counter() - page_start) / len(sample) * 1e6
+    del models
+
+    def build_compact():
+        memory = SessionMemory(
+            max_sessions=args.sessions,
+            max_bytes=1 << 62,
+            cold_after=float("inf"),
+            max_messages=args.messages
+        )
+        for index, rows in enumerate(corpus):
+            memory.put(f"s{index}", CompactHistory(rows))
+        return memory
+
+    memory, compact_bytes, compact_s = measure(build_compact)
+    histories = memory._hot
+    compact_page_us = page_latency_us(histories, args.page, args.samples, rng)
+
+    del memory, histories
+
+    def build_cold():
+        memory = build_compact()
+        for history in memory._hot.values():
+            history.freeze()
+        return memory
+
+    memory, cold_bytes, cold_s = measure(build_cold)
+    histories = memory._hot
+    keys = rng.sample(list(histories), min(args.samples, len(histories)))
+    cold_page_s = 0.0
+    for key in keys:
+        history = histories[key]
+        thaw_start = time.perf_counter()
+        history.page(args.page)
+        cold_page_s += time.perf_counter() - thaw_start
+        history.freeze()
+    cold_page_us = cold_page_s / len(keys) * 1e6
+
+    messages = args.sessions * args.messages
+    mib = 1024 * 1024
+    print(json.dumps({
+        "sessions": args.sessions,
+        "messages_per_session": args.messages,
+        "codec": "zstd" if session_memory.zstandard is not None else "zlib",
+        "text_mib": round(text_bytes / mib, 1),
+        "models": {
+            "mib": round(models_bytes / mib, 1),
+            "bytes_per_message": round(models_bytes / messages, 1),
+            "build_s": round(models_s, 2),
+            "page_us": round(models_page_us, 1),
+        },
+        "compact": {
+            "mib": round(compact_bytes / mib, 1),
+            "bytes_per_message": round(compact_bytes / messages, 1),
+            "build_s": round(compact_s, 2),
+            "page_us": round(compact_page_us, 1),
+        },
+        "compact_cold": {
+            "mib": round(cold_bytes / mib, 1),
+            "bytes_per_message": round(cold_bytes / messages, 1),
+            "build_s": round(cold_s, 2),
+            "thaw_page_us": round(cold_page_us, 1),
+        },
+        "reduction": {
+            "compact": round(models_bytes / compact_bytes, 1),
+            "compact_cold": round(models_bytes / cold_bytes, 1),
+        },
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
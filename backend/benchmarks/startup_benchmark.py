@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark with a regression budget
+
+Measures, over several fresh processes, the time to `import main` and the
+time from launching uvicorn to the first 200 from /health. Also checks
+that heavy optional modules are not imported eagerly. Exits non-zero when
+a median exceeds its budget. Run from the backend directory:
+
+    python -m benchmarks.startup_benchmark --trials 5 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.load_test import BACKEND_DIR, free_port, git_commit
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_s": elapsed, "loaded": [m for m in {modules!r} if m in sys.modules]}}))
+"""
+
+def measure_import(env: Dict[str, str], modules: List[str]) -> Dict[str, object]:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE.format(modules=modules)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def measure_ready(env: Dict[str, str], timeout: float) -> float:
+    """Seconds from process launch to the first 200 on /health"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - start < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"Server exited during startup:\n{process.stderr.read().decode()}")
+                try:
+                    if client.get(url).status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.01)
+        raise RuntimeError(f"Server not ready after {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "median": round(statistics.median(samples) * 1000, 1),
+        "min": round(min(samples) * 1000, 1),
+        "max": round(max(samples) * 1000, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=2500.0)
+    parser.add_argument("--ready-budget-ms", type=float, default=4000.0)
+    parser.add_argument("--lazy-modules", nargs="*", default=["openai", "numpy", "pandas", "tiktoken"],
+                        help="modules that must not be loaded by `import main`")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{tmp}/startup.db",
+            "LOG_FILE": "",
+        }
+        imports, readies, loaded = [], [], set()
+        for _ in range(args.trials):
+            probe = measure_import(env, args.lazy_modules)
+            imports.append(probe["import_s"])
+            loaded.update(probe["loaded"])
+            readies.append(measure_ready(env, args.timeout))
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": sys.version.split()[0],
+            "trials": args.trials,
+            "prewarm": os.environ.get("PREWARM_PROVIDER_CLIENTS", "false"),
+        },
+        "import_ms": summarize(imports),
+        "ready_ms": summarize(readies),
+        "eagerly_loaded": sorted(loaded),
+        "budget": {"import_ms": args.import_budget_ms, "ready_ms": args.ready_budget_ms},
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    failures = []
+    if results["import_ms"]["median"] > args.import_budget_ms:
+        failures.append(f"import median {results['import_ms']['median']} ms > {args.import_budget_ms} ms")
+    if results["ready_ms"]["median"] > args.ready_budget_ms:
+        failures.append(f"ready median {results['ready_ms']['median']} ms > {args.ready_budget_ms} ms")
+    if loaded:
+        failures.append(f"eagerly imported: {', '.join(sorted(loaded))}")
+    for failure in failures:
+        print(f"BUDGET EXCEEDED: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
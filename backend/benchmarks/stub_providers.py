@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI and Gemini HTTP APIs
+
+Serves just enough of both APIs for the backend's provider clients:
+
+    POST /v1/chat/completions                        (OpenAI, optionally streamed)
+    POST /v1beta/models/{model}:generateContent      (Gemini)
+    POST /v1beta/models/{model}:streamGenerateContent?alt=sse
+
+Latency, streaming rate and error rates are configurable so load tests can
+model slow or flaky providers without paying for real calls. Point the
+backend at it with OPENAI_BASE_URL=http://127.0.0.1:9100/v1 and
+GEMINI_BASE_URL=http://127.0.0.1:9100/v1beta. Run from the backend directory:
+
+    python -m benchmarks.stub_providers --port 9100 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Dict, List
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+WORDS = (
+    "cloud storage bucket policy lambda function queue stream budget savings "
+    "project milestone course exam study plan review practice deploy monitor"
+).split()
+
+@dataclass
+class StubConfig:
+    """Behaviour of the stub providers"""
+    latency_ms: float = 200.0  # median time to first byte
+    latency_distribution: str = "lognormal"  # fixed, uniform or lognormal
+    latency_jitter: float = 0.5  # uniform: +/- fraction of the median; lognormal: sigma
+    response_tokens: int = 60
+    stream_tokens_per_second: float = 100.0  # 0 = send all chunks at once
+    error_rate: float = 0.0  # fraction of calls answered with a 500
+    rate_limit_rate: float = 0.0  # fraction of calls answered with a 429
+    stream_usage: bool = True  # honour OpenAI's stream_options.include_usage, like the real API
+    seed: int = 0
+
+class StubProviders:
+    """Request handlers sharing one config, RNG and call counters"""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.rng = random.Random(config.seed or None)
+        self.stats = {"calls": 0, "streams": 0, "errors": 0, "rate_limited": 0}
+
+    def sample_latency(self) -> float:
+        """Time to first byte in seconds"""
+        median = self.config.latency_ms / 1000
+        jitter = self.config.latency_jitter
+        distribution = self.config.latency_distribution
+        if distribution == "fixed" or median <= 0:
+            return max(0.0, median)
+        if distribution == "uniform":
+            return max(0.0, self.rng.uniform(median * (1 - jitter), median * (1 + jitter)))
+        if distribution == "lognormal":
+            return self.rng.lognormvariate(math.log(median), jitter)
+        raise ValueError(f"Unknown latency distribution: {distribution}")
+
+    def sample_failure(self):
+        """An (status, body) pair to fail with, or None"""
+        roll = self.rng.random()
+        if roll < self.config.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return 429, "Rate limit reached (stub)"
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self.stats["errors"] += 1
+            return 500, "Internal error (stub)"
+        return None
+
+    def make_tokens(self) -> List[str]:
+        return [self.rng.choice(WORDS) + " " for _ in range(self.config.response_tokens)]
+
+    async def paced(self, tokens: List[str]) -> AsyncIterator[str]:
+        """Yield tokens at the configured streaming rate"""
+        rate = self.config.stream_tokens_per_second
+        start = time.monotonic()
+        for i, token in enumerate(tokens):
+            if rate > 0:
+                delay = start + i / rate - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield token
+
+    @staticmethod
+    def usage(prompt: str, completion_tokens: int) -> Dict[str, int]:
+        prompt_tokens = max(1, len(prompt) // 4)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    async def openai_chat(self, request: Request):
+        body = await request.json()
+        self.stats["calls"] += 1
+        await asyncio.sleep(self.sample_latency())
+
+        failure = self.sample_failure()
+        if failure:
+            status, message = failure
+            return JSONResponse(
+                {"error": {"message": message, "type": "stub_error", "code": status}},
+                status_code=status,
+                headers={"retry-after": "1"} if status == 429 else None
+            )
+
+        model = body.get("model", "gpt-4o-mini")
+        prompt = "".join(str(msg.get("content", "")) for msg in body.get("messages", []))
+        tokens = self.make_tokens()
+        usage = self.usage(prompt, len(tokens))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+        self.stats["streams"] += 1
+        include_usage = self.config.stream_usage and (body.get("stream_options") or {}).get("include_usage")
+
+        def chunk(delta: dict, finish_reason=None, chunk_usage=None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+            }
+            if chunk_usage:
+                payload["usage"] = chunk_usage
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            async for token in self.paced(tokens):
+                yield chunk({"content": token})
+            yield chunk({}, finish_reason="stop")
+            if include_usage:
+                yield chunk(None, chunk_usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def gemini_generate(self, request: Request):
+        model, _, method = request.path_params["target"].partition(":")
+        if method not in ("generateContent", "streamGenerateContent"):
+            return JSONResponse({"error": {"code": 404, "message": f"Unknown method {method}"}}, status_code=404)
+
+        body = await request.json()
+        self.stats["calls"] += 1
+        await asyncio.sleep(self.sample_latency())
+
+        failure = self.sample_failure()
+        if failure:
+            status, message = failure
+            return JSONResponse({"error": {"code": status, "message": message}}, status_code=status)
+
+        prompt = "".join(
+            part.get("text", "")
+            for content in [body.get("systemInstruction", {}), *body.get("contents", [])]
+            for part in content.get("parts", [])
+        )
+        tokens = self.make_tokens()
+        usage = self.usage(prompt, len(tokens))
+        usage_metadata = {
+            "promptTokenCount": usage["prompt_tokens"],
+            "candidatesTokenCount": usage["completion_tokens"],
+            "totalTokenCount": usage["total_tokens"],
+        }
+
+        def payload(text: str, final: bool) -> dict:
+            candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+            if final:
+                candidate["finishReason"] = "STOP"
+            result = {"candidates": [candidate], "modelVersion": model}
+            if final:
+                result["usageMetadata"] = usage_metadata
+            return result
+
+        if method == "generateContent":
+            return JSONResponse(payload("".join(tokens), final=True))
+
+        self.stats["streams"] += 1
+
+        async def events():
+            count = 0
+            async for token in self.paced(tokens):
+                count += 1
+                yield f"data: {json.dumps(payload(token, final=count == len(tokens)))}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def get_stats(self, request: Request):
+        return JSONResponse({**self.stats, "config": asdict(self.config)})
+
+def create_app(config: StubConfig) -> Starlette:
+    providers = StubProviders(config)
+    return Starlette(routes=[
+        Route("/v1/chat/completions", providers.openai_chat, methods=["POST"]),
+        Route("/v1beta/models/{target:path}", providers.gemini_generate, methods=["POST"]),
+        Route("/stats", providers.get_stats, methods=["GET"]),
+        Route("/health", lambda request: JSONResponse({"status": "ok"}), methods=["GET"]),
+    ])
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """Stub behaviour flags, shared with the load test runner"""
+    defaults = StubConfig()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--latency-distribution", choices=["fixed", "uniform", "lognormal"], default=defaults.latency_distribution)
+    parser.add_argument("--latency-jitter", type=float, default=defaults.latency_jitter)
+    parser.add_argument("--response-tokens", type=int, default=defaults.response_tokens)
+    parser.add_argument("--stream-tokens-per-second", type=float, default=defaults.stream_tokens_per_second)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate)
+    parser.add_argument("--stream-usage", type=lambda value: value.lower() in ("1", "true", "yes"), default=defaults.stream_usage)
+    parser.add_argument("--seed", type=int, default=7)
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        latency_ms=args.latency_ms,
+        latency_distribution=args.latency_distribution,
+        latency_jitter=args.latency_jitter,
+        response_tokens=args.response_tokens,
+        stream_tokens_per_second=args.stream_tokens_per_second,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        stream_usage=args.stream_usage,
+        seed=args.seed,
+    )
+
+def config_to_argv(config: StubConfig) -> List[str]:
+    """Command-line flags reproducing a config"""
+    argv = []
+    for name, value in asdict(config).items():
+        argv += ["--" + name.replace("_", "-"), str(value)]
+    return argv
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
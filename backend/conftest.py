@@ -0,0 +1,11 @@
+"""
+Test environment: settings come from the environment at import time, so
+point them at throwaway local resources before the app is imported.
+"""
+
+import os
+
+os.environ.setdefault("LOG_FILE", "")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")
+os.environ.setdefault("REDIS_RECONNECT_INTERVAL", "0")
@@ -1,17 +1,28 @@
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
-import uvicorn
 from typing import List, Optional
 import os
+from datetime import datetime
 from dotenv import load_dotenv
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import init_db, close_db
 from app.api.v1.api import api_router
-from app.core.cache import init_redis
+from app.core.cache import close_redis, init_redis
 from app.core.celery_app import init_celery
+from app.core.health import health_checker
+from app.core.http_client import init_http_clients, close_http_clients
+from app.core.logging import RequestIdMiddleware
+from app.core.metrics import (
+    CONTENT_TYPE, MetricsMiddleware, init_default_executor, loop_monitor, preallocate_providers,
+    preallocate_routes, registry, shutdown_default_executor
+)
+from app.models.ai_models import AIProvider
+from app.services.ai_service import ai_service, DEFAULT_MODELS
+from app.services.context_manager import load_tokenizers
 
 # Load environment variables
 load_dotenv()
@@ -24,15 +35,53 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     print("🚀 Starting Solaris AI Backend...")
+    init_default_executor()
     await init_db()
     await init_redis()
+    await init_http_clients()
+    await load_tokenizers(ai_service.context_manager.counter)
+    if settings.PREWARM_PROVIDER_CLIENTS:
+        ai_service.initialize_clients()
+    restore_semantic_cache()
     init_celery()
+    init_metrics(app)
     print("✅ Backend services initialized")
     
     yield
     
     # Shutdown
     print("🔄 Shutting down Solaris AI Backend...")
+    await loop_monitor.stop()
+    await close_http_clients()
+    await close_redis()
+    await close_db()
+    snapshot_semantic_cache()
+    shutdown_default_executor()
+
+def init_metrics(app: FastAPI):
+    """Start runtime monitoring and preallocate route and provider label sets"""
+    preallocate_routes(app)
+    preallocate_providers({provider.value: [model] for provider, model in DEFAULT_MODELS.items()})
+    registry.register_collector(ai_service.collect_metrics)
+    loop_monitor.start()
+
+def restore_semantic_cache():
+    """Restore the semantic cache snapshot if one is configured"""
+    path = settings.SEMANTIC_CACHE_SNAPSHOT_PATH
+    if ai_service.semantic_cache and path and os.path.exists(path):
+        try:
+            ai_service.semantic_cache.restore(path)
+        except Exception as e:
+            print(f"⚠️ Semantic cache restore failed: {str(e)}")
+
+def snapshot_semantic_cache():
+    """Persist the semantic cache if a snapshot path is configured"""
+    path = settings.SEMANTIC_CACHE_SNAPSHOT_PATH
+    if ai_service.semantic_cache and path:
+        try:
+            ai_service.semantic_cache.snapshot(path)
+        except Exception as e:
+            print(f"⚠️ Semantic cache snapshot failed: {str(e)}")
 
 # Create FastAPI app
 app = FastAPI(
@@ -41,6 +90,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -53,6 +103,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and status metrics
+app.add_middleware(MetricsMiddleware)
+
+# Request ID correlation for logs (outermost, so every log line in the request is tagged)
+app.add_middleware(RequestIdMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
@@ -66,20 +122,38 @@ async def root():
         "docs": "/docs"
     }
 
+async def readiness_report() -> ORJSONResponse:
+    providers = {provider.value: ai_service.is_provider_available(provider) for provider in AIProvider}
+    report = await health_checker.readiness(providers)
+    return ORJSONResponse(
+        {**report, "service": "solaris-ai-backend"},
+        status_code=status.HTTP_200_OK if report["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (same report as /health/ready)"""
+    return await readiness_report()
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness: the process is up and serving requests"""
     return {
-        "status": "healthy",
+        "status": "alive",
         "service": "solaris-ai-backend",
-        "timestamp": "2024-01-01T00:00:00Z"
+        "timestamp": datetime.utcnow().isoformat() + "Z"
     }
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: database reachable and at least one configured AI provider's circuit closed"""
+    return await readiness_report()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    from app.core.server import main as run_server
+    run_server()
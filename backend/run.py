@@ -1,25 +1,24 @@
 #!/usr/bin/env python3
 """
 Solaris AI Backend Startup Script
-Run this to start the FastAPI backend server
+
+    python run.py            # production: preloaded workers, one per CPU
+    python run.py --reload   # development: single auto-reloading process
+
+Server tuning (workers, backlog, keep-alive, concurrency limit, graceful
+shutdown timeout) comes from the SERVER_* settings.
 """
 
-import uvicorn
-import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+from app.core.server import main
+
 if __name__ == "__main__":
     print("🚀 Starting Solaris AI Backend...")
     print("📚 API Documentation will be available at: http://localhost:8000/docs")
     print("🔧 Health check: http://localhost:8000/health")
     
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    main()
@@ -0,0 +1,70 @@
+"""
+Fixtures running an AIService against the load-test stub providers.
+
+The stub app is mounted in process on the service's pooled HTTP clients, so
+provider calls go through the real OpenAI SDK and Gemini client without a
+network or API keys.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import ai as ai_endpoints
+from app.core import http_client
+from app.core.circuit_breaker import breakers
+from app.core.config import settings
+from app.services.ai_service import AIService
+from benchmarks.stub_providers import StubConfig, create_app
+
+@dataclass
+class StubBackend:
+    service: AIService
+    config: StubConfig
+    requests: List[httpx.Request] = field(default_factory=list)
+
+    def bodies(self, path: str) -> List[Dict[str, Any]]:
+        """JSON bodies of the provider requests whose path contains `path`"""
+        return [json.loads(request.content) for request in self.requests if path in request.url.path]
+
+@pytest.fixture
+def stub_config() -> StubConfig:
+    return StubConfig(latency_ms=0, latency_distribution="fixed", response_tokens=5, stream_tokens_per_second=0, seed=1)
+
+@pytest.fixture
+def stub_backend(monkeypatch, stub_config) -> StubBackend:
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "stub-key")
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "stub-key")
+    monkeypatch.setattr(settings, "OPENAI_BASE_URL", "http://stub/v1")
+    monkeypatch.setattr(settings, "GEMINI_BASE_URL", "http://stub/v1beta")
+    monkeypatch.setattr(settings, "OPENAI_MAX_RETRIES", 0)
+    backend = StubBackend(service=AIService(), config=stub_config)
+
+    async def record(request: httpx.Request):
+        backend.requests.append(request)
+
+    transport = httpx.ASGITransport(app=create_app(stub_config))
+    for provider in ("openai", "gemini"):
+        monkeypatch.setitem(
+            http_client.http_clients,
+            provider,
+            httpx.AsyncClient(transport=transport, event_hooks={"request": [record]})
+        )
+    # Fresh provider circuits; the database keeps its own
+    for provider in ("openai", "gemini"):
+        breakers.pop(provider, None)
+    yield backend
+    for provider in ("openai", "gemini"):
+        breakers.pop(provider, None)
+
+@pytest.fixture
+def api_client(stub_backend, monkeypatch) -> httpx.AsyncClient:
+    """Client for the AI endpoints, served by the stub-backed service; enter it inside the test's event loop"""
+    monkeypatch.setattr(ai_endpoints, "ai_service", stub_backend.service)
+    app = FastAPI()
+    app.include_router(ai_endpoints.router, prefix="/api/v1/ai")
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from app.models.ai_models import AIMessage, AIProvider, AIRequest, ConversationContext
+from app.services import ai_service as ai_service_module
+from app.services.admission import PRIORITY_CLASSES, AdmissionController, AdmissionRejected
+
+HIGH, NORMAL, LOW = PRIORITY_CLASSES["high"], PRIORITY_CLASSES["normal"], PRIORITY_CLASSES["low"]
+
+def make_request(content: str) -> AIRequest:
+    return AIRequest(
+        messages=[AIMessage(role="user", content=content)],
+        context=ConversationContext(domain="general"),
+        provider=AIProvider.OPENAI
+    )
+
+def test_waiters_are_admitted_by_priority_class():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, queue_size=4, queue_timeout=5)
+        order = []
+
+        async def request(name: str, priority: int):
+            async with controller.admit(priority):
+                order.append(name)
+
+        async with controller.admit(NORMAL):
+            tasks = [asyncio.create_task(request(name, priority)) for name, priority in (("low", LOW), ("high", HIGH))]
+            await asyncio.sleep(0)
+            assert controller.queue_depth() == {"high": 1, "normal": 0, "low": 1}
+        await asyncio.gather(*tasks)
+        return order, controller.in_flight
+
+    order, in_flight = asyncio.run(scenario())
+
+    assert order == ["high", "low"]
+    assert in_flight == 0
+
+def test_full_queue_sheds_arrivals_or_evicts_lower_priority_waiters():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, queue_size=1, queue_timeout=5)
+        async with controller.admit(NORMAL):
+            low = asyncio.create_task(controller.admit(LOW).__aenter__())
+            await asyncio.sleep(0)
+            with pytest.raises(AdmissionRejected, match="queue full"):
+                async with controller.admit(LOW):
+                    pass
+            high = asyncio.create_task(controller.admit(HIGH).__aenter__())
+            await asyncio.sleep(0)
+            with pytest.raises(AdmissionRejected, match="evicted"):
+                await low
+            high.cancel()
+        return controller.stats
+
+    stats = asyncio.run(scenario())
+
+    assert stats["shed_queue_full"] == 1
+    assert stats["evicted"] == 1
+
+def test_requests_that_cannot_start_before_their_deadline_are_shed_at_once():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, queue_size=4, queue_timeout=5)
+        async with controller.admit(NORMAL):
+            started = asyncio.get_running_loop().time()
+            # The estimated wait is one service time (1s at first)
+            with pytest.raises(AdmissionRejected, match="deadline unreachable") as rejected:
+                async with controller.admit(NORMAL, timeout=0.1):
+                    pass
+            return asyncio.get_running_loop().time() - started, rejected.value.retry_after
+
+    elapsed, retry_after = asyncio.run(scenario())
+
+    assert elapsed < 0.05
+    assert retry_after >= 1
+
+def test_cached_answers_do_not_take_a_processing_slot(stub_backend, monkeypatch):
+    controller = AdmissionController(max_concurrent=1, queue_size=4, queue_timeout=5)
+    monkeypatch.setattr(ai_service_module, "admission_controller", controller)
+    service = stub_backend.service
+
+    async def scenario():
+        first = await service.process_request(make_request("cached"), NORMAL)
+        async with controller.admit(NORMAL):
+            # The only slot is taken: a hit is still served, a miss is shed
+            again = await service.process_request(make_request("cached"), NORMAL, 0.1)
+            with pytest.raises(AdmissionRejected):
+                await service.process_request(make_request("uncached"), NORMAL, 0.1)
+        return first, again
+
+    first, again = asyncio.run(scenario())
+
+    assert again == first
+    assert len(stub_backend.bodies("/chat/completions")) == 1
+    assert controller.stats["admitted"] == 2
@@ -0,0 +1,89 @@
+import asyncio
+
+from app.core import database
+from app.models.ai_models import AIMessage, AIProvider, ConversationContext
+from app.services.analytics import AnalyticsEngine
+from app.services.conversation_store import conversation_store
+
+def run_with_database(scenario):
+    async def wrapper():
+        await database.init_db()
+        try:
+            return await scenario()
+        finally:
+            await database.close_db()
+
+    return asyncio.run(wrapper())
+
+async def create_conversation(messages, domain: str = "aws", user_id=None):
+    session = await conversation_store.create_session(ConversationContext(domain=domain), AIProvider.OPENAI, user_id)
+    message_count, _ = await conversation_store.append_messages(session.id, messages)
+    return session, message_count
+
+async def analyze(engine: AnalyticsEngine, session, message_count: int, analysis_type: str):
+    aggregates = await engine.refresh({session.id: (session, message_count)})
+    return engine.analyze(aggregates[session.id], analysis_type, [])
+
+def test_sentiment_counts_whole_words_and_stems_in_user_messages_only():
+    async def scenario():
+        engine = AnalyticsEngine()
+        session, message_count = await create_conversation([
+            AIMessage(role="user", content="Failover works on this hardware. Thanks!"),
+            AIMessage(role="assistant", content="Errors are hard; don't get frustrated."),
+            AIMessage(role="user", content="I failed again, it is hard and confusing"),
+        ])
+        return await analyze(engine, session, message_count, "sentiment")
+
+    analysis = run_with_database(scenario)
+
+    # "works", "thanks" / "failed", "hard", "confusing"; not "failover" or "hardware"
+    assert analysis.results["positive_signals"] == 2
+    assert analysis.results["negative_signals"] == 3
+    assert analysis.results["sentiment"] == "neutral"
+
+def test_progress_baselines_match_across_workers_and_evictions():
+    async def scenario():
+        user_id = "progress-user"
+        first, first_count = await create_conversation(
+            [AIMessage(role="user", content="Roadmap for the exam?")] * 4, domain="projects", user_id=user_id
+        )
+        second, second_count = await create_conversation(
+            [AIMessage(role="user", content="Next sprint?")] * 2, domain="projects", user_id=user_id
+        )
+        # Two workers: one has seen both sessions (and evicted the first), the other only the first
+        busy, fresh = AnalyticsEngine(max_sessions=1), AnalyticsEngine(max_sessions=1)
+        await busy.refresh({first.id: (first, first_count)})
+        await busy.refresh({second.id: (second, second_count)})
+        analyses = []
+        for engine in (busy, fresh):
+            aggregates = await engine.refresh({first.id: (first, first_count)})
+            activity = await engine.load_activity(aggregates.values())
+            analyses.append(engine.analyze(aggregates[first.id], "progress", [], activity))
+        return analyses
+
+    busy, fresh = run_with_database(scenario)
+
+    assert busy.results == fresh.results
+    assert busy.results["user"] == {"sessions": 2, "messages": 6}
+    assert busy.results["domain_average_messages"] == 3.0
+    assert busy.results["message_count"] == 4
+
+def test_refresh_reads_only_new_messages():
+    async def scenario():
+        engine = AnalyticsEngine()
+        session, message_count = await create_conversation([AIMessage(role="user", content="lambda and s3")])
+        first = await analyze(engine, session, message_count, "topics")
+        message_count, _ = await conversation_store.append_messages(
+            session.id, [AIMessage(role="assistant", content="Lambda can read from S3 and DynamoDB")]
+        )
+        # Read the new message from the database, after the last id counted
+        conversation_store.memory.discard(session.id)
+        second = await analyze(engine, session, message_count, "topics")
+        return first, second, engine.stats
+
+    first, second, stats = run_with_database(scenario)
+
+    assert first.results["topic_counts"] == {"AWS Services": 2}
+    assert second.results["topic_counts"] == {"AWS Services": 5}
+    assert second.results["message_count"] == 2
+    assert (stats["full_loads"], stats["incremental_loads"]) == (1, 1)
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from app.core import cache
+from app.core.cache import MemoryStore, TTLCache
+from app.core.config import settings
+from app.models.ai_models import AIProvider, AIResponse
+from app.services.response_cache import ResponseCache
+
+@pytest.fixture
+def memory_store(monkeypatch) -> MemoryStore:
+    store = MemoryStore()
+    monkeypatch.setattr(cache, "redis_client", store)
+    return store
+
+class FakeProbe:
+    def __init__(self):
+        self.up = True
+
+    async def ping(self):
+        if not self.up:
+            raise ConnectionError("refused")
+        return True
+
+def test_unreachable_redis_falls_back_to_memory(monkeypatch):
+    monkeypatch.setattr(settings, "REDIS_RECONNECT_INTERVAL", 0)
+
+    async def scenario():
+        await cache.init_redis()
+        try:
+            client = cache.get_redis()
+            await client.set("key", "value")
+            return client, cache.redis_available(), await client.get("key")
+        finally:
+            await cache.close_redis()
+
+    client, available, value = asyncio.run(scenario())
+
+    assert isinstance(client, MemoryStore)
+    assert not available
+    assert value == b"value"
+    assert cache.get_redis() is None
+
+def test_monitor_switches_to_memory_and_back(monkeypatch):
+    redis = object()
+    probe = FakeProbe()
+    monkeypatch.setattr(cache, "_redis", redis)
+    monkeypatch.setattr(cache, "_probe", probe)
+    monkeypatch.setattr(cache, "redis_client", redis)
+
+    async def scenario():
+        monitor = asyncio.create_task(cache._monitor_redis(0.01))
+        try:
+            probe.up = False
+            await asyncio.sleep(0.05)
+            during_outage = cache.get_redis()
+            probe.up = True
+            await asyncio.sleep(0.05)
+            return during_outage, cache.get_redis()
+        finally:
+            monitor.cancel()
+
+    during_outage, recovered = asyncio.run(scenario())
+
+    assert isinstance(during_outage, MemoryStore)
+    assert recovered is redis
+
+def test_memory_store_honours_nx_ttl_and_delete():
+    async def scenario():
+        store = MemoryStore()
+        first = await store.set("lock", "a", nx=True)
+        second = await store.set("lock", "b", nx=True)
+        await store.set("short", 1, px=10)
+        await store.setex("kept", 60, b"bytes")
+        await asyncio.sleep(0.03)
+        values = await store.mget(["lock", "short", "kept", "missing"])
+        deleted = await store.delete("lock", "short", "missing")
+        return first, second, values, deleted, len(store)
+
+    first, second, values, deleted, size = asyncio.run(scenario())
+
+    assert (first, second) == (True, None)
+    assert values == [b"a", None, b"bytes", None]
+    assert deleted == 1
+    assert size == 1
+
+def test_memory_pipeline_runs_queued_commands_on_execute():
+    async def scenario():
+        store = MemoryStore()
+        async with store.pipeline(transaction=False) as pipe:
+            pipe.setex("a", 60, "1").setex("b", 60, "2")
+            assert await store.get("a") is None
+            results = await pipe.execute()
+        return results, await store.mget(["a", "b"])
+
+    assert asyncio.run(scenario()) == ([True, True], [b"1", b"2"])
+
+def test_memory_store_is_bounded():
+    async def scenario():
+        store = MemoryStore(max_entries=2)
+        for key in "abc":
+            await store.set(key, key)
+        return await store.mget(["a", "b", "c"])
+
+    assert asyncio.run(scenario()) == [None, b"b", b"c"]
+
+def test_ttl_cache_evicts_least_recently_used():
+    ttl_cache = TTLCache(max_entries=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert (ttl_cache.get("a"), ttl_cache.get("b"), ttl_cache.get("c")) == (1, None, 3)
+    ttl_cache.set("d", 4, ttl=0)
+    assert ttl_cache.get("d") is None
+
+def test_batch_access_uses_one_round_trip(memory_store, monkeypatch):
+    calls = []
+    mget, pipeline = memory_store.mget, memory_store.pipeline
+    monkeypatch.setattr(memory_store, "mget", lambda keys: calls.append(("mget", list(keys))) or mget(keys))
+    monkeypatch.setattr(memory_store, "pipeline", lambda **kwargs: calls.append(("pipeline",)) or pipeline(**kwargs))
+    responses = {
+        f"key-{index}": AIResponse(content=f"answer {index}", model="gpt-4o-mini", provider=AIProvider.OPENAI)
+        for index in range(3)
+    }
+
+    async def scenario():
+        await ResponseCache().set_many(responses, ttl=60)
+        reader = ResponseCache()
+        reader.local.set("key-0", responses["key-0"])
+        found = await reader.get_many(["key-0", "key-1", "key-2", "missing"])
+        return found, reader.stats
+
+    found, stats = asyncio.run(scenario())
+
+    assert calls == [("pipeline",), ("mget", ["key-1", "key-2", "missing"])]
+    assert {key: response.content for key, response in found.items()} == {
+        key: response.content for key, response in responses.items()
+    }
+    assert stats["local_hits"] == 1 and stats["redis_hits"] == 2
+
+def test_batch_helpers_are_no_ops_before_init(monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", None)
+
+    async def scenario():
+        await cache.set_many({"a": b"1"}, 60)
+        return await cache.get_many(["a", "b"])
+
+    assert asyncio.run(scenario()) == [None, None]
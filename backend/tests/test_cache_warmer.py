@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from app.core import cache
+from app.core.cache import MemoryStore
+from app.core.config import settings
+from app.models.ai_models import AIMessage, AIProvider, AIRequest
+from app.services.cache_warmer import CERTIFICATION_TEMPLATES, CacheWarmer, default_corpus
+
+CORPUS = [
+    {"domain": "aws", "prompt": "Explain VPC peering."},
+    {"domain": "aws", "prompt": "Explain S3 lifecycle rules."},
+    {"domain": "finance", "prompt": "What is an index fund?", "provider": "gemini"},
+]
+
+@pytest.fixture
+def shared_cache(monkeypatch) -> MemoryStore:
+    """In-memory stand-in for Redis, reported as the shared tier"""
+    store = MemoryStore()
+    monkeypatch.setattr(cache, "redis_client", store)
+    monkeypatch.setattr(cache, "redis_available", lambda: True)
+    return store
+
+def provider_calls(stub_backend) -> int:
+    return len(stub_backend.bodies("/chat/completions")) + len(stub_backend.bodies("generateContent"))
+
+def test_default_corpus_covers_every_template_week():
+    corpus = default_corpus()
+
+    assert len(corpus) == sum(len(topics) + 1 for topics in CERTIFICATION_TEMPLATES.values())
+    assert all(entry["domain"] == "aws" for entry in corpus)
+
+def test_requests_are_built_per_provider_with_the_keys_chat_uses(stub_backend):
+    requests = CacheWarmer(stub_backend.service).build_requests(CORPUS)
+
+    assert sorted(request.provider.value for request in requests.values()) == ["gemini", "gemini", "gemini", "openai", "openai"]
+    client_request = AIRequest(
+        messages=[AIMessage(role="user", content="Explain VPC peering.")],
+        context={"domain": "aws"},
+        provider="openai",
+    )
+    _, cache_key = stub_backend.service.prepare_request(client_request)
+    assert cache_key in requests
+
+def test_warming_fills_the_shared_cache_and_reports_coverage(stub_backend, shared_cache):
+    warmer = CacheWarmer(stub_backend.service, concurrency=2, ttl=600, max_attempts=1)
+
+    async def scenario():
+        first = await warmer.run(CORPUS)
+        second = await warmer.run(CORPUS)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first["requests"] == 5 and first["warmed"] == 5
+    assert (first["coverage_before"], first["coverage_after"], first["coverage_gain"]) == (0, 1, 1)
+    assert second["warmed"] == 0 and second["coverage_gain"] == 0
+    assert provider_calls(stub_backend) == 5
+
+def test_warmed_answers_are_served_to_chat(stub_backend, shared_cache):
+    client_request = AIRequest(
+        messages=[AIMessage(role="user", content="Explain S3 lifecycle rules.")],
+        context={"domain": "aws"},
+        provider="openai",
+    )
+
+    async def scenario():
+        await CacheWarmer(stub_backend.service).run(CORPUS[:2])
+        calls = provider_calls(stub_backend)
+        stub_backend.service.response_cache.local.clear()
+        await stub_backend.service.process_request(client_request)
+        return calls
+
+    calls = asyncio.run(scenario())
+
+    assert provider_calls(stub_backend) == calls
+
+def test_dry_run_and_refresh(stub_backend, shared_cache, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_WARM_PROVIDERS", ["openai"])
+    warmer = CacheWarmer(stub_backend.service)
+
+    async def scenario():
+        dry = await warmer.run(CORPUS[:2], dry_run=True)
+        await warmer.run(CORPUS[:2])
+        refreshed = await warmer.run(CORPUS[:2], refresh=True)
+        return dry, refreshed
+
+    dry, refreshed = asyncio.run(scenario())
+
+    assert dry["warmed"] == 0 and dry["coverage_after"] == 0
+    assert refreshed["warmed"] == 2 and refreshed["coverage_before"] == 1
+    assert provider_calls(stub_backend) == 4
+
+def test_rate_limited_prompts_are_counted_as_failed(stub_backend, shared_cache, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_WARM_PROVIDERS", ["openai"])
+    stub_backend.config.rate_limit_rate = 1.0
+
+    report = asyncio.run(CacheWarmer(stub_backend.service, max_attempts=1).run(CORPUS[:2]))
+
+    assert report["rate_limited"] == 2 and report["failed"] == 2
+    assert report["coverage_gain"] == 0
+
+def test_warming_needs_redis(stub_backend, monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", MemoryStore())
+
+    report = asyncio.run(CacheWarmer(stub_backend.service).run(CORPUS))
+
+    assert report["error"] == "Redis unavailable"
+    assert provider_calls(stub_backend) == 0
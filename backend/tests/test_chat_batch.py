@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+from app.models.ai_models import AIMessage, AIProvider, AIRequest, ConversationContext
+
+def make_item(content: str) -> dict:
+    return {
+        "messages": [{"role": "user", "content": content}],
+        "context": {"domain": "general"},
+        "provider": "openai",
+    }
+
+def make_request(content: str) -> AIRequest:
+    return AIRequest(**make_item(content))
+
+def test_batch_fits_each_item_once_and_runs_duplicates_once(stub_backend, monkeypatch):
+    service = stub_backend.service
+    fitted = []
+    fit_request = service.context_manager.fit_request
+
+    def counting_fit(request, *args):
+        fitted.append(request.messages[-1].content)
+        return fit_request(request, *args)
+
+    monkeypatch.setattr(service.context_manager, "fit_request", counting_fit)
+
+    async def scenario():
+        requests = [make_request("a"), make_request("b"), make_request("a")]
+        return [item async for item in service.process_batch(requests, concurrency=2, item_timeout=5)]
+
+    results = asyncio.run(scenario())
+
+    assert sorted(fitted) == ["a", "a", "b"]
+    assert len(stub_backend.bodies("/chat/completions")) == 2
+    assert sorted(index for indexes, _ in results for index in indexes) == [0, 1, 2]
+    by_index = {index: response for indexes, response in results for index in indexes}
+    assert by_index[0] is by_index[2]
+
+def test_batch_endpoint_streams_one_ndjson_line_per_item(api_client):
+    async def scenario():
+        async with api_client as client:
+            response = await client.post(
+                "/api/v1/ai/chat/batch",
+                json={"items": [make_item("x"), make_item("y"), make_item("x")], "concurrency": 2}
+            )
+        return response
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.text.endswith("\n")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    assert all(line["response"]["content"] and line["error"] is None for line in lines)
+
+def test_batch_endpoint_reports_failed_items_with_status_codes(api_client, stub_backend):
+    stub_backend.config.error_rate = 1.0
+
+    async def scenario():
+        async with api_client as client:
+            return await client.post("/api/v1/ai/chat/batch", json={"items": [make_item("x"), make_item("y")]})
+
+    response = asyncio.run(scenario())
+    lines = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda line: line["index"])
+
+    assert response.status_code == 200
+    assert [line["index"] for line in lines] == [0, 1]
+    assert all(line["response"] is None and line["status_code"] == 500 for line in lines)
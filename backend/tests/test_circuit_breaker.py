@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core import circuit_breaker
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, get_breaker
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+def fail(breaker: CircuitBreaker):
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            async with breaker.guard():
+                raise RuntimeError("down")
+
+    asyncio.run(scenario())
+
+def succeed(breaker: CircuitBreaker):
+    async def scenario():
+        async with breaker.guard():
+            pass
+
+    asyncio.run(scenario())
+
+def test_opens_after_consecutive_failures_and_fails_fast(clock):
+    breaker = CircuitBreaker("dependency", failure_threshold=3, reset_timeout=10)
+    fail(breaker)
+    fail(breaker)
+    succeed(breaker)
+    fail(breaker)
+    fail(breaker)
+    assert breaker.state == CLOSED
+
+    fail(breaker)
+    assert breaker.state == OPEN
+
+    clock.now += 4
+    with pytest.raises(CircuitOpenError) as rejected:
+        succeed(breaker)
+    assert rejected.value.retry_after == pytest.approx(6)
+
+def test_half_open_admits_one_probe_that_closes_or_reopens_the_circuit(clock):
+    breaker = CircuitBreaker("dependency", failure_threshold=1, reset_timeout=10)
+    fail(breaker)
+    clock.now += 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now += 10
+    succeed(breaker)
+    assert breaker.state == CLOSED
+    assert breaker.get_stats()["consecutive_failures"] == 0
+
+def test_ignored_errors_do_not_count_and_release_the_probe(clock):
+    breaker = CircuitBreaker("dependency", failure_threshold=1, reset_timeout=10)
+
+    async def scenario():
+        with pytest.raises(KeyError):
+            async with breaker.guard(ignore=(KeyError,)):
+                raise KeyError("ours")
+
+    asyncio.run(scenario())
+    assert breaker.state == CLOSED
+
+    fail(breaker)
+    clock.now += 10
+    asyncio.run(scenario())
+    # The probe slot was given back, so the next call may probe
+    assert breaker.allow_request()
+
+def test_error_rate_covers_the_recent_window(clock):
+    breaker = CircuitBreaker("dependency", failure_threshold=100, error_window=60)
+    for _ in range(3):
+        succeed(breaker)
+    fail(breaker)
+    assert breaker.error_rate() == (4, 0.25)
+
+    clock.now += 61
+    assert breaker.error_rate() == (0, 0.0)
+
+def open_provider_circuit(provider: str = "openai") -> CircuitBreaker:
+    breaker = get_breaker(provider)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    return breaker
+
+CHAT_BODY = {
+    "messages": [{"role": "user", "content": "hello"}],
+    "context": {"domain": "general"},
+    "provider": "openai",
+}
+
+def test_chat_answers_503_with_retry_after_while_the_provider_circuit_is_open(api_client, stub_backend):
+    open_provider_circuit()
+
+    async def scenario():
+        async with api_client as client:
+            return await client.post("/api/v1/ai/chat", json=CHAT_BODY)
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) > 0
+    assert stub_backend.bodies("/chat/completions") == []
+
+def test_stream_reports_an_open_circuit_as_a_503_error_event(api_client, stub_backend):
+    open_provider_circuit()
+
+    async def scenario():
+        async with api_client as client:
+            return await client.post("/api/v1/ai/chat/stream", json=CHAT_BODY)
+
+    response = asyncio.run(scenario())
+    event, data = response.text.strip().split("\n")
+
+    assert event == "event: error"
+    error = json.loads(data.removeprefix("data: "))
+    assert error["status_code"] == 503
+    assert error["retry_after"] > 0
+    assert stub_backend.bodies("/chat/completions") == []
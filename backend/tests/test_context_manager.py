@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+from app.core.config import settings
+from app.models.ai_models import AIMessage, AIRequest
+from app.services.context_manager import (
+    DEFAULT_CONTEXT_LIMIT,
+    TOKENS_PER_MESSAGE,
+    TOKENS_PER_PROMPT,
+    ContextWindowManager,
+    TokenCounter,
+    load_tokenizers,
+)
+
+def make_message(role: str, tokens: int) -> AIMessage:
+    # Without a loaded tokenizer, four characters count as one token
+    return AIMessage(role=role, content="x" * (tokens * 4))
+
+def cost(tokens: int) -> int:
+    return tokens + TOKENS_PER_MESSAGE
+
+def test_budget_leaves_room_for_the_completion(monkeypatch):
+    manager = ContextWindowManager(TokenCounter())
+    monkeypatch.setattr(settings, "CONTEXT_MAX_PROMPT_TOKENS", 0)
+
+    assert manager.get_budget("gpt-4o", 1000) == 127000
+    assert manager.get_budget("unknown-model", None) == DEFAULT_CONTEXT_LIMIT
+
+    monkeypatch.setattr(settings, "CONTEXT_MAX_PROMPT_TOKENS", 8000)
+    assert manager.get_budget("gpt-4o", 1000) == 8000
+
+def test_fit_keeps_system_messages_and_the_most_recent_turns():
+    manager = ContextWindowManager(TokenCounter())
+    messages = [make_message("system", 10)] + [make_message("user" if i % 2 else "assistant", 20) for i in range(6)]
+    budget = TOKENS_PER_PROMPT + cost(10) + 3 * cost(20) + 5
+
+    fitted = manager.fit_messages(messages, "gpt-3.5-turbo", budget)
+
+    assert fitted == [messages[0]] + messages[-3:]
+
+def test_fit_returns_the_same_list_when_everything_fits():
+    manager = ContextWindowManager(TokenCounter())
+    messages = [make_message("user", 5), make_message("assistant", 5)]
+
+    assert manager.fit_messages(messages, "gpt-4o", 1000) is messages
+
+def test_latest_message_is_kept_even_over_budget():
+    manager = ContextWindowManager(TokenCounter())
+    messages = [make_message("system", 5), make_message("user", 5), make_message("user", 500)]
+
+    assert manager.fit_messages(messages, "gpt-4o", 100) == [messages[0], messages[2]]
+
+def test_fit_request_reserves_the_system_prompt(monkeypatch):
+    monkeypatch.setattr(settings, "CONTEXT_MAX_PROMPT_TOKENS", TOKENS_PER_PROMPT + 2 * cost(20))
+    manager = ContextWindowManager(TokenCounter())
+    request = AIRequest(
+        messages=[make_message("user", 20), make_message("assistant", 20)],
+        context={"domain": "general"},
+        provider="openai",
+    )
+
+    assert manager.fit_request(request, "gpt-4o") is request
+
+    fitted = manager.fit_request(request, "gpt-4o", system_prompt="y" * 40)
+    assert fitted is not request
+    assert fitted.messages == request.messages[1:]
+    assert len(request.messages) == 2
+
+def test_repeated_history_only_counts_new_messages():
+    counter = TokenCounter()
+    manager = ContextWindowManager(counter)
+    messages = [make_message("user", i + 1) for i in range(10)]
+
+    manager.fit_messages(messages, "gpt-4o", 100000)
+    misses = counter.cache_info().misses
+    manager.fit_messages(messages + [make_message("user", 50)], "gpt-4o", 100000)
+
+    assert counter.cache_info().misses == misses + 1
+
+def test_slow_tokenizer_load_does_not_block_startup():
+    counter = TokenCounter()
+    counter.load = lambda encoding_names=None: time.sleep(0.3)
+
+    async def scenario():
+        start = time.perf_counter()
+        await load_tokenizers(counter, timeout=0.05)
+        return time.perf_counter() - start
+
+    assert asyncio.run(scenario()) < 0.25
+    assert counter.count("x" * 40) == 10
@@ -0,0 +1,128 @@
+import asyncio
+
+from sqlalchemy import event
+
+from app.core import database
+from app.models.ai_models import AIMessage, AIProvider, ConversationContext
+from app.services.conversation_store import conversation_store
+
+def run_with_database(scenario):
+    async def wrapper():
+        await database.init_db()
+        try:
+            return await scenario()
+        finally:
+            await database.close_db()
+
+    return asyncio.run(wrapper())
+
+def make_messages(prefix: str, count: int):
+    return [AIMessage(role="user" if i % 2 == 0 else "assistant", content=f"{prefix}-{i}") for i in range(count)]
+
+async def create_conversation(messages):
+    session = await conversation_store.create_session(ConversationContext(domain="general"), AIProvider.OPENAI)
+    message_count, message_ids = await conversation_store.append_messages(session.id, messages)
+    return session.id, message_count, message_ids
+
+def count_selects():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(database.engine.sync_engine, "before_cursor_execute", record)
+    return statements
+
+def test_messages_since_reads_every_tail_in_one_keyset_query():
+    async def scenario():
+        first, _, first_ids = await create_conversation(make_messages("a", 5))
+        second, _, _ = await create_conversation(make_messages("b", 3))
+        third, _, third_ids = await create_conversation(make_messages("c", 2))
+        for session_id in (first, second, third):
+            conversation_store.memory.discard(session_id)
+
+        statements = count_selects()
+        loaded = await conversation_store.get_messages_since({first: first_ids[1], second: 0, third: third_ids[-1]})
+        return loaded, statements, first_ids, third_ids, (first, second, third)
+
+    loaded, statements, first_ids, third_ids, (first, second, third) = run_with_database(scenario)
+
+    assert len(statements) == 1
+    assert "OFFSET" not in statements[0].upper()
+    messages, last_id = loaded[first]
+    assert [msg.content for msg in messages] == ["a-2", "a-3", "a-4"]
+    assert last_id == first_ids[-1]
+    assert [msg.content for msg in loaded[second][0]] == ["b-0", "b-1", "b-2"]
+    assert loaded[third] == ([], third_ids[-1])
+
+def test_messages_since_serves_current_histories_from_memory():
+    async def scenario():
+        session_id, message_count, message_ids = await create_conversation(make_messages("m", 4))
+        statements = count_selects()
+        current = await conversation_store.get_messages_since({session_id: message_ids[0]}, {session_id: message_count})
+        queries_when_current = len(statements)
+        # A count that disagrees with the cached history means another worker appended
+        stale = await conversation_store.get_messages_since({session_id: message_ids[0]}, {session_id: message_count + 1})
+        return current[session_id], queries_when_current, stale[session_id], len(statements), message_ids
+
+    current, queries_when_current, stale, queries, message_ids = run_with_database(scenario)
+
+    assert queries_when_current == 0
+    assert [msg.content for msg in current[0]] == ["m-1", "m-2", "m-3"]
+    assert current[1] == message_ids[-1]
+    assert queries == 1
+    assert [msg.content for msg in stale[0]] == ["m-1", "m-2", "m-3"]
+
+def test_history_pages_back_with_a_keyset_cursor():
+    async def scenario():
+        session_id, _, message_ids = await create_conversation(make_messages("h", 7))
+        conversation_store.memory.discard(session_id)
+        statements = count_selects()
+        pages = []
+        cursor = None
+        while True:
+            messages, cursor = await conversation_store.get_history(session_id, 3, cursor)
+            pages.append(([msg.content for msg in messages], cursor))
+            if cursor is None:
+                return pages, statements, message_ids
+
+    pages, statements, message_ids = run_with_database(scenario)
+
+    assert pages == [
+        (["h-4", "h-5", "h-6"], message_ids[4]),
+        (["h-1", "h-2", "h-3"], message_ids[1]),
+        (["h-0"], None),
+    ]
+    # Older pages seek past the cursor instead of skipping rows
+    assert len(statements) == 3
+    assert all(".id < ?" in statement for statement in statements[1:])
+
+def test_history_pages_fill_in_memory_and_are_then_served_from_it():
+    async def scenario():
+        session_id, message_count, _ = await create_conversation(make_messages("h", 7))
+        conversation_store.memory.discard(session_id)
+
+        from_database = []
+        cursor = None
+        while True:
+            page = await conversation_store.get_history(session_id, 3, cursor, message_count)
+            from_database.append(([msg.content for msg in page[0]], page[1]))
+            cursor = page[1]
+            if cursor is None:
+                break
+
+        statements = count_selects()
+        from_memory = []
+        while True:
+            page = await conversation_store.get_history(session_id, 3, cursor, message_count)
+            from_memory.append(([msg.content for msg in page[0]], page[1]))
+            cursor = page[1]
+            if cursor is None:
+                break
+        return from_database, from_memory, statements
+
+    from_database, from_memory, statements = run_with_database(scenario)
+
+    assert from_memory == from_database
+    assert statements == []
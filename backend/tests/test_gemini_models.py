@@ -0,0 +1,64 @@
+import asyncio
+
+from app.models.ai_models import AIMessage, AIProvider, AIRequest, ConversationContext
+from app.services.gemini_models import GeminiModelPool, to_contents
+
+def make_request(messages, domain: str = "aws") -> AIRequest:
+    return AIRequest(
+        messages=messages,
+        context=ConversationContext(domain=domain),
+        provider=AIProvider.GEMINI,
+        conversation_id="conversation-1"
+    )
+
+def test_to_contents_maps_assistant_to_model_and_everything_else_to_user():
+    messages = [
+        AIMessage(role="user", content="hi"),
+        AIMessage(role="assistant", content="hello"),
+        AIMessage(role="system", content="be brief"),
+    ]
+
+    assert to_contents(messages) == [
+        {"role": "user", "parts": [{"text": "hi"}]},
+        {"role": "model", "parts": [{"text": "hello"}]},
+        {"role": "user", "parts": [{"text": "be brief"}]},
+    ]
+
+def test_model_pool_reuses_handles_and_evicts_least_recently_used():
+    pool = GeminiModelPool(max_handles=2)
+    first = pool.get("gemini-1.5-flash", "prompt a")
+
+    assert pool.get("gemini-1.5-flash", "prompt a") is first
+    assert first.system_instruction == {"parts": [{"text": "prompt a"}]}
+
+    pool.get("gemini-1.5-flash", "prompt b")
+    pool.get("gemini-1.5-flash", "prompt a")
+    pool.get("gemini-1.5-pro", "prompt a")
+
+    assert len(pool) == 2
+    assert pool.get("gemini-1.5-flash", "prompt a") is first
+
+def test_gemini_calls_send_system_instruction_and_native_turns(stub_backend):
+    service = stub_backend.service
+    history = [AIMessage(role="user", content="What is S3?"), AIMessage(role="assistant", content="Object storage.")]
+    follow_up = history + [AIMessage(role="user", content="And Glacier?")]
+
+    async def scenario():
+        first = await service.process_request(make_request(history[:1]))
+        second = await service.process_request(make_request(follow_up))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    bodies = stub_backend.bodies(":generateContent")
+
+    assert len(bodies) == 2
+    assert first.provider == second.provider == AIProvider.GEMINI
+    assert second.usage["prompt_tokens"] > 0
+    system_prompt = service._build_system_prompt(ConversationContext(domain="aws"))
+    assert bodies[1]["systemInstruction"] == {"parts": [{"text": system_prompt}]}
+    # Every call carries the whole history as user/model turns
+    assert bodies[1]["contents"] == [
+        {"role": "user", "parts": [{"text": "What is S3?"}]},
+        {"role": "model", "parts": [{"text": "Object storage."}]},
+        {"role": "user", "parts": [{"text": "And Glacier?"}]},
+    ]
@@ -0,0 +1,52 @@
+import logging
+import logging.handlers
+import os
+
+import pytest
+
+from app.core import logging as app_logging
+from app.core.config import settings
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    path = tmp_path / "backend.log"
+    monkeypatch.setattr(settings, "LOG_FILE", str(path))
+    monkeypatch.setattr(settings, "LOG_FORMAT", "text")
+    yield path
+    monkeypatch.undo()
+    app_logging.setup_logging()
+
+def file_handlers():
+    return [handler for handler in app_logging.listener.handlers if isinstance(handler, logging.FileHandler)]
+
+def test_single_process_rotates_its_own_file(log_file):
+    app_logging.setup_logging()
+
+    [handler] = file_handlers()
+    assert isinstance(handler, logging.handlers.RotatingFileHandler)
+    assert handler.baseFilename == str(log_file)
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_workers_append_to_the_shared_file(log_file):
+    app_logging.setup_logging()
+    pids = []
+    for worker in range(3):
+        pid = os.fork()
+        if pid == 0:
+            # The at-fork hook has set up the child's logging
+            code = 0 if isinstance(file_handlers()[0], logging.handlers.WatchedFileHandler) else 1
+            logging.getLogger("worker").warning("worker %d started", worker)
+            app_logging.stop_logging()
+            os._exit(code)
+        pids.append(pid)
+    statuses = [os.waitpid(pid, 0)[1] for pid in pids]
+    logging.getLogger("master").warning("master done")
+    app_logging.stop_logging()
+
+    assert statuses == [0, 0, 0]
+    # One file however many workers have come and gone
+    assert os.listdir(log_file.parent) == [log_file.name]
+    lines = log_file.read_text().splitlines()
+    assert sorted(line.split("] ", 1)[1] for line in lines) == [
+        "master done", "worker 0 started", "worker 1 started", "worker 2 started"
+    ]
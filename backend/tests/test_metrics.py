@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from app.core import metrics
+
+uvloop = pytest.importorskip("uvloop")
+
+def run_on_uvloop(coro):
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        return runner.run(coro)
+
+def test_collect_runtime_without_executor_on_uvloop():
+    async def scrape():
+        metrics.collect_runtime()
+        return metrics.registry.render()
+
+    assert "solaris_threadpool_threads 0" in run_on_uvloop(scrape())
+
+def test_threadpool_gauges_on_uvloop():
+    async def scrape():
+        metrics.init_default_executor()
+        try:
+            await asyncio.to_thread(sum, range(10))
+            metrics.collect_runtime()
+            return metrics.THREADPOOL_THREADS.labels().value
+        finally:
+            metrics.shutdown_default_executor()
+
+    assert run_on_uvloop(scrape()) >= 1
+    assert metrics.default_executor is None
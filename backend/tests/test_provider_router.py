@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from app.core.circuit_breaker import OPEN, get_breaker
+from app.core.config import settings
+from app.models.ai_models import AIMessage, AIProvider, AIRequest, AIResponse
+from app.services.provider_router import ProviderRouter, percentile
+
+DEFAULT_MODELS = {AIProvider.OPENAI: "gpt-4o-mini", AIProvider.GEMINI: "gemini-1.5-flash"}
+
+class FakeProviders:
+    """Provider calls with a set latency or error per provider"""
+
+    def __init__(self, **behaviour):
+        self.behaviour = behaviour
+        self.calls = []
+        self.cancelled = []
+
+    async def __call__(self, request: AIRequest) -> AIResponse:
+        provider = request.provider.value
+        self.calls.append((provider, request.model))
+        delay, error = self.behaviour.get(provider, (0.0, None))
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(provider)
+            raise
+        if error is not None:
+            raise error
+        return AIResponse(content=f"from {provider}", model=request.model or DEFAULT_MODELS[request.provider], provider=request.provider)
+
+def make_router(providers: FakeProviders, available=(AIProvider.OPENAI, AIProvider.GEMINI)) -> ProviderRouter:
+    return ProviderRouter(providers, lambda provider: provider in available, DEFAULT_MODELS)
+
+def make_request(routing=None, provider="openai") -> AIRequest:
+    return AIRequest(
+        messages=[AIMessage(role="user", content="What is S3?")],
+        context={"domain": "aws"},
+        provider=provider,
+        routing=routing,
+    )
+
+@pytest.fixture(autouse=True)
+def hedge_settings(monkeypatch):
+    monkeypatch.setattr(settings, "HEDGE_DEFAULT_DELAY", 0.05)
+    monkeypatch.setattr(settings, "HEDGE_MIN_DELAY", 0.01)
+    monkeypatch.setattr(settings, "HEDGE_MIN_SAMPLES", 3)
+    monkeypatch.setattr(settings, "HEDGE_PERCENTILE", 50.0)
+
+def test_percentile_interpolates_like_numpy():
+    assert percentile([4, 1, 3, 2], 50) == 2.5
+    assert percentile([1, 2, 3, 4, 5], 95) == pytest.approx(4.8)
+    assert percentile([7], 99) == 7
+
+def test_direct_routing_does_not_fail_over():
+    providers = FakeProviders(openai=(0, RuntimeError("down")))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(make_router(providers).call(make_request()))
+    assert providers.calls == [("openai", None)]
+
+def test_failover_retries_once_on_the_alternate():
+    providers = FakeProviders(openai=(0, RuntimeError("down")))
+    router = make_router(providers)
+
+    response = asyncio.run(router.call(make_request("failover")))
+
+    assert response.provider == AIProvider.GEMINI
+    assert providers.calls == [("openai", None), ("gemini", "gemini-1.5-flash")]
+    assert router.stats["failovers"] == 1
+
+def test_failover_needs_an_available_alternate():
+    providers = FakeProviders(openai=(0, RuntimeError("down")))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(make_router(providers, available=(AIProvider.OPENAI,)).call(make_request("failover")))
+    assert len(providers.calls) == 1
+
+def test_fast_primary_is_not_hedged():
+    providers = FakeProviders(openai=(0, None), gemini=(0, None))
+    router = make_router(providers)
+
+    response = asyncio.run(router.call(make_request("hedged")))
+
+    assert response.provider == AIProvider.OPENAI
+    assert providers.calls == [("openai", None)]
+    assert router.stats["primary_wins"] == 1 and router.stats["hedges"] == 0
+
+def test_slow_primary_is_hedged_and_the_loser_cancelled():
+    providers = FakeProviders(openai=(1.0, None), gemini=(0, None))
+    router = make_router(providers)
+
+    async def scenario():
+        response = await router.call(make_request("hedged"))
+        await asyncio.sleep(0)
+        return response
+
+    response = asyncio.run(scenario())
+
+    assert response.provider == AIProvider.GEMINI
+    assert router.stats["hedges"] == 1 and router.stats["hedge_wins"] == 1
+    assert router.stats["cancellations"] == 1
+    assert providers.cancelled == ["openai"]
+
+def test_primary_error_before_the_hedge_delay_fails_over():
+    providers = FakeProviders(openai=(0, RuntimeError("down")))
+    router = make_router(providers)
+
+    response = asyncio.run(router.call(make_request("hedged")))
+
+    assert response.provider == AIProvider.GEMINI
+    assert router.stats["failovers"] == 1 and router.stats["hedges"] == 0
+
+def test_both_failing_surfaces_the_primary_error():
+    providers = FakeProviders(openai=(0.1, ValueError("primary")), gemini=(0, RuntimeError("hedge")))
+
+    with pytest.raises(ValueError, match="primary"):
+        asyncio.run(make_router(providers).call(make_request("hedged")))
+
+def test_hedge_delay_follows_observed_latency():
+    providers = FakeProviders(openai=(0.02, None))
+    router = make_router(providers)
+
+    async def scenario():
+        before = router.get_hedge_delay("openai", "gpt-4o-mini")
+        for _ in range(3):
+            await router.call(make_request())
+        return before, router.get_hedge_delay("openai", "gpt-4o-mini")
+
+    before, after = asyncio.run(scenario())
+
+    assert before == settings.HEDGE_DEFAULT_DELAY
+    assert 0.02 <= after < settings.HEDGE_DEFAULT_DELAY
+    assert router.get_stats()["hedge_delays"] == {"openai:gpt-4o-mini": round(after, 3)}
+
+def test_open_circuit_fails_over_to_the_stub_alternate(stub_backend):
+    breaker = get_breaker("openai")
+    while breaker.state != OPEN:
+        breaker.record_failure()
+
+    response = asyncio.run(stub_backend.service.process_request(make_request("failover")))
+
+    assert response.provider == AIProvider.GEMINI
+    assert response.model == "gemini-1.5-flash"
+    assert not stub_backend.bodies("/chat/completions")
+    assert len(stub_backend.bodies("generateContent")) == 1
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.models.ai_models import AIProvider
+from app.services import rate_limiter
+from app.services.gemini_client import GeminiAPIError
+from app.services.rate_limiter import (
+    AdaptiveConcurrencyLimiter,
+    LocalTokenBucket,
+    ProviderRateLimiter,
+    RateLimitExceeded,
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    # Only the limiter's clock; the event loop keeps the real one
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=clock, perf_counter=time.perf_counter))
+    return clock
+
+def test_local_bucket_allows_a_burst_then_refills_at_the_rate(clock):
+    bucket = LocalTokenBucket()
+    rate = 60 / 60000.0  # 60 per minute
+
+    assert [bucket.take("key", rate, capacity=3) for _ in range(3)] == [0, 0, 0]
+    assert bucket.take("key", rate, capacity=3) == 1000
+
+    clock.now += 1.0
+    assert bucket.take("key", rate, capacity=3) == 0
+    assert bucket.take("other", rate, capacity=3) == 0
+
+def test_rpm_limits_are_off_unless_configured():
+    limiter = ProviderRateLimiter()
+
+    assert limiter.get_config(AIProvider.OPENAI, "gpt-4o").rate_limit == 0
+    assert limiter.get_config(AIProvider.GEMINI, "gemini-pro").rate_limit == 0
+
+    async def scenario():
+        for _ in range(50):
+            async with limiter.limit(AIProvider.GEMINI, "gemini-pro", timeout=0):
+                pass
+
+    asyncio.run(scenario())
+    assert limiter.stats == {"queued": 0, "rejected": 0, "provider_429": 0}
+
+def test_configured_rpm_allows_a_minute_of_requests_at_once(monkeypatch, clock):
+    monkeypatch.setattr(settings, "GEMINI_RATE_LIMIT_RPM", 60)
+    monkeypatch.setattr(settings, "MODEL_RATE_LIMIT_RPM", {"gemini-pro-vision": 5})
+    limiter = ProviderRateLimiter()
+
+    async def call(model: str):
+        async with limiter.limit(AIProvider.GEMINI, model, timeout=0):
+            pass
+
+    async def scenario():
+        for _ in range(60):
+            await call("gemini-pro")
+        with pytest.raises(RateLimitExceeded) as rejected:
+            await call("gemini-pro")
+        for _ in range(5):
+            await call("gemini-pro-vision")
+        with pytest.raises(RateLimitExceeded):
+            await call("gemini-pro-vision")
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+
+    assert rejected.provider == "gemini"
+    assert rejected.retry_after == pytest.approx(1.0)
+    assert limiter.stats["rejected"] == 2
+
+def test_aimd_limit_halves_once_per_cooldown_and_grows_additively(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=1, max_limit=10, backoff_ratio=0.5, cooldown=1.0)
+
+    async def scenario():
+        for _ in range(3):
+            assert await limiter.acquire(0)
+        limiter.release(overloaded=True)
+        limiter.release(overloaded=True)
+        assert limiter.limit == 4
+        clock.now += 1.0
+        limiter.release(overloaded=True)
+        assert limiter.limit == 2
+
+        for _ in range(2):
+            assert await limiter.acquire(0)
+        assert not await limiter.acquire(0)
+        limiter.release()
+        limiter.release()
+        assert limiter.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+def test_aimd_limit_never_leaves_its_bounds(clock):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, max_limit=3, backoff_ratio=0.1, cooldown=0)
+
+    async def scenario():
+        for _ in range(20):
+            assert await limiter.acquire(0)
+            limiter.release()
+        assert limiter.limit == 3
+        for _ in range(5):
+            assert await limiter.acquire(0)
+            limiter.release(overloaded=True)
+        assert limiter.limit == 1
+
+    asyncio.run(scenario())
+
+def test_released_slot_goes_to_the_next_waiter():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1, max_limit=1, backoff_ratio=0.5)
+
+    async def scenario():
+        assert await limiter.acquire(0)
+        first = asyncio.create_task(limiter.acquire(1.0))
+        second = asyncio.create_task(limiter.acquire(0.05))
+        await asyncio.sleep(0)
+        limiter.release()
+        return await first, await second
+
+    assert asyncio.run(scenario()) == (True, False)
+    assert limiter.in_flight == 1
+    assert not limiter._waiters
+
+def test_provider_429_becomes_rate_limit_exceeded_and_backs_off(clock):
+    limiter = ProviderRateLimiter()
+
+    async def scenario():
+        with pytest.raises(RateLimitExceeded) as rejected:
+            async with limiter.limit(AIProvider.GEMINI, "gemini-pro"):
+                raise GeminiAPIError(429, "quota exceeded")
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+
+    assert rejected.provider == "gemini"
+    assert limiter.stats["provider_429"] == 1
+    concurrency = limiter.get_stats()["concurrency"]["gemini:gemini-pro"]
+    assert concurrency == {
+        "limit": int(settings.CONCURRENCY_INITIAL_LIMIT * settings.CONCURRENCY_BACKOFF_RATIO),
+        "in_flight": 0,
+    }
@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+import httpx
+from fastapi import APIRouter, FastAPI
+
+from app.core.request_decoding import ORJSONRoute
+from app.models.ai_models import AIRequest
+
+def make_client() -> httpx.AsyncClient:
+    router = APIRouter(route_class=ORJSONRoute)
+
+    @router.post("/chat")
+    async def chat(request: AIRequest):
+        return {"messages": len(request.messages), "metadata": request.context.metadata}
+
+    app = FastAPI()
+    app.include_router(router)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+def post(content: bytes) -> httpx.Response:
+    async def scenario():
+        async with make_client() as client:
+            return await client.post("/chat", content=content, headers={"content-type": "application/json"})
+
+    return asyncio.run(scenario())
+
+def make_body(metadata: str = "{}") -> bytes:
+    messages = json.dumps([{"role": "user", "content": "café ✓"}] * 3)
+    return (
+        f'{{"messages": {messages}, "context": {{"domain": "aws", "metadata": {metadata}}}, "provider": "openai"}}'
+    ).encode()
+
+def test_valid_body_is_decoded():
+    response = post(make_body('{"week": 3}'))
+
+    assert response.status_code == 200
+    assert response.json() == {"messages": 3, "metadata": {"week": 3}}
+
+def test_integers_wider_than_64_bits_arrive_as_floats():
+    response = post(make_body('{"id": 123456789012345678901234567890, "small": 9223372036854775807}'))
+
+    assert response.status_code == 200
+    assert response.json()["metadata"] == {"id": 1.2345678901234568e29, "small": 9223372036854775807}
+
+def test_malformed_json_is_still_a_422():
+    response = post(b'{"messages": [')
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "json_invalid"
+
+def test_invalid_messages_are_still_rejected():
+    response = post(make_body().replace(b'"user"', b'"robot"'))
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:3] == ["body", "messages", 0]
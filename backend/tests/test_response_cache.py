@@ -0,0 +1,213 @@
+import asyncio
+
+import pytest
+
+from app.core import cache
+from app.core.cache import MemoryStore
+from app.models.ai_models import AIMessage, AIProvider, AIRequest, AIResponse
+from app.services.response_cache import (
+    CODEC_RAW,
+    CODEC_ZLIB,
+    CacheDecodeError,
+    ResponseCache,
+    decode_response,
+    encode_response,
+    generate_cache_key,
+)
+
+def make_response(content: str) -> AIResponse:
+    return AIResponse(content=content, model="gpt-4o-mini", provider=AIProvider.OPENAI)
+
+def make_request(*contents: str, **fields) -> AIRequest:
+    fields = {"context": {"domain": "aws"}, "provider": "openai", **fields}
+    return AIRequest(messages=[AIMessage(role="user", content=content) for content in contents], **fields)
+
+@pytest.fixture
+def memory_store(monkeypatch) -> MemoryStore:
+    """Stand-in for the shared Redis tier"""
+    store = MemoryStore()
+    monkeypatch.setattr(cache, "redis_client", store)
+    return store
+
+def test_cache_key_ignores_timestamps_and_surrounding_whitespace():
+    key = generate_cache_key(make_request("What is S3?"), "gpt-4o-mini")
+
+    assert key == generate_cache_key(make_request("  What is S3?\n"), "gpt-4o-mini")
+    assert key != generate_cache_key(make_request("What is S3?"), "gpt-4o")
+    assert key != generate_cache_key(make_request("What is S3?", temperature=0.2), "gpt-4o-mini")
+    assert key != generate_cache_key(make_request("What", "is S3?"), "gpt-4o-mini")
+
+def test_cache_key_handles_metadata_orjson_cannot_encode():
+    request = make_request("hi", context={"domain": "aws", "metadata": {"id": 2 ** 70}})
+
+    assert generate_cache_key(request, "gpt-4o-mini").startswith("ai_response:v2:")
+
+def test_shared_tier_hit_fills_the_local_tier(memory_store):
+    async def scenario():
+        writer = ResponseCache()
+        await writer.set("key", make_response("stored"))
+        reader = ResponseCache()
+        first = await reader.get("key")
+        second = await reader.get("key")
+        return first, second, reader.stats
+
+    first, second, stats = asyncio.run(scenario())
+
+    assert first.content == second.content == "stored"
+    assert stats["redis_hits"] == 1 and stats["local_hits"] == 1
+
+def test_loader_runs_only_on_a_miss_in_both_tiers(memory_store):
+    async def scenario():
+        await ResponseCache().set("shared", make_response("from redis"))
+        responses = ResponseCache()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return make_response("loaded")
+
+        shared = await responses.get_or_load("shared", loader)
+        loaded = await responses.get_or_load("new", loader)
+        again = await ResponseCache().get("new")
+        return shared, loaded, again, calls
+
+    shared, loaded, again, calls = asyncio.run(scenario())
+
+    assert shared.content == "from redis"
+    assert loaded.content == again.content == "loaded"
+    assert len(calls) == 1
+
+def test_loader_error_reaches_every_waiter_and_is_not_cached():
+    async def scenario():
+        responses = ResponseCache()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+
+        results = await asyncio.gather(*(responses.get_or_load("key", failing) for _ in range(3)), return_exceptions=True)
+
+        async def loader():
+            return make_response("recovered")
+
+        return results, await responses.get_or_load("key", loader)
+
+    results, recovered = asyncio.run(scenario())
+
+    assert [type(result) for result in results] == [RuntimeError] * 3
+    assert recovered.content == "recovered"
+
+def test_get_or_load_coalesces_concurrent_callers():
+    async def scenario():
+        cache = ResponseCache()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return make_response("shared")
+
+        results = await asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(5)))
+        return calls, results, cache.stats["coalesced"]
+
+    calls, results, coalesced = asyncio.run(scenario())
+    assert calls == 1
+    assert coalesced == 4
+    assert {response.content for response in results} == {"shared"}
+
+def test_waiters_take_over_when_owner_is_cancelled():
+    async def scenario():
+        cache = ResponseCache()
+        release = asyncio.Event()
+        calls = 0
+
+        async def owner_loader():
+            await asyncio.sleep(3600)
+
+        async def waiter_loader():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return make_response("reloaded")
+
+        owner = asyncio.create_task(cache.get_or_load("key", owner_loader))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get_or_load("key", waiter_loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        owner.cancel()
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return calls, results, cache.get_stats()
+
+    calls, results, stats = asyncio.run(scenario())
+    assert calls == 1
+    assert [response.content for response in results] == ["reloaded"] * 3
+    assert stats["inflight"] == 0
+
+def test_waiter_cancellation_leaves_owner_running():
+    async def scenario():
+        cache = ResponseCache()
+        release = asyncio.Event()
+
+        async def loader():
+            await release.wait()
+            return make_response("owner")
+
+        owner = asyncio.create_task(cache.get_or_load("key", loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_load("key", loader))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await owner, waiter.cancelled()
+
+    response, waiter_cancelled = asyncio.run(scenario())
+    assert response.content == "owner"
+    assert waiter_cancelled
+
+def make_full_response(content: str) -> AIResponse:
+    return AIResponse(
+        content=content,
+        model="gemini-1.5-flash",
+        provider=AIProvider.GEMINI,
+        usage={"prompt_tokens": 12, "completion_tokens": 30, "total_tokens": 42},
+        request_id="req-1",
+    )
+
+@pytest.mark.parametrize("content, codec", [("short ✓", CODEC_RAW), ("long café answer " * 200, CODEC_ZLIB)])
+def test_codec_round_trips_every_field(content, codec):
+    response = make_full_response(content)
+
+    data = encode_response(response, compress_min_bytes=1024)
+
+    assert data[:2] == bytes((1, codec))
+    assert decode_response(data).model_dump() == response.model_dump()
+
+def test_compressed_entries_are_smaller():
+    response = make_full_response("long café answer " * 200)
+
+    assert len(encode_response(response, compress_min_bytes=1024)) < len(encode_response(response, compress_min_bytes=1 << 20)) / 4
+
+def test_legacy_json_entries_are_still_readable():
+    response = make_full_response("written by an older release")
+
+    assert decode_response(response.model_dump_json().encode()).model_dump() == response.model_dump()
+
+@pytest.mark.parametrize("data", [b"\x09\x00[]", b"\x01\x07[]", b"\x01"])
+def test_unknown_formats_are_rejected(data):
+    with pytest.raises(CacheDecodeError):
+        decode_response(data)
+
+def test_undecodable_shared_entry_is_a_miss(memory_store):
+    async def scenario():
+        await memory_store.set("key", b"\x09garbage")
+        responses = ResponseCache()
+        return await responses.get("key"), await responses.get_many(["key"])
+
+    assert asyncio.run(scenario()) == (None, {})
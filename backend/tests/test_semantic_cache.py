@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from app.models.ai_models import AIMessage, AIProvider, AIRequest, AIResponse
+from app.services.semantic_cache import HashingEmbedder, SemanticCache
+
+MODEL = "gpt-4o-mini"
+
+def make_request(*turns: str, domain: str = "aws", **fields) -> AIRequest:
+    roles = ["user", "assistant"]
+    messages = [AIMessage(role=roles[index % 2], content=content) for index, content in enumerate(turns)]
+    return AIRequest(messages=messages, context={"domain": domain}, provider="openai", **fields)
+
+def make_response(content: str) -> AIResponse:
+    return AIResponse(content=content, model=MODEL, provider=AIProvider.OPENAI)
+
+def make_cache(**kwargs) -> SemanticCache:
+    return SemanticCache(**{"threshold": 0.9, "capacity": 100, "dim": 256, "ttl": 3600, **kwargs})
+
+def test_embeddings_are_normalized_and_stable():
+    embedder = HashingEmbedder(256)
+
+    vector = embedder.embed("What is an S3 bucket policy?")
+
+    assert vector.dtype == np.float32
+    assert np.linalg.norm(vector) == pytest.approx(1.0)
+    assert np.array_equal(vector, HashingEmbedder(256).embed("What is an S3 bucket policy?"))
+
+def test_paraphrase_is_served_and_different_question_is_not():
+    cache = make_cache()
+    cache.add(make_request("What is an S3 bucket policy?"), MODEL, make_response("policy answer"))
+
+    hit = cache.lookup(make_request("Please explain what an S3 bucket policy is"), MODEL)
+    miss = cache.lookup(make_request("How do I size a Lambda function?"), MODEL)
+
+    assert hit.content == "policy answer"
+    assert miss is None
+    assert cache.get_stats() == {"hits": 1, "misses": 1, "skipped": 0, "entries": 1}
+
+def test_answers_are_scoped_by_domain_model_and_parameters():
+    cache = make_cache()
+    cache.add(make_request("What is an S3 bucket policy?"), MODEL, make_response("policy answer"))
+
+    assert cache.lookup(make_request("What is an S3 bucket policy?", domain="general"), MODEL) is None
+    assert cache.lookup(make_request("What is an S3 bucket policy?"), "gpt-4o") is None
+    assert cache.lookup(make_request("What is an S3 bucket policy?", temperature=0.1), MODEL) is None
+    assert cache.lookup(make_request("What is an S3 bucket policy?"), MODEL) is not None
+
+def test_follow_up_questions_are_not_answered_by_similarity():
+    cache = make_cache()
+    follow_up = make_request("What is S3?", "Object storage.", "And its pricing?")
+
+    cache.add(follow_up, MODEL, make_response("pricing"))
+
+    assert cache.lookup(follow_up, MODEL) is None
+    assert cache.get_stats()["skipped"] == 1
+    assert cache.get_stats()["entries"] == 0
+
+def test_expired_entries_are_not_served():
+    cache = make_cache(ttl=0)
+    cache.add(make_request("What is an S3 bucket policy?"), MODEL, make_response("stale"))
+
+    assert cache.lookup(make_request("What is an S3 bucket policy?"), MODEL) is None
+
+def test_full_index_evicts_the_least_recently_used_entry():
+    cache = make_cache(capacity=2)
+    questions = ["What is IAM?", "What is CloudFront?", "What is Route 53?"]
+    cache.add(make_request(questions[0]), MODEL, make_response("iam"))
+    cache.add(make_request(questions[1]), MODEL, make_response("cloudfront"))
+    cache.lookup(make_request(questions[0]), MODEL)
+
+    cache.add(make_request(questions[2]), MODEL, make_response("route 53"))
+
+    answers = [cache.lookup(make_request(question), MODEL) for question in questions]
+    assert [answer and answer.content for answer in answers] == ["iam", None, "route 53"]
+
+def test_snapshot_restores_live_entries(tmp_path):
+    cache = make_cache()
+    cache.add(make_request("What is an S3 bucket policy?"), MODEL, make_response("policy answer"))
+    cache.add(make_request("How are projects budgeted?", domain="projects"), MODEL, make_response("budget"))
+    path = str(tmp_path / "semantic.npz")
+
+    cache.snapshot(path)
+    restored = make_cache()
+    restored.restore(path)
+
+    assert restored.get_stats()["entries"] == 2
+    assert restored.lookup(make_request("Explain S3 bucket policy"), MODEL).content == "policy answer"
+    assert restored.lookup(make_request("How are projects budgeted?", domain="projects"), MODEL).content == "budget"
@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.session_memory import CompactHistory, SessionMemory
+
+START = datetime(2024, 5, 1, 12, 0, 0, 123456)
+
+def make_rows(first_id: int, count: int, prefix: str = "m"):
+    return [
+        (message_id, "user" if message_id % 2 else "assistant", f"{prefix}{message_id} café ✓", START + timedelta(seconds=message_id))
+        for message_id in range(first_id, first_id + count)
+    ]
+
+def contents(messages):
+    return [msg.content for msg in messages]
+
+def test_history_round_trips_rows_through_compact_arrays():
+    rows = make_rows(1, 4)
+    history = CompactHistory(rows)
+
+    messages = history.messages()
+
+    assert len(history) == 4
+    assert [(msg.role, msg.content, msg.timestamp) for msg in messages] == [row[1:] for row in rows]
+    assert contents(history.messages(1, 3)) == [rows[1][2], rows[2][2]]
+
+def test_partial_history_pages_like_the_database_until_it_runs_out():
+    history = CompactHistory(make_rows(11, 5), skipped=10)
+
+    assert len(history) == 15
+    messages, cursor = history.page(3)
+    assert contents(messages) == contents(CompactHistory(make_rows(13, 3)).messages())
+    assert cursor == 13
+    messages, cursor = history.page(2, before=cursor)
+    assert [msg.content[:3] for msg in messages] == ["m11", "m12"]
+    assert cursor == 11
+    assert history.page(1, before=cursor) is None
+    with pytest.raises(IndexError):
+        history.messages(5)
+
+def test_prepend_extends_history_backwards():
+    history = CompactHistory(make_rows(11, 3), skipped=4)
+
+    history.prepend(make_rows(7, 4))
+
+    assert history.skipped == 0
+    assert list(history.ids) == list(range(7, 14))
+    assert [msg.content[:3] for msg in history.messages()] == ["m7 ", "m8 ", "m9 ", "m10", "m11", "m12", "m13"]
+    messages, cursor = history.page(10)
+    assert len(messages) == 7 and cursor is None
+
+def test_since_returns_only_messages_after_the_cursor():
+    history = CompactHistory(make_rows(5, 3), skipped=4)
+
+    messages, last_id = history.since(5)
+    assert [msg.content[:2] for msg in messages] == ["m6", "m7"]
+    assert last_id == 7
+    assert history.since(7) == ([], 7)
+    # Messages before the held ones are not known
+    assert history.since(2) is None
+
+def test_frozen_history_thaws_on_read():
+    history = CompactHistory(make_rows(1, 50))
+    text = bytes(history.text)
+
+    history.freeze()
+
+    assert history.cold and not history.text
+    assert history.nbytes < 50 * 25 + len(text)
+    assert contents(history.messages(49)) == ["m50 café ✓"]
+    assert not history.cold and bytes(history.text) == text
+
+def test_memory_serves_only_histories_with_the_current_message_count():
+    memory = SessionMemory(max_sessions=10, max_bytes=1 << 20, cold_after=3600, max_messages=100)
+    memory.put("s", CompactHistory(make_rows(1, 3)))
+
+    assert memory.get("s", 3) is not None
+    memory.append("s", make_rows(4, 2), message_count=5)
+    assert len(memory.get("s", 5)) == 5
+    # Another worker appended: the copy is dropped rather than served
+    assert memory.get("s", 6) is None
+    assert memory.get("s", 6) is None
+    assert memory.get_stats()["stale"] == 1
+    assert memory.total_bytes == 0
+
+def test_append_after_an_unseen_append_drops_the_history():
+    memory = SessionMemory(max_sessions=10, max_bytes=1 << 20, cold_after=3600, max_messages=100)
+    memory.put("s", CompactHistory(make_rows(1, 3)))
+
+    memory.append("s", make_rows(5, 1), message_count=5)
+
+    assert len(memory) == 0
+
+def test_pages_fill_in_a_history_from_the_newest_page_back():
+    memory = SessionMemory(max_sessions=10, max_bytes=1 << 20, cold_after=3600, max_messages=100)
+
+    memory.add_page("s", make_rows(8, 3), message_count=10, before=None, reached_start=False)
+    assert memory.get("s", 10).skipped == 7
+    memory.add_page("s", make_rows(4, 4), message_count=10, before=8, reached_start=False)
+    memory.add_page("s", make_rows(1, 3), message_count=10, before=4, reached_start=True)
+
+    history = memory.get("s", 10)
+    assert history.skipped == 0
+    assert list(history.ids) == list(range(1, 11))
+    assert memory.total_bytes == history.nbytes
+
+def test_page_contradicting_the_history_discards_it():
+    memory = SessionMemory(max_sessions=10, max_bytes=1 << 20, cold_after=3600, max_messages=100)
+    memory.add_page("s", make_rows(8, 3), message_count=10, before=None, reached_start=False)
+
+    # Claims to reach the start, yet leaves messages unaccounted for
+    memory.add_page("s", make_rows(5, 3), message_count=10, before=8, reached_start=True)
+
+    assert len(memory) == 0 and memory.total_bytes == 0
+
+def test_idle_sessions_go_cold_and_are_evicted_first(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.session_memory.time.monotonic", lambda: now[0])
+    memory = SessionMemory(max_sessions=2, max_bytes=1 << 20, cold_after=60, max_messages=100)
+    memory.put("old", CompactHistory(make_rows(1, 20)))
+    now[0] += 30
+    memory.put("recent", CompactHistory(make_rows(1, 20)))
+
+    now[0] += 40
+    memory.put("new", CompactHistory(make_rows(1, 20)))
+
+    stats = memory.get_stats()
+    assert stats["frozen"] == 1 and stats["evicted"] == 1
+    assert memory.get("old", 20) is None
+    assert memory.get("recent", 20) is not None and memory.get("new", 20) is not None
+
+def test_memory_stays_within_its_byte_budget():
+    history = CompactHistory(make_rows(1, 20))
+    memory = SessionMemory(max_sessions=10, max_bytes=history.nbytes * 2 + 1, cold_after=3600, max_messages=100)
+
+    for session_id in "abc":
+        memory.put(session_id, CompactHistory(make_rows(1, 20)))
+
+    assert len(memory) == 2
+    assert memory.total_bytes <= memory.max_bytes
+    assert memory.get("a", 20) is None
+
+def test_histories_longer_than_max_messages_are_not_kept():
+    memory = SessionMemory(max_sessions=10, max_bytes=1 << 20, cold_after=3600, max_messages=5)
+
+    memory.put("s", CompactHistory(make_rows(1, 6)))
+    memory.add_page("t", make_rows(1, 3), message_count=6, before=None, reached_start=False)
+
+    assert len(memory) == 0
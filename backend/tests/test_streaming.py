@@ -0,0 +1,51 @@
+import asyncio
+
+from app.models.ai_models import AIMessage, AIProvider, AIRequest, AIResponse, ConversationContext
+
+def make_request(provider: AIProvider = AIProvider.OPENAI, content: str = "Explain VPC peering") -> AIRequest:
+    return AIRequest(
+        messages=[AIMessage(role="user", content=content)],
+        context=ConversationContext(domain="aws"),
+        provider=provider
+    )
+
+def collect(service, request: AIRequest):
+    async def scenario():
+        return [item async for item in service.stream_request(request)]
+
+    return asyncio.run(scenario())
+
+def test_openai_stream_reports_the_usage_the_provider_sends(stub_backend):
+    items = collect(stub_backend.service, make_request())
+    deltas, response = items[:-1], items[-1]
+
+    assert isinstance(response, AIResponse)
+    assert response.content == "".join(deltas)
+    assert len(deltas) == stub_backend.config.response_tokens
+    assert stub_backend.bodies("/chat/completions")[0]["stream_options"] == {"include_usage": True}
+    # The stub counts a token per four prompt characters and one per word
+    assert response.usage["completion_tokens"] == stub_backend.config.response_tokens
+    assert response.usage["total_tokens"] == response.usage["prompt_tokens"] + response.usage["completion_tokens"]
+
+def test_openai_stream_estimates_usage_when_the_server_sends_none(stub_backend):
+    stub_backend.config.stream_usage = False
+    service = stub_backend.service
+
+    items = collect(service, make_request())
+    response = items[-1]
+
+    expected = service.context_manager.counter.usage(
+        "\n\n".join(message["content"] for message in service._build_openai_messages(make_request())),
+        response.content,
+        response.model
+    )
+    assert response.usage == expected
+    assert response.usage["completion_tokens"] > 0
+
+def test_stream_cache_hit_yields_the_whole_answer_once(stub_backend):
+    service = stub_backend.service
+    first = collect(service, make_request(AIProvider.GEMINI))
+    again = collect(service, make_request(AIProvider.GEMINI))
+
+    assert again == [first[-1].content, first[-1]]
+    assert len(stub_backend.bodies(":streamGenerateContent")) == 1
@@ -0,0 +1,55 @@
+from app.models.ai_models import AIMessage
+from app.services.topic_engine import DEFAULT_TAXONOMY, TopicEngine
+
+def named_counts(engine: TopicEngine, text: str):
+    return {engine.topics[topic]: count for topic, count in engine.match(text).items()}
+
+def test_whole_keywords_need_a_word_boundary_on_both_sides():
+    engine = TopicEngine(DEFAULT_TAXONOMY)
+
+    assert named_counts(engine, "For example") == {}
+    assert named_counts(engine, "iambic ecstatic rdstation") == {}
+    assert named_counts(engine, "She tasked me with the projection") == {}
+    assert named_counts(engine, "unexam pre-exam") == {"AWS Certification": 1}
+
+def test_whole_keywords_match_at_punctuation_and_text_edges():
+    engine = TopicEngine(DEFAULT_TAXONOMY)
+
+    assert named_counts(engine, "iam, rds and ecs") == {"AWS Services": 3}
+    assert named_counts(engine, "EXAM") == {"AWS Certification": 1}
+    assert named_counts(engine, "project: task") == {"Project Management": 2}
+    assert named_counts(engine, "route 53 or route53 behind api gateway") == {"AWS Services": 3}
+
+def test_stems_match_the_start_of_longer_words():
+    engine = TopicEngine(DEFAULT_TAXONOMY)
+
+    assert named_counts(engine, "learning, learner, learn") == {"Learning": 3}
+    assert named_counts(engine, "certified certifications") == {"AWS Certification": 2}
+    assert named_counts(engine, "investments and budgets") == {"Finance": 2}
+    # Stems still only match at the start of a word
+    assert named_counts(engine, "relearn reinvest") == {}
+
+def test_stem_and_whole_keyword_sharing_a_prefix():
+    engine = TopicEngine({"Stem": ["data*"], "Word": ["data"], "Phrase": ["data lake"]})
+
+    assert named_counts(engine, "data") == {"Stem": 1, "Word": 1}
+    assert named_counts(engine, "database") == {"Stem": 1}
+    assert named_counts(engine, "data lake") == {"Stem": 1, "Word": 1, "Phrase": 1}
+    assert named_counts(engine, "data lakes") == {"Stem": 1, "Word": 1}
+
+def test_analyze_counts_messages_and_ranks_topics():
+    engine = TopicEngine(DEFAULT_TAXONOMY)
+    messages = [
+        AIMessage(role="user", content="How do I study for the exam?"),
+        AIMessage(role="assistant", content="Take a practice test, then review each exam domain."),
+        AIMessage(role="user", content="Thanks, and lambda?"),
+    ]
+
+    analysis = engine.analyze(messages)
+
+    assert analysis["message_count"] == 3
+    assert analysis["user_messages"] == 2
+    assert analysis["assistant_messages"] == 1
+    assert analysis["conversation_length"] == sum(len(msg.content) for msg in messages)
+    assert analysis["topics"] == ["AWS Certification", "AWS Services", "Learning"]
+    assert analysis["topic_counts"] == {"AWS Certification": 3, "AWS Services": 1, "Learning": 1}